@@ -1,11 +1,18 @@
 #!/usr/bin/env python3
 """
 AI Fix Helper
-Displays commits that need fixing for AI to fill fixed_subject and fixed_body fields
+Displays commits that need fixing for AI to fill fixed_subject and fixed_body fields,
+a page or a size-bounded batch at a time
 """
 
+import argparse
 import json
 import sys
+from typing import List, Optional
+from fix_report import ReportIndex, default_report_file, working_text
+
+# Rough size of a token, for turning --max-tokens into a character budget
+CHARS_PER_TOKEN = 4
 
 
 def display_commit_for_fixing(commit: dict, index: int, total: int):
@@ -97,9 +104,121 @@ def get_fix_suggestions(issues: list, body: str = "") -> list:
     return suggestions
 
 
-def main():
-    """Main function"""
-    input_file = "/tmp/unified_commit_fixes.json"
+def compact_record(commit: dict, number: int, body_limit: Optional[int] = None) -> str:
+    """One JSON line with just what a fix needs; body cut to body_limit chars
+
+    Commits the auto-fixer partly repaired show its draft and the issues
+    still left.
+    """
+    subject, full_body, issues = working_text(commit)
+    body = full_body
+    if body_limit is not None and len(body) > body_limit:
+        body = f"{body[:body_limit]}… [{len(body) - body_limit} more chars]"
+    return json.dumps(
+        {
+            "n": number,
+            "hash": commit["full_hash"],
+            "issues": issues,
+            "subject": subject,
+            "body": body,
+            "suggestions": get_fix_suggestions(issues, full_body),
+        },
+        ensure_ascii=False,
+    )
+
+
+def emit_compact_batch(index: ReportIndex, positions: List[int], budget: Optional[int]) -> int:
+    """Print compact records until the character budget is spent
+
+    Returns how many positions were emitted. A record that does not fit on
+    its own is still emitted, with its body cut to fit, so paging always
+    makes progress.
+    """
+    used = 0
+    for emitted, position in enumerate(positions):
+        commit = index.read(position)
+        line = compact_record(commit, position + 1)
+        if budget is not None and used + len(line) + 1 > budget:
+            if emitted:
+                return emitted
+            limit = len(working_text(commit)[1])
+            while limit and len(line) + 1 > budget:
+                # Escaping makes JSON at least as long as the raw text, so
+                # cutting the overflow from the body converges quickly
+                limit = max(limit - (len(line) + 1 - budget), 0)
+                line = compact_record(commit, position + 1, limit)
+        print(line)
+        used += len(line) + 1
+    return len(positions)
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="AI Fix Helper")
+    parser.add_argument(
+        "report",
+        nargs="?",
+        default=default_report_file(),
+        help="Fix plan (JSONL or legacy JSON array)",
+    )
+    parser.add_argument(
+        "--offset",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Skip the first N matching commits",
+    )
+    parser.add_argument("--limit", type=int, metavar="N", help="Show at most N commits")
+    parser.add_argument(
+        "--hash",
+        action="append",
+        default=[],
+        metavar="PREFIX",
+        help="Only commits whose hash starts with PREFIX (repeatable)",
+    )
+    parser.add_argument(
+        "--issue",
+        action="append",
+        default=[],
+        metavar="TYPE",
+        help="Only commits with this issue type, e.g. emoji-in-subject (repeatable)",
+    )
+    parser.add_argument(
+        "--compact",
+        action="store_true",
+        help="One JSON line per commit instead of the annotated display",
+    )
+    parser.add_argument(
+        "--max-chars",
+        type=int,
+        metavar="N",
+        help="Emit a compact batch of at most N characters (implies --compact)",
+    )
+    parser.add_argument(
+        "--max-tokens",
+        type=int,
+        metavar="N",
+        help=f"Same, budgeted in tokens (~{CHARS_PER_TOKEN} characters each)",
+    )
+    return parser.parse_args(argv)
+
+
+def print_next_page(offset: int, shown: int, matching: int, stream=sys.stdout):
+    """Tell the caller how to fetch the rest of the selection"""
+    next_offset = offset + shown
+    if next_offset < matching:
+        print(
+            f"➡️  Showing {offset + 1}-{next_offset} of {matching}; "
+            f"next page: --offset {next_offset}",
+            file=stream,
+        )
+
+
+def display_pages(
+    index: ReportIndex, input_file: str, positions: List[int], page: List[int], offset: int
+):
+    """Annotated display of one page of the selection"""
+    total = len(index)
 
     print("=" * 80)
     print("AI Fix Helper")
@@ -110,31 +229,21 @@ def main():
     print("  Provide this information to AI to fill fixed_subject and fixed_body")
     print()
 
-    # Read file
-    try:
-        with open(input_file, "r", encoding="utf-8") as f:
-            commits = json.load(f)
-    except FileNotFoundError:
-        print(f"❌ Error: File not found {input_file}")
-        print()
-        print("Please run the checker first:")
-        print("  python3 /tmp/unified_commit_checker.py")
-        print()
-        return 1
-
-    if not commits:
+    if not total:
         print("✅ No commits need fixing!")
-        return 0
+        return
 
-    total = len(commits)
     print(f"📊 Total commits to fix: {total}")
+    if len(positions) != total:
+        print(f"🔍 Matching filters: {len(positions)}")
     print()
     print("=" * 80)
     print()
 
-    # Display all commits needing fixes
-    for i, commit in enumerate(commits, 1):
-        display_commit_for_fixing(commit, i, total)
+    for position in page:
+        display_commit_for_fixing(index.read(position), position + 1, total)
+
+    print_next_page(offset, len(page), len(positions))
 
     print("=" * 80)
     print("📝 Next Steps:")
@@ -146,7 +255,7 @@ def main():
     print("   - fixed_subject: Fixed subject (≤100 characters)")
     print("   - fixed_body: Fixed body (preserve meaningful content)")
     print()
-    print("3. After AI generates fixes, update JSON file:")
+    print("3. After AI generates fixes, update the fix plan:")
     print(f"   {input_file}")
     print()
     print("4. Execute fixes:")
@@ -156,6 +265,42 @@ def main():
     print("   scripts/git-commit-message-quality-tools/ai_fix_helper_instructions.md")
     print()
 
+
+def main(argv=None):
+    """Main function"""
+    args = parse_args(argv)
+    input_file = args.report
+
+    budget = args.max_chars
+    if args.max_tokens is not None:
+        token_chars = args.max_tokens * CHARS_PER_TOKEN
+        budget = token_chars if budget is None else min(budget, token_chars)
+    compact = args.compact or budget is not None
+
+    try:
+        index = ReportIndex.open(input_file)
+    except FileNotFoundError:
+        print(f"❌ Error: File not found {input_file}")
+        print()
+        print("Please run the checker first:")
+        print("  python3 /tmp/unified_commit_checker.py")
+        print()
+        return 1
+
+    with index:
+        positions = index.select(args.issue, args.hash)
+        offset = max(args.offset, 0)
+        page = positions[offset:]
+        if args.limit is not None:
+            page = page[: max(args.limit, 0)]
+
+        if compact:
+            # Only records on stdout, so the batch can be piped as-is
+            shown = emit_compact_batch(index, page, budget)
+            print_next_page(offset, shown, len(positions), stream=sys.stderr)
+            return 0
+
+        display_pages(index, input_file, positions, page, offset)
     return 0
 
 
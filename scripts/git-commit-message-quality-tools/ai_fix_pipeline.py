@@ -0,0 +1,539 @@
+#!/usr/bin/env python3
+"""
+AI Fix Pipeline
+Sends unfilled fix plan records to a fixer backend in concurrent batches,
+re-validates every proposed fix and journals the results, then writes the
+accepted fixed_subject/fixed_body back into the fix plan
+"""
+
+import abc
+import argparse
+import asyncio
+import importlib
+import json
+import os
+import random
+import shlex
+import time
+from typing import Dict, Iterable, List, Optional
+from ai_fix_helper import compact_record
+from commit_auto_fixer import (
+    AUTO_FIX_BACKEND,
+    HEURISTIC_ISSUES,
+    MECHANICAL_ISSUES,
+    AutoFixer,
+    auto_fix_record,
+)
+from commit_rule_engine import get_rule_engine
+from fix_report import (
+    STATUS_ACCEPTED,
+    STATUS_FAILED,
+    STATUS_REJECTED,
+    default_report_file,
+    iter_report,
+    open_report_writer,
+    report_format,
+    working_text,
+)
+
+DEFAULT_BATCH_SIZE = 20
+DEFAULT_CONCURRENCY = 4
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 1.0  # Seconds before the first retry, doubled per attempt
+DEFAULT_TIMEOUT = 300.0  # Seconds per backend request
+
+# Completed fixes are appended here (and fsynced) before the report is
+# rewritten, so a crash loses at most the batches still in flight
+CHECKPOINT_SUFFIX = ".fixes.jsonl"
+
+# Fields a journal entry replaces when merged into its record
+RESULT_FIELDS = ("fix_status", "fix_backend", "fix_issues", "fix_error")
+# Draft fields the auto-fixer adds to partly fixed records
+AUTO_FIX_FIELDS = ("autofix_subject", "autofix_body", "unresolved_issues")
+
+
+class BackendError(Exception):
+    """A fixer backend request failed; the batch may be retried"""
+
+
+class FixerBackend(abc.ABC):
+    """Turns fix records into proposed fixes
+
+    `fix_batch` receives fix plan records and returns one dict per record it
+    fixed: `full_hash`, `fixed_subject` and `fixed_body`. Any exception (or a
+    timeout) fails the request, and the pipeline retries the batch.
+    """
+
+    name = "backend"
+
+    @abc.abstractmethod
+    async def fix_batch(self, records: List[Dict]) -> List[Dict]:
+        """Propose fixes for a batch of fix plan records"""
+
+    async def close(self):
+        pass
+
+
+class LocalRuleBackend(FixerBackend):
+    """Deterministic offline fixer: the auto-fixer with its heuristics enabled
+
+    On top of the mechanical repairs it drops Chinese text, strips
+    incomplete endings, guesses a type prefix, truncates long subjects and
+    removes stray markdown and code fences. Whatever it cannot repair fails
+    re-validation and is left for a real backend.
+    """
+
+    name = "local"
+
+    def __init__(self):
+        self.fixer = AutoFixer(MECHANICAL_ISSUES | HEURISTIC_ISSUES)
+
+    async def fix_batch(self, records: List[Dict]) -> List[Dict]:
+        fixes = []
+        for record in records:
+            result = self.fixer.fix(*working_text(record))
+            fixes.append(
+                {
+                    "full_hash": record["full_hash"],
+                    "fixed_subject": result.subject,
+                    "fixed_body": result.body,
+                }
+            )
+        return fixes
+
+
+class CommandBackend(FixerBackend):
+    """Runs an external command per batch (e.g. a script calling a model API)
+
+    The batch goes to its stdin as `ai_fix_helper.py --compact` JSON lines;
+    it must print one JSON line per fixed commit with `hash` (or
+    `full_hash`), `fixed_subject` and `fixed_body`. A non-zero exit is a
+    retryable failure.
+    """
+
+    name = "command"
+
+    def __init__(self, command: List[str]):
+        self.command = command
+
+    async def fix_batch(self, records: List[Dict]) -> List[Dict]:
+        payload = "".join(
+            compact_record(record, index) + "\n" for index, record in enumerate(records, 1)
+        )
+        process = await asyncio.create_subprocess_exec(
+            *self.command,
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE,
+        )
+        try:
+            stdout, stderr = await process.communicate(payload.encode("utf-8"))
+        except asyncio.CancelledError:
+            # Timed out or shut down: reap the command before giving up
+            process.kill()
+            await process.wait()
+            raise
+        if process.returncode != 0:
+            raise BackendError(
+                f"{self.command[0]} exited with {process.returncode}: "
+                f"{stderr.decode('utf-8', errors='replace').strip()[:200]}"
+            )
+
+        fixes = []
+        for line in stdout.decode("utf-8").splitlines():
+            if not line.strip():
+                continue
+            try:
+                fix = json.loads(line)
+            except json.JSONDecodeError as e:
+                raise BackendError(f"Unparseable backend output: {e}")
+            fix.setdefault("full_hash", fix.get("hash", ""))
+            fixes.append(fix)
+        return fixes
+
+
+def load_backend(spec: str) -> FixerBackend:
+    """`local`, `command:<shell words>` or `<module>:<factory>`"""
+    if spec == "local":
+        return LocalRuleBackend()
+    kind, _, rest = spec.partition(":")
+    if kind == "command" and rest.strip():
+        return CommandBackend(shlex.split(rest))
+    if rest:
+        factory = getattr(importlib.import_module(kind), rest)
+        return factory()
+    raise ValueError(f"Unknown backend: {spec}")
+
+
+class Checkpoint:
+    """Append-only journal of per-commit pipeline results"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self._file = None
+
+    def load(self) -> Dict[str, Dict]:
+        """full_hash -> latest entry; a torn last line from a crash is ignored"""
+        entries = {}
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                for line in f:
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    entries[entry["full_hash"]] = entry
+        except FileNotFoundError:
+            pass
+        return entries
+
+    def write(self, entries: Iterable[Dict]):
+        if self._file is None:
+            self._file = open(self.path, "a", encoding="utf-8")
+        for entry in entries:
+            self._file.write(json.dumps(entry, ensure_ascii=False))
+            self._file.write("\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def remove(self):
+        self.close()
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def journal_entry(record: Dict, backend: str) -> Dict:
+    """Start of a record's journal entry, keeping any auto-fix draft"""
+    entry = {"full_hash": record["full_hash"], "fix_backend": backend}
+    for field in AUTO_FIX_FIELDS:
+        if field in record:
+            entry[field] = record[field]
+    return entry
+
+
+def review_fix(engine, record: Dict, proposal: Optional[Dict], backend: str) -> Dict:
+    """Re-validate a proposed fix with the checker's rules"""
+    entry = journal_entry(record, backend)
+    subject = ((proposal or {}).get("fixed_subject") or "").strip()
+    body = ((proposal or {}).get("fixed_body") or "").strip()
+    if proposal is None:
+        entry.update(fix_status=STATUS_FAILED, fix_error="No fix returned")
+    elif not subject or "\n" in subject:
+        entry.update(fix_status=STATUS_FAILED, fix_error="fixed_subject must be one non-empty line")
+    else:
+        issues = engine.check(subject, body)
+        if issues:
+            entry.update(fix_status=STATUS_REJECTED, fix_issues=issues)
+        else:
+            entry.update(fix_status=STATUS_ACCEPTED, fixed_subject=subject, fixed_body=body)
+    return entry
+
+
+class PipelineStats:
+    """Counts for one pipeline run"""
+
+    __slots__ = (
+        "auto_fixed", "pending", "resumed", "accepted", "rejected", "failed", "retries", "seconds"
+    )
+
+    def __init__(self):
+        self.auto_fixed = 0
+        self.pending = 0
+        self.resumed = 0
+        self.accepted = 0
+        self.rejected = 0
+        self.failed = 0
+        self.retries = 0
+        self.seconds = 0.0
+
+    def count(self, entry: Dict):
+        status = entry["fix_status"]
+        if status == STATUS_ACCEPTED:
+            self.accepted += 1
+        elif status == STATUS_REJECTED:
+            self.rejected += 1
+        else:
+            self.failed += 1
+
+
+async def request_fixes(
+    backend: FixerBackend,
+    batch: List[Dict],
+    stats: PipelineStats,
+    retries: int,
+    backoff: float,
+    timeout: float,
+) -> List[Dict]:
+    """One backend call with timeout, retried with jittered exponential backoff"""
+    attempt = 0
+    while True:
+        try:
+            return await asyncio.wait_for(backend.fix_batch(batch), timeout)
+        except Exception:  # Backends raise their client's own errors too
+            if attempt >= retries:
+                raise
+        delay = backoff * (2 ** attempt)
+        attempt += 1
+        stats.retries += 1
+        await asyncio.sleep(delay * random.uniform(0.5, 1.0))
+
+
+async def run_batches(
+    backend: FixerBackend,
+    batches: List[List[Dict]],
+    checkpoint: Checkpoint,
+    stats: PipelineStats,
+    concurrency: int,
+    retries: int,
+    backoff: float,
+    timeout: float,
+):
+    """Fix all batches with at most `concurrency` backend requests in flight"""
+    engine = get_rule_engine()
+    in_flight = asyncio.Semaphore(concurrency)
+    done = 0
+
+    async def run(batch: List[Dict]):
+        nonlocal done
+        async with in_flight:
+            try:
+                fixes = await request_fixes(backend, batch, stats, retries, backoff, timeout)
+                error = None
+            except Exception as e:
+                fixes = []
+                error = str(e) or type(e).__name__
+
+        proposals = {fix.get("full_hash"): fix for fix in fixes}
+        entries = []
+        for record in batch:
+            if error is not None:
+                entry = journal_entry(record, backend.name)
+                entry.update(fix_status=STATUS_FAILED, fix_error=error)
+            else:
+                entry = review_fix(engine, record, proposals.get(record["full_hash"]), backend.name)
+            stats.count(entry)
+            entries.append(entry)
+        checkpoint.write(entries)
+
+        done += 1
+        accepted = sum(1 for entry in entries if entry["fix_status"] == STATUS_ACCEPTED)
+        mark = "❌" if error is not None else "✅"
+        print(f"  {mark} batch {done}/{len(batches)}: {accepted}/{len(batch)} fixes accepted")
+
+    await asyncio.gather(*(run(batch) for batch in batches))
+
+
+def merge_checkpoint(report_file: str, entries: Dict[str, Dict]) -> int:
+    """Write journaled results into the report (atomically), returns count"""
+    fmt = report_format(report_file)
+    tmp_file = f"{report_file}.tmp"
+    merged = 0
+    with open_report_writer(tmp_file, fmt) as writer:
+        for record in iter_report(report_file):
+            entry = entries.get(record["full_hash"])
+            if entry is not None:
+                for field in (*RESULT_FIELDS, *AUTO_FIX_FIELDS):
+                    record.pop(field, None)
+                record.update((k, v) for k, v in entry.items() if k != "full_hash")
+                merged += 1
+            writer.write(record)
+    os.replace(tmp_file, report_file)
+    return merged
+
+
+def auto_fix_pending(
+    pending: List[Dict], checkpoint: Checkpoint, stats: PipelineStats
+) -> List[Dict]:
+    """Settle what the auto-fixer can fully fix, returns records for the backend
+
+    Partly fixed records keep the auto-fixer's draft, so the backend only
+    sees the issues left.
+    """
+    fixer = AutoFixer()
+    entries = []
+    remaining = []
+    for record in pending:
+        if "unresolved_issues" not in record:
+            result = auto_fix_record(fixer, record)
+            if result is not None and not result.unresolved:
+                entry = journal_entry(record, AUTO_FIX_BACKEND)
+                entry.update(
+                    fix_status=STATUS_ACCEPTED,
+                    fixed_subject=result.subject,
+                    fixed_body=result.body,
+                )
+                entries.append(entry)
+                continue
+        remaining.append(record)
+    checkpoint.write(entries)
+    stats.auto_fixed = len(entries)
+    return remaining
+
+
+def pending_records(
+    report_file: str, done: Dict[str, Dict], retry_rejected: bool, limit: Optional[int]
+) -> List[Dict]:
+    """Records still needing a fix, skipping ones already journaled"""
+    pending = []
+    for record in iter_report(report_file):
+        if record.get("fixed_subject") or record["full_hash"] in done:
+            continue
+        if record.get("fix_status") == STATUS_REJECTED and not retry_rejected:
+            continue
+        pending.append(record)
+        if limit is not None and len(pending) >= limit:
+            break
+    return pending
+
+
+async def run_pipeline(
+    report_file: str,
+    backend: FixerBackend,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    concurrency: int = DEFAULT_CONCURRENCY,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+    timeout: float = DEFAULT_TIMEOUT,
+    retry_rejected: bool = False,
+    limit: Optional[int] = None,
+    auto_fix: bool = True,
+) -> PipelineStats:
+    """Fix every unfilled record of a report and merge the results into it
+
+    Results from an interrupted earlier run are picked up from the
+    checkpoint journal and not requested again.
+    """
+    start = time.perf_counter()
+    stats = PipelineStats()
+    checkpoint = Checkpoint(report_file + CHECKPOINT_SUFFIX)
+    done = checkpoint.load()
+    stats.resumed = len(done)
+
+    pending = pending_records(report_file, done, retry_rejected, limit)
+    if auto_fix:
+        pending = auto_fix_pending(pending, checkpoint, stats)
+    stats.pending = len(pending)
+    batches = [pending[i : i + batch_size] for i in range(0, len(pending), batch_size)]
+    try:
+        await run_batches(
+            backend, batches, checkpoint, stats, concurrency, retries, backoff, timeout
+        )
+    finally:
+        checkpoint.close()
+        await backend.close()
+
+    results = checkpoint.load()
+    if results:
+        merge_checkpoint(report_file, results)
+    checkpoint.remove()
+    stats.seconds = time.perf_counter() - start
+    return stats
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Fill in fix plan records with a fixer backend")
+    parser.add_argument(
+        "report",
+        nargs="?",
+        default=default_report_file(),
+        help="Fix plan (JSONL or legacy JSON array), updated in place",
+    )
+    parser.add_argument(
+        "--backend",
+        default="local",
+        help="local (offline rule-based), command:<cmd> (batch JSON lines on "
+        "stdin/stdout) or module:factory (default: %(default)s)",
+    )
+    parser.add_argument("--batch-size", type=int, default=DEFAULT_BATCH_SIZE, metavar="N")
+    parser.add_argument(
+        "--concurrency",
+        type=int,
+        default=DEFAULT_CONCURRENCY,
+        metavar="N",
+        help="Backend requests in flight at once (default: %(default)s)",
+    )
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES, metavar="N")
+    parser.add_argument(
+        "--backoff",
+        type=float,
+        default=DEFAULT_BACKOFF,
+        metavar="SECONDS",
+        help="Delay before the first retry, doubled each time (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        metavar="SECONDS",
+        help="Per-request timeout (default: %(default)s)",
+    )
+    parser.add_argument("--limit", type=int, metavar="N", help="Fix at most N commits")
+    parser.add_argument(
+        "--no-auto-fix",
+        action="store_true",
+        help="Send every commit to the backend, without auto-fixing mechanical issues first",
+    )
+    parser.add_argument(
+        "--retry-rejected",
+        action="store_true",
+        help="Also resend commits whose previous fix failed re-validation",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main function"""
+    args = parse_args(argv)
+
+    print("=" * 60)
+    print("AI Fix Pipeline")
+    print("=" * 60)
+    print()
+
+    if not os.path.exists(args.report):
+        print(f"❌ Error: File not found {args.report}")
+        return 1
+    try:
+        backend = load_backend(args.backend)
+    except (ValueError, ImportError, AttributeError) as e:
+        print(f"❌ Error: {e}")
+        return 1
+
+    print(f"🤖 Backend: {backend.name}, {args.concurrency} requests in flight")
+    stats = asyncio.run(
+        run_pipeline(
+            args.report,
+            backend,
+            batch_size=max(1, args.batch_size),
+            concurrency=max(1, args.concurrency),
+            retries=max(0, args.retries),
+            backoff=args.backoff,
+            timeout=args.timeout,
+            retry_rejected=args.retry_rejected,
+            limit=args.limit,
+            auto_fix=not args.no_auto_fix,
+        )
+    )
+
+    print()
+    if stats.resumed:
+        print(f"♻️  Resumed {stats.resumed} results from an interrupted run")
+    if stats.auto_fixed:
+        print(f"🔧 Auto-fixed {stats.auto_fixed} commits without the backend")
+    print(
+        f"📊 {stats.pending} commits sent: {stats.accepted} accepted, "
+        f"{stats.rejected} rejected by the rules, {stats.failed} failed "
+        f"({stats.retries} retries, {stats.seconds:.1f}s)"
+    )
+    print(f"✅ Fix plan updated: {args.report}")
+    return 1 if stats.failed else 0
+
+
+if __name__ == "__main__":
+    exit(main())
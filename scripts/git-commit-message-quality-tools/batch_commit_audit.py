@@ -0,0 +1,286 @@
+#!/usr/bin/env python3
+"""
+Batch Commit Audit
+Checks many repositories in one process: git ingestion runs concurrently
+on threads, validation runs on one shared process pool
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Dict, List, Optional
+from fix_report import issue_key, open_report_writer
+from repo_discovery import discover_repos, is_git_repo
+from unified_commit_checker import (
+    BACKEND_GIT_LOG,
+    BACKEND_ODB,
+    RULE_SOURCE_FILES,
+    CommitChecker,
+    check_messages,
+)
+from commit_verdict_cache import VerdictCache, compute_rules_version, default_cache_path
+
+DEFAULT_REPORT_DIR = "/tmp/unified_commit_audit"
+SUMMARY_FILE = "summary.json"
+
+# git log output is I/O-bound, so more readers than cores keeps the pool fed
+DEFAULT_INGEST_THREADS = 8
+
+
+def report_names(repos: List[str]) -> Dict[str, str]:
+    """Unique report file stem per repository"""
+    names = {}
+    used = set()
+    for repo in repos:
+        base = os.path.basename(repo.rstrip(os.sep)) or "repo"
+        name = base
+        suffix = 2
+        while name in used:
+            name = f"{base}-{suffix}"
+            suffix += 1
+        used.add(name)
+        names[repo] = name
+    return names
+
+
+def audit_repo(
+    repo: str,
+    report_file: str,
+    pool: Executor,
+    jobs: int,
+    backend: str = BACKEND_GIT_LOG,
+    use_cache: bool = True,
+    index_path: Optional[str] = None,
+) -> Dict:
+    """Check one repository on the shared pool, returns its summary entry"""
+    start = time.perf_counter()
+    entry = {"repo": repo, "report": report_file}
+    cache = None
+    try:
+        if not is_git_repo(repo):
+            raise FileNotFoundError(f"Not a git repository: {repo}")
+        checker = CommitChecker(repo, jobs=jobs, backend=backend, pool=pool, quiet=True)
+        cache_path = default_cache_path(repo) if use_cache else None
+        if cache_path:
+            cache = VerdictCache(cache_path, compute_rules_version(RULE_SOURCE_FILES))
+        with open_report_writer(report_file) as report:
+            problems = checker.check_all(cache, report)
+        if index_path is not None:
+            # One connection per reader thread; the index serialises the writes
+            from commit_issue_index import IssueIndex
+
+            index = IssueIndex(index_path)
+            try:
+                index.update(repo, cache)
+            finally:
+                index.close()
+    except Exception as e:
+        entry["error"] = str(e)
+        entry["seconds"] = round(time.perf_counter() - start, 3)
+        return entry
+    finally:
+        if cache is not None:
+            cache.close()
+
+    issue_types = {}
+    for problem in problems:
+        for issue in problem.issues:
+            key = issue_key(issue)
+            issue_types[key] = issue_types.get(key, 0) + 1
+
+    entry.update(
+        {
+            "commits": checker.total_commits,
+            "problems": len(problems),
+            "issue_types": issue_types,
+            "seconds": round(time.perf_counter() - start, 3),
+        }
+    )
+    return entry
+
+
+def audit_repos(
+    repos: List[str],
+    report_dir: str,
+    jobs: int,
+    ingest_threads: int = DEFAULT_INGEST_THREADS,
+    backend: str = BACKEND_GIT_LOG,
+    use_cache: bool = True,
+    index_path: Optional[str] = None,
+) -> Dict:
+    """Audit all repositories, returns the aggregated summary"""
+    os.makedirs(report_dir, exist_ok=True)
+    names = report_names(repos)
+    start = time.perf_counter()
+
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        # Start the workers (and compile their rules) before any reader
+        # thread exists: forking while threads hold locks can deadlock
+        pool.submit(check_messages, []).result()
+
+        with ThreadPoolExecutor(max_workers=ingest_threads) as readers:
+            futures = [
+                readers.submit(
+                    audit_repo,
+                    repo,
+                    os.path.join(report_dir, f"{names[repo]}.jsonl"),
+                    pool,
+                    jobs,
+                    backend,
+                    use_cache,
+                    index_path,
+                )
+                for repo in repos
+            ]
+            results = []
+            for future in futures:
+                entry = future.result()
+                results.append(entry)
+                print_repo_result(entry)
+
+    elapsed = time.perf_counter() - start
+    issue_types = {}
+    for entry in results:
+        for issue, count in entry.get("issue_types", {}).items():
+            issue_types[issue] = issue_types.get(issue, 0) + count
+
+    return {
+        "repos": len(results),
+        "failed_repos": sum(1 for entry in results if "error" in entry),
+        "commits": sum(entry.get("commits", 0) for entry in results),
+        "problems": sum(entry.get("problems", 0) for entry in results),
+        "issue_types": dict(sorted(issue_types.items(), key=lambda x: x[1], reverse=True)),
+        "seconds": round(elapsed, 3),
+        "repos_per_minute": round(len(results) / elapsed * 60, 1) if elapsed else None,
+        "results": results,
+    }
+
+
+def print_repo_result(entry: Dict):
+    """One line per finished repository"""
+    if "error" in entry:
+        print(f"  ❌ {entry['repo']}: {entry['error']}")
+    elif entry["problems"]:
+        print(
+            f"  ⚠️  {entry['repo']}: {entry['problems']}/{entry['commits']} "
+            f"problematic commits ({entry['seconds']:.1f}s)"
+        )
+    else:
+        print(f"  ✅ {entry['repo']}: {entry['commits']} commits ({entry['seconds']:.1f}s)")
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Audit commit messages across many repositories")
+    parser.add_argument("repos", nargs="*", metavar="REPO", help="Repository paths")
+    parser.add_argument(
+        "--repos-under",
+        action="append",
+        default=[],
+        metavar="DIR",
+        help="Audit every git repository directly inside DIR (repeatable)",
+    )
+    parser.add_argument(
+        "--repos-file",
+        metavar="FILE",
+        help="Read repository paths from FILE, one per line",
+    )
+    parser.add_argument(
+        "--report-dir",
+        default=DEFAULT_REPORT_DIR,
+        help="Directory for per-repo reports and summary.json (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=0,
+        metavar="N",
+        help="Validation worker processes shared by all repos (default: one per CPU)",
+    )
+    parser.add_argument(
+        "--ingest-threads",
+        type=int,
+        default=DEFAULT_INGEST_THREADS,
+        metavar="N",
+        help="Repositories read concurrently (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=[BACKEND_GIT_LOG, BACKEND_ODB],
+        default=BACKEND_GIT_LOG,
+        help="Commit source, as for unified_commit_checker.py",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Validate every commit instead of reusing cached verdicts",
+    )
+    parser.add_argument(
+        "--index",
+        metavar="FILE",
+        help="Add each repository's new commits to this shared issue index "
+        "(see commit_issue_index.py)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main function"""
+    args = parse_args(argv)
+
+    paths = list(args.repos)
+    if args.repos_file:
+        with open(args.repos_file, "r", encoding="utf-8") as f:
+            paths.extend(line.strip() for line in f if line.strip() and not line.startswith("#"))
+    repos = discover_repos(paths, args.repos_under)
+
+    print("=" * 60)
+    print("Batch Commit Audit")
+    print("=" * 60)
+    print()
+
+    if not repos:
+        print("❌ No repositories given (use REPO..., --repos-under or --repos-file)")
+        return 1
+
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    print(f"🔍 Auditing {len(repos)} repositories ({jobs} workers)...")
+    print()
+
+    summary = audit_repos(
+        repos,
+        args.report_dir,
+        jobs,
+        ingest_threads=max(1, args.ingest_threads),
+        backend=args.backend,
+        use_cache=not args.no_cache,
+        index_path=args.index,
+    )
+
+    summary_file = os.path.join(args.report_dir, SUMMARY_FILE)
+    with open(summary_file, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2, ensure_ascii=False)
+
+    print()
+    print(
+        f"📊 {summary['repos']} repos, {summary['commits']} commits, "
+        f"{summary['problems']} problematic commits in {summary['seconds']:.1f}s "
+        f"({summary['repos_per_minute']} repos/min)"
+    )
+    if summary["issue_types"]:
+        print()
+        print("Issue type statistics:")
+        for issue, count in summary["issue_types"].items():
+            print(f"  {issue}: {count} commits")
+    print()
+    print(f"✅ Reports saved to: {args.report_dir}")
+    print(f"✅ Summary saved to: {summary_file}")
+
+    return 1 if summary["failed_repos"] else 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,721 @@
+#!/usr/bin/env python3
+"""
+Commit Validator Benchmarks
+Builds reproducible synthetic message corpora and repositories, measures
+the validators and compares the results against a saved baseline
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import random
+import re
+import resource
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from commit_validation_config import EMOJIS, INCOMPLETE_LIST_MARKERS
+
+# Relative drop in throughput that counts as a regression
+DEFAULT_TOLERANCE = 0.2
+
+WORDS = [
+    "add", "fix", "update", "remove", "refactor", "session", "agent", "stream",
+    "message", "handler", "cache", "config", "parser", "socket", "timeout",
+    "dashboard", "heatmap", "repo", "commit", "query", "schema", "state",
+]
+TYPES = ["feat", "fix", "docs", "refactor", "test", "chore", "perf"]
+CJK_CHARS = "修复添加更新删除会话消息配置"
+
+
+class CorpusSpec:
+    """Parameters of a synthetic message corpus"""
+
+    def __init__(
+        self,
+        commits: int = 5000,
+        seed: int = 42,
+        body_lines: float = 12.0,
+        emoji_density: float = 0.05,
+        cjk_density: float = 0.02,
+        chaos_density: float = 0.05,
+    ):
+        self.commits = commits
+        self.seed = seed
+        self.body_lines = body_lines
+        self.emoji_density = emoji_density
+        self.cjk_density = cjk_density
+        self.chaos_density = chaos_density
+
+    def to_dict(self) -> Dict:
+        return dict(vars(self))
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    return " ".join(rng.choice(WORDS) for _ in range(words))
+
+
+def _body_line(rng: random.Random, spec: CorpusSpec) -> str:
+    """Produce one body line, occasionally with rule-triggering content"""
+    roll = rng.random()
+    if roll < 0.15:
+        return ""
+    if roll < 0.20:
+        return rng.choice(INCOMPLETE_LIST_MARKERS)
+    if roll < 0.20 + spec.chaos_density:
+        return rng.choice(
+            [
+                f"{_sentence(rng, 3)}## {_sentence(rng, 2)}",
+                f"{_sentence(rng, 2)} ## {_sentence(rng, 4)}",
+                f"```python {_sentence(rng, 12)}```",
+            ]
+        )
+    line = f"- {_sentence(rng, rng.randint(3, 14))}"
+    if rng.random() < spec.emoji_density:
+        line = f"{rng.choice(EMOJIS)} {line}"
+    if rng.random() < spec.cjk_density:
+        line += " " + "".join(rng.choice(CJK_CHARS) for _ in range(4))
+    return line
+
+
+def generate_messages(spec: CorpusSpec) -> List[Tuple[str, str]]:
+    """Generate (subject, body) pairs; identical for identical specs"""
+    rng = random.Random(spec.seed)
+    messages = []
+    for _ in range(spec.commits):
+        subject = f"{rng.choice(TYPES)}({rng.choice(WORDS)}): {_sentence(rng, rng.randint(3, 10))}"
+        if rng.random() < spec.emoji_density:
+            subject = f"{rng.choice(TYPES)}: {rng.choice(EMOJIS)} {_sentence(rng, 4)}"
+        if rng.random() < spec.cjk_density:
+            subject += " " + rng.choice(CJK_CHARS)
+        if rng.random() < 0.01:
+            subject += "  ****"
+
+        # Log-normal line counts: most bodies short, a long tail of huge ones
+        lines = int(rng.lognormvariate(0, 1) * spec.body_lines)
+        body = "\n".join(_body_line(rng, spec) for _ in range(lines)).strip()
+        messages.append((subject, body))
+    return messages
+
+
+def build_synthetic_repo(path: str, messages: List[Tuple[str, str]]) -> str:
+    """Create a local repository whose history carries the given messages"""
+    subprocess.run(["git", "init", "-q", path], check=True)
+    process = subprocess.Popen(
+        ["git", "fast-import", "--quiet"], stdin=subprocess.PIPE, cwd=path
+    )
+    timestamp = 1700000000
+    for index, (subject, body) in enumerate(messages):
+        message = f"{subject}\n\n{body}\n" if body else f"{subject}\n"
+        data = message.encode("utf-8")
+        content = f"{index}\n".encode()
+        process.stdin.write(
+            b"commit refs/heads/main\n"
+            + f"committer Bench <bench@example.com> {timestamp + index * 60} +0000\n".encode()
+            + f"data {len(data)}\n".encode()
+            + data
+            + f"M 644 inline file.txt\ndata {len(content)}\n".encode()
+            + content
+            + b"\n"
+        )
+    process.stdin.close()
+    if process.wait() != 0:
+        raise RuntimeError("git fast-import failed")
+    subprocess.run(["git", "-C", path, "checkout", "-q", "main"], check=True)
+    return path
+
+
+# Benchmark workers must not start out sharing this process's pages (the
+# corpus alone can be larger than what is measured): a forkserver is a
+# freshly exec-ed process, and children forked from it start small
+ISOLATED_CONTEXT = multiprocessing.get_context(
+    "forkserver" if "forkserver" in multiprocessing.get_all_start_methods() else "spawn"
+)
+
+
+def peak_rss_kb() -> int:
+    """Peak resident set size of this process in KB"""
+    # ru_maxrss survives fork and exec on Linux; the address space's own
+    # high-water mark does not
+    try:
+        with open("/proc/self/status", encoding="ascii") as f:
+            for line in f:
+                if line.startswith("VmHWM:"):
+                    return int(line.split()[1])
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS reports bytes, Linux reports kilobytes
+    return peak // 1024 if sys.platform == "darwin" else peak
+
+
+# --- Benchmarks ------------------------------------------------------------
+# Each returns (items_processed, elapsed_seconds) and runs in a fresh process
+# so its peak RSS is measured in isolation.
+
+
+def bench_check_commit(spec: CorpusSpec, repo: str) -> Tuple[int, float]:
+    from commit_record import CommitRecord
+    from unified_commit_checker import CommitChecker
+
+    checker = CommitChecker(repo)
+    commits = [
+        CommitRecord(i.to_bytes(20, "big"), s, b.encode("utf-8"))
+        for i, (s, b) in enumerate(generate_messages(spec))
+    ]
+    start = time.perf_counter()
+    for commit in commits:
+        checker.check_commit(commit)
+    return len(commits), time.perf_counter() - start
+
+
+def bench_check_many(spec: CorpusSpec, repo: str) -> Tuple[int, float]:
+    from commit_rule_engine import get_rule_engine
+    from unified_commit_checker import CHECK_BATCH_SIZE, iter_batches
+
+    engine = get_rule_engine()
+    messages = generate_messages(spec)
+    start = time.perf_counter()
+    for batch in iter_batches(messages, CHECK_BATCH_SIZE):
+        engine.check_many(batch)
+    return len(messages), time.perf_counter() - start
+
+
+def bench_validate(spec: CorpusSpec, repo: str) -> Tuple[int, float]:
+    from commit_msg_validator import CommitMessageValidator
+
+    messages = [f"{s}\n\n{b}" if b else s for s, b in generate_messages(spec)]
+    start = time.perf_counter()
+    for message in messages:
+        CommitMessageValidator(message).validate()
+    return len(messages), time.perf_counter() - start
+
+
+def bench_validate_batch(spec: CorpusSpec, repo: str) -> Tuple[int, float]:
+    from commit_msg_validator import validate_messages
+
+    messages = [f"{s}\n\n{b}" if b else s for s, b in generate_messages(spec)]
+    start = time.perf_counter()
+    count = sum(1 for _ in validate_messages(messages))
+    return count, time.perf_counter() - start
+
+
+def bench_get_all_commits(spec: CorpusSpec, repo: str) -> Tuple[int, float]:
+    from unified_commit_checker import CommitChecker
+
+    start = time.perf_counter()
+    count = sum(1 for _ in CommitChecker(repo).iter_commits())
+    return count, time.perf_counter() - start
+
+
+def bench_check_all(spec: CorpusSpec, repo: str) -> Tuple[int, float]:
+    # Peak RSS here is dominated by the problem list a full check keeps
+    from unified_commit_checker import CommitChecker
+
+    checker = CommitChecker(repo, quiet=True)
+    start = time.perf_counter()
+    checker.check_all()
+    return checker.total_commits, time.perf_counter() - start
+
+
+def bench_odb_commits(spec: CorpusSpec, repo: str) -> Tuple[int, float]:
+    from unified_commit_checker import BACKEND_ODB, CommitChecker
+
+    start = time.perf_counter()
+    count = sum(1 for _ in CommitChecker(repo, backend=BACKEND_ODB).iter_commits())
+    return count, time.perf_counter() - start
+
+
+BENCHMARKS: Dict[str, Callable[[CorpusSpec, str], Tuple[int, float]]] = {
+    "check_commit": bench_check_commit,
+    "check_many": bench_check_many,
+    "validate": bench_validate,
+    "validate_batch": bench_validate_batch,
+    "get_all_commits": bench_get_all_commits,
+    "check_all": bench_check_all,
+    "odb_commits": bench_odb_commits,
+}
+
+
+def _run_isolated(name: str, spec: CorpusSpec, repo: str) -> Dict:
+    """Worker entry point: run one benchmark and report its own peak RSS"""
+    count, elapsed = BENCHMARKS[name](spec, repo)
+    return {
+        "items": count,
+        "seconds": round(elapsed, 4),
+        "per_sec": round(count / elapsed, 1) if elapsed else None,
+        "peak_rss_kb": peak_rss_kb(),
+    }
+
+
+def measure_rule_costs(spec: CorpusSpec) -> Dict[str, float]:
+    """Microseconds per message each rule adds over an empty rule set"""
+    from commit_rule_engine import ALL_RULES, RuleEngine
+
+    messages = generate_messages(spec)
+
+    def run(engine: RuleEngine) -> float:
+        start = time.perf_counter()
+        for subject, body in messages:
+            engine.find(subject, body)
+        return time.perf_counter() - start
+
+    base = run(RuleEngine([]))
+    costs = {}
+    for rule in ALL_RULES:
+        extra = max(run(RuleEngine([rule])) - base, 0.0)
+        costs[rule] = round(extra / len(messages) * 1e6, 3)
+    return costs
+
+
+# --- Hook startup ----------------------------------------------------------
+# A commit-msg hook is a fresh interpreter per commit, so what matters is the
+# end-to-end time of one call, not throughput.
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_STARTUP_RUNS = 20
+
+# Hook inputs by path taken: skipped, fast path, full rules (valid/invalid)
+STARTUP_MESSAGES = {
+    "skipped": "Merge branch 'main' into feature\n",
+    "plain": "fix(parser): handle empty input\n\nReturn early instead of raising.\n",
+    "full-rules": "docs: describe setup\n\n## Install\n\nRun the installer.\n",
+    "invalid": "feat: add ✨ sparkle\n\n****\n",
+}
+
+# Hook entry points timed: the client .husky/commit-msg runs, with no
+# server (in-process fallback) and with one, then the validator directly
+CLIENT_SCRIPT = "commit_msg_client.py"
+VALIDATOR_SCRIPT = "commit_msg_validator.py"
+HOOK_CLIENT = "client"
+HOOK_CLIENT_SERVER = "client+server"
+HOOK_VALIDATOR = "validator"
+SERVER_IDLE_TIMEOUT = 600
+
+IMPORTTIME_RE = re.compile(r"^import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def hook_command(script: str, message_file: str, importtime: bool = False) -> List[str]:
+    command = [sys.executable]
+    if importtime:
+        command += ["-X", "importtime"]
+    return command + [os.path.join(SCRIPT_DIR, script), message_file]
+
+
+def parse_importtime(stderr: str) -> Dict[str, float]:
+    """Top-level modules the hook imported after startup -> cumulative ms"""
+    modules = {}
+    after_site = False
+    for line in stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if not match or match.group(3):
+            continue  # Nested imports are included in their parent's time
+        name = match.group(4)
+        if after_site:
+            modules[name] = round(int(match.group(2)) / 1000, 3)
+        elif name == "site":
+            after_site = True
+    return modules
+
+
+def time_hook_calls(script: str, message_file: str, env: Dict[str, str], runs: int) -> Dict:
+    """Median wall time, exit code and import breakdown of one hook call"""
+    timings = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        subprocess.run(hook_command(script, message_file), capture_output=True, env=env)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+
+    traced = subprocess.run(
+        hook_command(script, message_file, importtime=True), capture_output=True, text=True, env=env
+    )
+    return {
+        "median_ms": round(timings[len(timings) // 2] * 1000, 2),
+        "exit_code": traced.returncode,
+        "imports_ms": parse_importtime(traced.stderr),
+    }
+
+
+def start_validation_server(socket_path: str) -> subprocess.Popen:
+    """Start commit_msg_server.py on a private socket, once its rules are compiled"""
+    process = subprocess.Popen(
+        [
+            sys.executable,
+            os.path.join(SCRIPT_DIR, "commit_msg_server.py"),
+            "--socket",
+            socket_path,
+            "--idle-timeout",
+            str(SERVER_IDLE_TIMEOUT),
+        ],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    # The server announces itself after compiling the rules and binding
+    process.stdout.readline()
+    if not os.path.exists(socket_path):
+        process.kill()
+        process.wait()
+        raise RuntimeError("validation server did not start")
+    return process
+
+
+def stop_validation_server(process: subprocess.Popen):
+    # SIGINT lets the server remove its socket on the way out
+    process.send_signal(signal.SIGINT)
+    try:
+        process.wait(timeout=5)
+    except subprocess.TimeoutExpired:
+        process.kill()
+        process.wait()
+    process.stdout.close()
+
+
+def measure_hook_startup(runs: int) -> Dict[str, Dict]:
+    """Hook call timings per entry point and input, keyed "<entry>/<input>"
+
+    .husky/commit-msg runs the client: without a server it validates
+    in-process, with one it sends the message over the socket. The
+    validator's own time is the in-process path without the client.
+    """
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="commit-bench-hook-") as tmp:
+        message_files = {}
+        for case, message in STARTUP_MESSAGES.items():
+            message_files[case] = os.path.join(tmp, f"{case}.txt")
+            with open(message_files[case], "w", encoding="utf-8") as f:
+                f.write(message)
+
+        # A socket of our own, so a server the user runs is never involved
+        socket_path = os.path.join(tmp, "server", "validator.sock")
+        env = dict(os.environ, COMMIT_MSG_VALIDATOR_SOCKET=socket_path)
+
+        for case, message_file in message_files.items():
+            results[f"{HOOK_CLIENT}/{case}"] = time_hook_calls(CLIENT_SCRIPT, message_file, env, runs)
+
+        server = start_validation_server(socket_path)
+        try:
+            for case, message_file in message_files.items():
+                results[f"{HOOK_CLIENT_SERVER}/{case}"] = time_hook_calls(
+                    CLIENT_SCRIPT, message_file, env, runs
+                )
+        finally:
+            stop_validation_server(server)
+
+        for case, message_file in message_files.items():
+            results[f"{HOOK_VALIDATOR}/{case}"] = time_hook_calls(
+                VALIDATOR_SCRIPT, message_file, env, runs
+            )
+    return results
+
+
+# --- Sharded ingestion -------------------------------------------------------
+# A main line with many feature branches forked along it, committed in
+# between main commits, half of them merged back. Correctness of the shards
+# is covered by tests/test_sharded_commit_reader.py; this only times them.
+
+SHARDING_BRANCHES = 48
+SHARDING_RUNS = 3
+
+
+def commit_message(subject: str, body: str) -> str:
+    """Raw message text as build_synthetic_repo writes it"""
+    return f"{subject}\n\n{body}\n" if body else f"{subject}\n"
+
+
+def add_feature_branches(repo: str, messages: List[Tuple[str, str]], branches: int) -> None:
+    """Spread the messages over branches forked along main, merging every other one"""
+    main_hashes = subprocess.run(
+        ["git", "rev-list", "--reverse", "main"],
+        capture_output=True, text=True, cwd=repo, check=True,
+    ).stdout.split()
+    per_branch = max(1, len(messages) // branches)
+    stream = []
+    for branch in range(branches):
+        fork = len(main_hashes) * (branch + 1) // (branches + 1)
+        ref = f"refs/heads/feature-{branch}"
+        stream.append(f"reset {ref}\nfrom {main_hashes[fork]}\n\n".encode())
+        for index, (subject, body) in enumerate(messages[branch * per_branch:(branch + 1) * per_branch]):
+            data = commit_message(subject, body).encode("utf-8")
+            # Between main's own commits (build_synthetic_repo's 60s steps)
+            timestamp = 1700000000 + fork * 60 + index * 60 + 1 + branch % 59
+            stream.append(
+                f"commit {ref}\n"
+                f"committer Bench <bench@example.com> {timestamp} +0000\n"
+                f"data {len(data)}\n".encode()
+                + data
+                + b"\n"
+            )
+    stream.append(f"reset refs/heads/main\nfrom {main_hashes[-1]}\n\n".encode())
+    for branch in range(0, branches, 2):
+        data = f"Merge branch 'feature-{branch}'\n".encode()
+        stream.append(
+            b"commit refs/heads/main\n"
+            + f"committer Bench <bench@example.com> {1800000000 + branch} +0000\n".encode()
+            + f"data {len(data)}\n".encode()
+            + data
+            + f"merge refs/heads/feature-{branch}\n\n".encode()
+        )
+    subprocess.run(["git", "fast-import", "--quiet"], input=b"".join(stream), cwd=repo, check=True)
+
+
+def time_ingest(checker) -> Tuple[int, float]:
+    """Best-of-SHARDING_RUNS time to read every selected commit, with the count"""
+    best = None
+    for _ in range(SHARDING_RUNS):
+        start = time.perf_counter()
+        count = sum(1 for _ in checker.iter_commits())
+        elapsed = time.perf_counter() - start
+        best = elapsed if best is None else min(best, elapsed)
+    return count, best
+
+
+def measure_sharding(spec: CorpusSpec, shards: int) -> Dict[str, Dict]:
+    """Wall-clock time of sharded reads against the single git log --all stream"""
+    from sharded_commit_reader import SHARD_DATES, SHARD_REFS
+    from unified_commit_checker import CommitChecker
+
+    messages = generate_messages(spec)
+    results = {}
+    with tempfile.TemporaryDirectory(prefix="commit-bench-") as tmp:
+        repo = build_synthetic_repo(os.path.join(tmp, "repo"), messages[: len(messages) // 2])
+        add_feature_branches(repo, messages[len(messages) // 2:], SHARDING_BRANCHES)
+
+        # Without a commit-graph every walk parses commits; with one,
+        # listing and cutting history is nearly free
+        layouts = [
+            ("no commit-graph", []),
+            ("commit-graph", [["git", "commit-graph", "write", "--reachable"]]),
+        ]
+        for layout, commands in layouts:
+            for command in commands:
+                subprocess.run(command, cwd=repo, check=True, capture_output=True)
+
+            count, single = time_ingest(CommitChecker(repo))
+            result = {"commits": count, "single_s": round(single, 4)}
+            for shard_by in (SHARD_REFS, SHARD_DATES):
+                _, elapsed = time_ingest(CommitChecker(repo, shards=shards, shard_by=shard_by))
+                result[f"{shard_by}_s"] = round(elapsed, 4)
+            results[layout] = result
+    return results
+
+
+def compare_to_baseline(
+    results: Dict, baseline: Dict, tolerance: float
+) -> Tuple[List[str], List[str]]:
+    """Compare with a previous run, returns (regressions, new_rules)"""
+    regressions = []
+    for name, current in results["benchmarks"].items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if not previous or not previous.get("per_sec") or not current.get("per_sec"):
+            continue
+        drop = 1 - current["per_sec"] / previous["per_sec"]
+        if drop > tolerance:
+            regressions.append(
+                f"{name}: {current['per_sec']:.0f}/s vs {previous['per_sec']:.0f}/s "
+                f"({drop:.0%} slower)"
+            )
+
+    for name, current in results["benchmarks"].items():
+        previous = baseline.get("benchmarks", {}).get(name)
+        if not previous or not previous.get("peak_rss_kb"):
+            continue
+        growth = current["peak_rss_kb"] / previous["peak_rss_kb"] - 1
+        if growth > tolerance:
+            regressions.append(
+                f"{name}: peak RSS {current['peak_rss_kb'] / 1024:,.1f} MB vs "
+                f"{previous['peak_rss_kb'] / 1024:,.1f} MB ({growth:.0%} more)"
+            )
+
+    for case, current in results.get("hook_startup", {}).items():
+        previous = baseline.get("hook_startup", {}).get(case)
+        if not previous:
+            continue
+        growth = current["median_ms"] / previous["median_ms"] - 1
+        if growth > tolerance:
+            regressions.append(
+                f"hook startup ({case}): {current['median_ms']:.1f} ms vs "
+                f"{previous['median_ms']:.1f} ms ({growth:.0%} slower)"
+            )
+
+    old_rules = baseline.get("rule_costs_us", {})
+    new_rules = [
+        f"{rule}: {cost:.2f} µs/message"
+        for rule, cost in results["rule_costs_us"].items()
+        if rule not in old_rules
+    ]
+    return regressions, new_rules
+
+
+def run_sharding(spec: CorpusSpec, shards: int, output: Optional[str]) -> int:
+    """--sharding: print (and optionally save) the sharded ingestion timings"""
+    from sharded_commit_reader import SHARD_DATES, SHARD_REFS
+
+    print(
+        f"🧩 Timing sharded history reads ({spec.commits} commits, "
+        f"{SHARDING_BRANCHES} branches, {shards} shards, {os.cpu_count()} CPUs)..."
+    )
+    timings = measure_sharding(spec, shards)
+    for layout, result in timings.items():
+        single = result["single_s"]
+        print(f"  {layout}: single stream {result['commits']:,} commits in {single:.3f}s")
+        for shard_by in (SHARD_REFS, SHARD_DATES):
+            elapsed = result[f"{shard_by}_s"]
+            print(f"    {shard_by:<6} {elapsed:>8.3f}s  ({single / elapsed:.2f}x)")
+    print()
+
+    if output:
+        results = {
+            "python": platform.python_version(),
+            "corpus": spec.to_dict(),
+            "shards": shards,
+            "sharding": timings,
+        }
+        with open(output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"✅ Results saved to: {output}")
+    return 0
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    defaults = CorpusSpec()
+    parser = argparse.ArgumentParser(description="Benchmark the commit validators")
+    parser.add_argument("--commits", type=int, default=defaults.commits)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+    parser.add_argument(
+        "--body-lines",
+        type=float,
+        default=defaults.body_lines,
+        help="Median body length in lines (log-normal distribution)",
+    )
+    parser.add_argument("--emoji-density", type=float, default=defaults.emoji_density)
+    parser.add_argument("--cjk-density", type=float, default=defaults.cjk_density)
+    parser.add_argument("--chaos-density", type=float, default=defaults.chaos_density)
+    parser.add_argument(
+        "--only",
+        action="append",
+        choices=sorted(BENCHMARKS),
+        help="Run only the named benchmark (repeatable)",
+    )
+    parser.add_argument(
+        "--sharding",
+        type=int,
+        metavar="N",
+        help=f"Instead of benchmarking, time reading a repository with "
+        f"{SHARDING_BRANCHES} feature branches with N shards per --shard-by "
+        "mode against the single git log stream",
+    )
+    parser.add_argument(
+        "--startup-runs",
+        type=int,
+        default=DEFAULT_STARTUP_RUNS,
+        metavar="N",
+        help="Hook invocations timed per input for the startup benchmark; "
+        "0 skips it (default: %(default)s)",
+    )
+    parser.add_argument("--output", help="Write results JSON to this file")
+    parser.add_argument("--baseline", help="Compare against this results JSON")
+    parser.add_argument(
+        "--tolerance",
+        type=float,
+        default=DEFAULT_TOLERANCE,
+        help="Allowed relative throughput drop or peak RSS growth (default: %(default)s)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main function"""
+    args = parse_args(argv)
+    spec = CorpusSpec(
+        commits=args.commits,
+        seed=args.seed,
+        body_lines=args.body_lines,
+        emoji_density=args.emoji_density,
+        cjk_density=args.cjk_density,
+        chaos_density=args.chaos_density,
+    )
+
+    print("=" * 60)
+    print("Commit Validator Benchmarks")
+    print("=" * 60)
+    print()
+
+    if args.sharding is not None:
+        return run_sharding(spec, args.sharding, args.output)
+
+    results = {
+        "python": platform.python_version(),
+        "corpus": spec.to_dict(),
+        "benchmarks": {},
+        "rule_costs_us": {},
+        "hook_startup": {},
+    }
+
+    with tempfile.TemporaryDirectory(prefix="commit-bench-") as tmp:
+        repo = os.path.join(tmp, "repo")
+        print(f"🏗️  Building synthetic repository ({spec.commits} commits)...")
+        build_synthetic_repo(repo, generate_messages(spec))
+        print()
+
+        for name in args.only or BENCHMARKS:
+            # A fresh process per benchmark keeps peak RSS attributable
+            with ProcessPoolExecutor(max_workers=1, mp_context=ISOLATED_CONTEXT) as pool:
+                result = pool.submit(_run_isolated, name, spec, repo).result()
+            results["benchmarks"][name] = result
+            print(
+                f"  {name:<20} {result['per_sec']:>12,.0f}/s  "
+                f"{result['seconds']:>8.3f}s  peak RSS {result['peak_rss_kb'] / 1024:,.1f} MB"
+            )
+        print()
+
+    if args.startup_runs > 0:
+        print(f"Hook startup (median of {args.startup_runs} calls, slowest imports):")
+        results["hook_startup"] = measure_hook_startup(args.startup_runs)
+        for case, result in results["hook_startup"].items():
+            imports = sorted(result["imports_ms"].items(), key=lambda x: -x[1])[:3]
+            breakdown = ", ".join(f"{name} {ms:.1f}" for name, ms in imports) or "-"
+            print(
+                f"  {case:<24} {result['median_ms']:>7.1f} ms  "
+                f"exit {result['exit_code']}  imports (ms): {breakdown}"
+            )
+        print()
+
+    print("Per-rule cost (µs/message over an empty rule set):")
+    results["rule_costs_us"] = measure_rule_costs(spec)
+    for rule, cost in sorted(results["rule_costs_us"].items(), key=lambda x: -x[1]):
+        print(f"  {rule:<28} {cost:>8.3f}")
+    print()
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(results, f, indent=2, ensure_ascii=False)
+        print(f"✅ Results saved to: {args.output}")
+
+    if args.baseline:
+        with open(args.baseline, "r", encoding="utf-8") as f:
+            baseline = json.load(f)
+        regressions, new_rules = compare_to_baseline(results, baseline, args.tolerance)
+        if new_rules:
+            print("📏 Rules added since baseline:")
+            for rule in new_rules:
+                print(f"  - {rule}")
+        if regressions:
+            print("⚠️  Regressions against baseline:")
+            for regression in regressions:
+                print(f"  - {regression}")
+            return 1
+        print("✅ No regressions against baseline")
+
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Commit Message Auto-Fixer
+Repairs mechanically fixable issues (emoji, placeholders, markdown markers,
+spacing, marker-only and empty body lines) with the rule engine's own
+matchers, and leaves only what needs rewording for the AI step
+"""
+
+import argparse
+import os
+import re
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional
+from commit_rule_engine import (
+    EMOJI_SET,
+    FORMAT_RE,
+    INCOMPLETE_ENDING_RE,
+    INCOMPLETE_LIST_MARKER_SET,
+    TOKEN_CHINESE,
+    TOKEN_EMOJI,
+    TOKEN_MARKDOWN,
+    TOKEN_PLACEHOLDER,
+    TOKEN_SPACES,
+    get_rule_engine,
+    token_scanner,
+)
+from commit_validation_config import (
+    MAX_SUBJECT_LENGTH,
+    ISSUE_CONTAINS_PLACEHOLDER,
+    ISSUE_SUBJECT_TOO_LONG,
+    ISSUE_CONTAINS_CHINESE,
+    ISSUE_EMOJI_IN_SUBJECT,
+    ISSUE_MARKDOWN_IN_SUBJECT,
+    ISSUE_INVALID_FORMAT,
+    ISSUE_EMOJI_FIRST_LINE,
+    ISSUE_INCOMPLETE_LIST_ITEMS,
+    ISSUE_TOO_MANY_EMPTY_LINES,
+    ISSUE_INCOMPLETE_SUBJECT_ENDING,
+    ISSUE_MULTIPLE_SPACES,
+    ISSUE_MARKDOWN_CHAOS_IN_BODY,
+    ISSUE_MALFORMED_CODE_BLOCKS,
+)
+from fix_report import (
+    STATUS_ACCEPTED,
+    default_report_file,
+    issue_key,
+    iter_report,
+    open_report_writer,
+    report_format,
+)
+
+# Issues whose fix only deletes noise, never rewording: safe to apply unattended
+MECHANICAL_ISSUES = frozenset(
+    {
+        ISSUE_CONTAINS_PLACEHOLDER,
+        ISSUE_EMOJI_IN_SUBJECT,
+        ISSUE_MARKDOWN_IN_SUBJECT,
+        ISSUE_MULTIPLE_SPACES,
+        ISSUE_EMOJI_FIRST_LINE,
+        ISSUE_INCOMPLETE_LIST_ITEMS,
+        ISSUE_TOO_MANY_EMPTY_LINES,
+    }
+)
+
+# Lossy best-effort repairs (dropping Chinese text, truncating, guessing a
+# type prefix); only the offline pipeline backend uses them
+HEURISTIC_ISSUES = frozenset(
+    {
+        ISSUE_CONTAINS_CHINESE,
+        ISSUE_INVALID_FORMAT,
+        ISSUE_SUBJECT_TOO_LONG,
+        ISSUE_INCOMPLETE_SUBJECT_ENDING,
+        ISSUE_MARKDOWN_CHAOS_IN_BODY,
+        ISSUE_MALFORMED_CODE_BLOCKS,
+    }
+)
+
+# Token kinds each issue deletes, from subject and body respectively
+SUBJECT_TOKENS = {
+    ISSUE_CONTAINS_PLACEHOLDER: TOKEN_PLACEHOLDER,
+    ISSUE_EMOJI_IN_SUBJECT: TOKEN_EMOJI,
+    ISSUE_MARKDOWN_IN_SUBJECT: TOKEN_MARKDOWN,
+    ISSUE_MULTIPLE_SPACES: TOKEN_SPACES,
+    ISSUE_CONTAINS_CHINESE: TOKEN_CHINESE,
+}
+BODY_TOKENS = {
+    ISSUE_CONTAINS_PLACEHOLDER: TOKEN_PLACEHOLDER,
+    ISSUE_CONTAINS_CHINESE: TOKEN_CHINESE,
+}
+
+# Characters that extend a matched token into a run (`*****`, `###`, `   `)
+TOKEN_RUN_CHARS = {
+    TOKEN_PLACEHOLDER: "*",
+    TOKEN_MARKDOWN: "#",
+    TOKEN_SPACES: " ",
+    TOKEN_EMOJI: "\ufe0f",  # A stray variation selector after an emoji
+}
+
+AUTO_FIX_BACKEND = "auto"
+
+LIST_ITEM_RE = re.compile(r"\s*(?:[-*+]|\d+[.)])\s")
+TYPE_PREFIX_RE = re.compile(r"^([A-Za-z]+)(\([^)]*\))?\s*:\s*(.*)$")
+MARKDOWN_RUN_RE = re.compile(r"#{2,}")
+HEADING_RE = re.compile(r"^(\s*#{2,})\s*(.*)$")
+
+
+def strip_tokens(text: str, scanner: "re.Pattern") -> str:
+    """Delete every token the scanner finds in one left-to-right pass
+
+    Runs continue past the fixed-width match, and a run of spaces becomes
+    one space.
+    """
+    out = []
+    pos = 0
+    length = len(text)
+    for match in scanner.finditer(text):
+        start = match.start()
+        if start < pos:
+            continue  # Inside a run already consumed
+        out.append(text[pos:start])
+        kind = match.lastgroup
+        end = match.end()
+        run = TOKEN_RUN_CHARS.get(kind)
+        while end < length and text[end] == run:
+            end += 1
+        if kind == TOKEN_SPACES:
+            out.append(" ")
+        pos = end
+    out.append(text[pos:])
+    return "".join(out)
+
+
+def too_many_empty(lines: List[str]) -> bool:
+    """The too-many-empty-lines rule, on a list of body lines"""
+    empty = sum(1 for line in lines if not line.strip())
+    return len(lines) > 10 and empty > len(lines) * 0.3
+
+
+class AutoFixResult:
+    """Fixed text plus what the rules still flag on it"""
+
+    __slots__ = ("subject", "body", "resolved", "unresolved")
+
+    def __init__(self, subject: str, body: str, resolved: List[str], unresolved: List[str]):
+        self.subject = subject
+        self.body = body
+        self.resolved = resolved  # Original issues that no longer apply
+        self.unresolved = unresolved  # Issues the fixed text still has
+
+
+class AutoFixer:
+    """Applies the repairs for a set of issue types
+
+    Only repairs for issues a message was flagged with are applied, so
+    clean parts of a message are left byte-for-byte alone. The result is
+    re-checked with the full rule set.
+    """
+
+    def __init__(self, issues: Iterable[str] = MECHANICAL_ISSUES):
+        self.issues = frozenset(issues)
+        self.engine = get_rule_engine()
+
+    def fix(self, subject: str, body: str, issues: Iterable[str]) -> AutoFixResult:
+        """Repair a message flagged with `issues`"""
+        original = list(issues)
+        wanted = {issue_key(issue) for issue in original} & self.issues
+
+        subject = self._fix_subject(subject, wanted)
+        body = self._fix_body(body, wanted)
+
+        remaining = self.engine.check(subject, body)
+        still = {issue_key(issue) for issue in remaining}
+        resolved = [issue for issue in original if issue_key(issue) not in still]
+        return AutoFixResult(subject, body, resolved, remaining)
+
+    def _fix_subject(self, subject: str, wanted: FrozenSet[str]) -> str:
+        kinds = {SUBJECT_TOKENS[issue] for issue in wanted if issue in SUBJECT_TOKENS}
+        if kinds:
+            subject = " ".join(strip_tokens(subject, token_scanner(kinds)).split())
+
+        if ISSUE_INCOMPLETE_SUBJECT_ENDING in wanted:
+            while INCOMPLETE_ENDING_RE.search(subject):
+                subject = INCOMPLETE_ENDING_RE.sub("", subject).rstrip(" :")
+        if ISSUE_INVALID_FORMAT in wanted and subject and not FORMAT_RE.match(subject):
+            match = TYPE_PREFIX_RE.match(subject)
+            if match:
+                subject = f"{match.group(1).lower()}{match.group(2) or ''}: {match.group(3)}"
+            else:
+                subject = f"chore: {subject}"
+        if ISSUE_SUBJECT_TOO_LONG in wanted and len(subject) > MAX_SUBJECT_LENGTH:
+            cut = subject.rfind(" ", 0, MAX_SUBJECT_LENGTH + 1)
+            subject = subject[: cut if cut > 0 else MAX_SUBJECT_LENGTH].rstrip(" ,.;:-")
+        return subject
+
+    def _fix_body(self, body: str, wanted: FrozenSet[str]) -> str:
+        if not body:
+            return body
+
+        kinds = {BODY_TOKENS[issue] for issue in wanted if issue in BODY_TOKENS}
+        if kinds:
+            body = strip_tokens(body, token_scanner(kinds))
+        if ISSUE_MALFORMED_CODE_BLOCKS in wanted:
+            body = body.replace("```", "")
+
+        line_fixes = wanted & {
+            ISSUE_EMOJI_FIRST_LINE,
+            ISSUE_INCOMPLETE_LIST_ITEMS,
+            ISSUE_TOO_MANY_EMPTY_LINES,
+            ISSUE_MARKDOWN_CHAOS_IN_BODY,
+        }
+        if not line_fixes:
+            return body
+
+        drop_markers = ISSUE_INCOMPLETE_LIST_ITEMS in wanted
+        fix_chaos = ISSUE_MARKDOWN_CHAOS_IN_BODY in wanted
+        squeeze = ISSUE_TOO_MANY_EMPTY_LINES in wanted
+        lines = []
+        for line in body.split("\n"):
+            stripped = line.strip()
+            if drop_markers and stripped in INCOMPLETE_LIST_MARKER_SET:
+                continue
+            if fix_chaos and "##" in line:
+                heading = HEADING_RE.match(line)
+                if heading:
+                    line = f"{heading.group(1)} {heading.group(2)}".rstrip()
+                else:
+                    line = " ".join(MARKDOWN_RUN_RE.sub(" ", line).split())
+            if squeeze and not stripped and (not lines or not lines[-1].strip()):
+                continue  # At most one empty line in a row, none leading
+            lines.append(line)
+
+        if ISSUE_EMOJI_FIRST_LINE in wanted:
+            # Standalone emoji lines (and the gaps between them) at the top
+            while lines and (not lines[0].strip() or lines[0].strip() in EMOJI_SET):
+                lines.pop(0)
+
+        if squeeze and too_many_empty(lines):
+            # Blank lines only separating list items are the next to go
+            lines = [
+                line
+                for i, line in enumerate(lines)
+                if line.strip()
+                or not (
+                    0 < i < len(lines) - 1
+                    and LIST_ITEM_RE.match(lines[i + 1])
+                    and LIST_ITEM_RE.match(lines[i - 1])
+                )
+            ]
+        return "\n".join(lines).strip()
+
+
+def auto_fix_record(fixer: AutoFixer, record: Dict) -> Optional[AutoFixResult]:
+    """Apply auto-fixes to an unfilled fix plan record in place
+
+    A record left with no issues gets fixed_subject/fixed_body. Otherwise the
+    partly fixed text is kept as autofix_subject/autofix_body with the
+    issues left for the AI step in unresolved_issues. Returns None when
+    nothing could be fixed.
+    """
+    result = fixer.fix(
+        record["original_subject"], record.get("original_body", ""), record["issues"]
+    )
+    if not result.resolved:
+        return None
+    if not result.unresolved:
+        record["fixed_subject"] = result.subject
+        record["fixed_body"] = result.body
+        record["fix_status"] = STATUS_ACCEPTED
+        record["fix_backend"] = AUTO_FIX_BACKEND
+    else:
+        record["autofix_subject"] = result.subject
+        record["autofix_body"] = result.body
+        record["unresolved_issues"] = result.unresolved
+    return result
+
+
+def apply_auto_fixes(
+    records: Iterable[Dict], fixer: AutoFixer, stats: Dict[str, int]
+) -> Iterator[Dict]:
+    """Auto-fix every unfilled record of a report stream"""
+    for record in records:
+        if not record.get("fixed_subject") and "unresolved_issues" not in record:
+            result = auto_fix_record(fixer, record)
+            if result is None:
+                stats["untouched"] += 1
+            elif result.unresolved:
+                stats["partial"] += 1
+            else:
+                stats["fixed"] += 1
+        yield record
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Auto-fix mechanical commit message issues")
+    parser.add_argument(
+        "report",
+        nargs="?",
+        default=default_report_file(),
+        help="Fix plan to update in place (default: %(default)s)",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main function"""
+    args = parse_args(argv)
+    if not os.path.exists(args.report):
+        print(f"❌ Error: File not found {args.report}")
+        return 1
+
+    stats = {"fixed": 0, "partial": 0, "untouched": 0}
+    tmp_file = f"{args.report}.tmp"
+    with open_report_writer(tmp_file, report_format(args.report)) as writer:
+        for record in apply_auto_fixes(iter_report(args.report), AutoFixer(), stats):
+            writer.write(record)
+    os.replace(tmp_file, args.report)
+
+    print(f"✅ Fully fixed: {stats['fixed']} commits (fixed_subject/fixed_body filled in)")
+    print(f"🔧 Partly fixed: {stats['partial']} commits (unresolved_issues left for AI)")
+    print(f"🤖 Need AI: {stats['untouched']} commits")
+    print(f"✅ Fix plan updated: {args.report}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,169 @@
+#!/usr/bin/env python3
+"""
+Batch Character Classifier
+Finds the character-class tokens of many messages at once (placeholder,
+Chinese, emoji, markdown and double spaces) over one packed UTF-8 buffer
+"""
+
+from typing import Dict, FrozenSet, List, Optional, Sequence
+from commit_validation_config import EMOJIS
+from commit_rule_engine import (
+    TOKEN_CHINESE,
+    TOKEN_EMOJI,
+    TOKEN_MARKDOWN,
+    TOKEN_PLACEHOLDER,
+    TOKEN_SPACES,
+    scan_tokens,
+)
+
+try:
+    import numpy
+except ImportError:  # Optional: without it each message is scanned on its own
+    numpy = None
+
+# Regions are joined with NUL, a byte no token contains, so no match can
+# span two regions
+REGION_SEP = b"\0"
+
+# Below this many buffer bytes the per-call NumPy overhead outweighs the scan
+MIN_VECTORIZED_BYTES = 64 * 1024
+
+# Repeated single-byte tokens: (kind, byte, run length)
+_BYTE_RUNS = (
+    (TOKEN_PLACEHOLDER, ord("*"), 4),
+    (TOKEN_MARKDOWN, ord("#"), 2),
+    (TOKEN_SPACES, ord(" "), 2),
+)
+_EMOJI_BYTES = sorted({e.encode("utf-8") for e in EMOJIS}, key=len, reverse=True)
+# Zero bytes appended so every pattern comparison can read past the end
+_PADDING = max(len(e) for e in _EMOJI_BYTES)
+
+# CHINESE_RANGE is U+4E00..U+9FFF: three-byte sequences led by E4 B8..E9 BF
+_CJK_FIRST_LEAD = 0xE4
+_CJK_FIRST_SECOND = 0xB8
+_CJK_LAST_LEAD = 0xE9
+
+
+class PackedMessages:
+    """Subjects and bodies of many messages in one contiguous UTF-8 buffer
+
+    Region 2*i is message i's subject and region 2*i+1 its body;
+    `starts[r]` is where region r begins, with the buffer length appended.
+    """
+
+    __slots__ = ("buffer", "starts")
+
+    def __init__(self, subjects: Sequence[str], bodies: Sequence[str]):
+        regions = []
+        starts = []
+        position = 0
+        for subject, body in zip(subjects, bodies):
+            for text in (subject, body):
+                data = text.encode("utf-8", "surrogatepass")
+                regions.append(data)
+                starts.append(position)
+                position += len(data) + 1
+        self.buffer = REGION_SEP.join(regions)
+        starts.append(len(self.buffer))
+        self.starts = starts
+
+    def __len__(self) -> int:
+        return (len(self.starts) - 1) // 2
+
+
+def classify_scalar(
+    subjects: Sequence[str],
+    bodies: Sequence[str],
+    subject_kinds: FrozenSet[str],
+    body_kinds: FrozenSet[str],
+) -> List[FrozenSet[str]]:
+    """Reference implementation: the rule engine's scanner, one message at a time"""
+    return [
+        scan_tokens(subject, subject_kinds) | scan_tokens(body, body_kinds)
+        for subject, body in zip(subjects, bodies)
+    ]
+
+
+def classify_packed(
+    packed: PackedMessages, subject_kinds: FrozenSet[str], body_kinds: FrozenSet[str]
+) -> List[FrozenSet[str]]:
+    """Token kinds of every packed message, found with whole-buffer array ops"""
+    size = len(packed.buffer)
+    data = numpy.frombuffer(packed.buffer + b"\0" * _PADDING, dtype=numpy.uint8)
+    starts = numpy.asarray(packed.starts[:-1], dtype=numpy.int64)
+    kinds = sorted(subject_kinds | body_kinds)
+    # Region r carries kind k when hits[k][r]
+    hits: Dict[str, "numpy.ndarray"] = {}
+
+    def mark(kind: str, positions: "numpy.ndarray"):
+        found = numpy.zeros(len(starts), dtype=bool)
+        found[numpy.searchsorted(starts, positions, side="right") - 1] = True
+        hits[kind] = found
+
+    for kind, byte, run in _BYTE_RUNS:
+        if kind in kinds:
+            equal = data == byte
+            match = equal[:size].copy()
+            for offset in range(1, run):
+                match &= equal[offset : size + offset]
+            mark(kind, numpy.flatnonzero(match))
+
+    if TOKEN_CHINESE in kinds:
+        # In valid UTF-8 these lead bytes only start a character
+        lead = data[:size]
+        match = (lead > _CJK_FIRST_LEAD) & (lead <= _CJK_LAST_LEAD)
+        match |= (lead == _CJK_FIRST_LEAD) & (data[1 : size + 1] >= _CJK_FIRST_SECOND)
+        mark(TOKEN_CHINESE, numpy.flatnonzero(match))
+
+    if TOKEN_EMOJI in kinds:
+        # Compare each pattern only where its first byte occurs
+        first_bytes = sorted({e[0] for e in _EMOJI_BYTES})
+        candidates = numpy.flatnonzero(numpy.isin(data[:size], first_bytes))
+        positions = []
+        for emoji in _EMOJI_BYTES:
+            match = numpy.ones(len(candidates), dtype=bool)
+            for offset, byte in enumerate(emoji):
+                match &= data[candidates + offset] == byte
+            positions.append(candidates[match])
+        mark(TOKEN_EMOJI, numpy.concatenate(positions) if positions else candidates[:0])
+
+    # One bit per kind and message, mapped back to the same frozensets
+    bits = numpy.zeros(len(packed), dtype=numpy.int64)
+    for bit, kind in enumerate(kinds):
+        flags = numpy.zeros(len(packed), dtype=bool)
+        if kind in subject_kinds:
+            flags |= hits[kind][0::2]
+        if kind in body_kinds:
+            flags |= hits[kind][1::2]
+        bits |= flags.astype(numpy.int64) << bit
+    combinations = [
+        frozenset(kind for bit, kind in enumerate(kinds) if mask >> bit & 1)
+        for mask in range(1 << len(kinds))
+    ]
+    return [combinations[mask] for mask in bits.tolist()]
+
+
+def classify_messages(
+    subjects: Sequence[str],
+    bodies: Sequence[str],
+    subject_kinds: FrozenSet[str],
+    body_kinds: FrozenSet[str],
+    vectorized: Optional[bool] = None,
+) -> List[FrozenSet[str]]:
+    """Token kinds found in each message's subject (subject_kinds) or body (body_kinds)
+
+    Results equal classify_scalar(). By default NumPy is used when it is
+    installed and the batch is large enough; `vectorized=False` forces the
+    scalar path and `True` skips the size check.
+    """
+    if vectorized is False or numpy is None:
+        return classify_scalar(subjects, bodies, subject_kinds, body_kinds)
+    if not subject_kinds and not body_kinds:
+        return [frozenset()] * len(subjects)
+
+    # Characters are a lower bound on the UTF-8 size, enough to decide
+    if vectorized is None and (
+        sum(map(len, subjects)) + sum(map(len, bodies)) < MIN_VECTORIZED_BYTES
+    ):
+        return classify_scalar(subjects, bodies, subject_kinds, body_kinds)
+    return classify_packed(PackedMessages(subjects, bodies), subject_kinds, body_kinds)
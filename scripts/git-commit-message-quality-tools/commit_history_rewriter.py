@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Commit History Rewriter
+Replaces commit messages from a fix plan by piping `git fast-export` through
+an in-memory message map into `git fast-import`, starting at the oldest
+fixed commit and updating only the branches and tags that contain it
+"""
+
+import argparse
+import os
+import subprocess
+import tempfile
+import time
+from typing import IO, Dict, Iterable, List, Optional, Set, Tuple
+from fix_report import default_report_file, iter_report
+
+DEFAULT_COMMIT_MAP_FILE = "/tmp/unified_commit_rewrite_map.txt"
+
+# Refs that are rewritten when they contain a fixed commit
+REWRITE_REF_PREFIXES = ["refs/heads/", "refs/tags/"]
+
+
+def fix_message(record: Dict) -> Optional[bytes]:
+    """Full commit message for a fix record, None if it was not filled in"""
+    subject = (record.get("fixed_subject") or "").strip()
+    if not subject:
+        return None
+    body = (record.get("fixed_body") or "").strip()
+    message = f"{subject}\n\n{body}\n" if body else f"{subject}\n"
+    return message.encode("utf-8")
+
+
+def load_fix_messages(records: Iterable[Dict]) -> Tuple[Dict[str, bytes], int]:
+    """Map full hash -> new message, returns (messages, unfilled_count)"""
+    messages = {}
+    unfilled = 0
+    for record in records:
+        message = fix_message(record)
+        if message is None:
+            unfilled += 1
+        else:
+            messages[record["full_hash"]] = message
+    return messages, unfilled
+
+
+def _git(repo: str, *args: str, stdin: Optional[str] = None) -> str:
+    result = subprocess.run(
+        ["git", *args], input=stdin, capture_output=True, text=True, cwd=repo
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"git {args[0]} failed: {result.stderr.strip()}")
+    return result.stdout
+
+
+def list_refs(repo: str, exclude: Iterable[str] = ()) -> Dict[str, str]:
+    """Rewritable refs -> peeled commit hash"""
+    excluded = set(exclude)
+    refs = {}
+    output = _git(
+        repo,
+        "for-each-ref",
+        "--format=%(refname) %(objectname) %(*objectname)",
+        *REWRITE_REF_PREFIXES,
+    )
+    for line in output.splitlines():
+        parts = line.split()
+        if parts and parts[0] not in excluded:
+            refs[parts[0]] = parts[-1]
+    return refs
+
+
+def existing_commits(repo: str, hashes: Iterable[str]) -> Set[str]:
+    """Subset of hashes that are commits in this repository"""
+    output = _git(
+        repo,
+        "cat-file",
+        "--batch-check=%(objectname) %(objecttype)",
+        stdin="".join(h + "\n" for h in hashes),
+    )
+    return {
+        parts[0]
+        for parts in (line.split() for line in output.splitlines())
+        if len(parts) == 2 and parts[1] == "commit"
+    }
+
+
+def rewrite_boundary(repo: str, fixed: Set[str]) -> List[str]:
+    """Commits below every fix point; nothing under them is rewritten
+
+    Merge bases of all fixed commits are ancestors of each of them, so they
+    (or, if a base is itself fixed, its parents) never descend from a fix.
+    """
+    if len(fixed) == 1:
+        bases = list(fixed)
+    else:
+        result = subprocess.run(
+            ["git", "merge-base", "--octopus", "--all", *sorted(fixed)],
+            capture_output=True,
+            text=True,
+            cwd=repo,
+        )
+        bases = result.stdout.split()
+
+    boundary = []
+    for base in bases:
+        if base in fixed:
+            parents = _git(repo, "rev-list", "--parents", "-n", "1", base).split()[1:]
+            boundary.extend(parents)
+        else:
+            boundary.append(base)
+    return boundary
+
+
+def plan_rewrite(
+    repo: str, fixed: Set[str], refs: Dict[str, str]
+) -> Tuple[Set[str], List[str], List[str]]:
+    """Find what must change, returns (rewritten, refs_to_update, exclude)
+
+    Only history above the boundary is walked. Commits descending from a
+    fixed commit are rewritten; their parents outside that set become the
+    fast-export exclusions.
+    """
+    boundary = rewrite_boundary(repo, fixed)
+    # Older git rejects --not on stdin, so negate each boundary commit
+    revisions = sorted(set(refs.values())) + [f"^{commit}" for commit in boundary]
+    output = _git(
+        repo,
+        "rev-list",
+        "--parents",
+        "--topo-order",
+        "--reverse",
+        "--stdin",
+        stdin="".join(r + "\n" for r in revisions),
+    )
+
+    rewritten = set()
+    exclude = set()
+    for line in output.splitlines():
+        commit, *parents = line.split()
+        if commit in fixed or any(p in rewritten for p in parents):
+            rewritten.add(commit)
+            exclude.update(parents)
+    exclude -= rewritten
+
+    refs_to_update = sorted(ref for ref, target in refs.items() if target in rewritten)
+    return rewritten, refs_to_update, sorted(exclude)
+
+
+def filter_stream(
+    source: IO[bytes], sink: IO[bytes], messages: Dict[str, bytes]
+) -> Tuple[Dict[int, str], int]:
+    """Copy a fast-export stream, swapping in new messages by original id
+
+    Returns (mark -> original commit hash, replaced message count).
+    """
+    marks = {}
+    replaced = 0
+    header = None  # Buffered lines of the current commit, up to its message
+    mark = None
+    original = None
+
+    while True:
+        line = source.readline()
+        if not line:
+            break
+
+        if line.startswith(b"commit "):
+            header = [line]
+            mark = original = None
+            continue
+
+        if not line.startswith(b"data "):
+            if header is None:
+                sink.write(line)
+                continue
+            header.append(line)
+            if line.startswith(b"mark :"):
+                mark = int(line[6:])
+            elif line.startswith(b"original-oid "):
+                original = line[13:].strip().decode("ascii")
+            continue
+
+        # Exact-length data block (fast-export never uses delimited data)
+        data = source.read(int(line[5:]))
+        if header is None:
+            sink.write(line)
+            sink.write(data)
+            continue
+
+        if mark is not None and original:
+            marks[mark] = original
+        new_message = messages.get(original)
+        if new_message is not None:
+            # The new message is UTF-8, so drop any legacy encoding header
+            header = [h for h in header if not h.startswith(b"encoding ")]
+            line = b"data %d\n" % len(new_message)
+            data = new_message
+            replaced += 1
+        sink.writelines(header)
+        sink.write(line)
+        sink.write(data)
+        header = None
+
+    return marks, replaced
+
+
+class RewriteResult:
+    """Outcome of one rewrite"""
+
+    __slots__ = ("commit_map", "replaced", "refs", "unreachable", "seconds")
+
+    def __init__(self):
+        self.commit_map: Dict[str, str] = {}  # old hash -> new hash
+        self.replaced = 0
+        self.refs: List[str] = []
+        self.unreachable: List[str] = []
+        self.seconds = 0.0
+
+
+def rewrite_messages(
+    repo: str, messages: Dict[str, bytes], exclude_refs: Iterable[str] = ()
+) -> RewriteResult:
+    """Rewrite the given commit messages, updating affected refs in place"""
+    start = time.perf_counter()
+    result = RewriteResult()
+
+    fixed = existing_commits(repo, messages)
+    refs = list_refs(repo, exclude_refs)
+    if not fixed or not refs:
+        result.unreachable = sorted(messages)
+        return result
+
+    rewritten, result.refs, exclude = plan_rewrite(repo, fixed, refs)
+    result.unreachable = sorted(set(messages) - (fixed & rewritten))
+    if not result.refs:
+        return result
+
+    with tempfile.TemporaryDirectory(prefix="commit-rewrite-") as tmp:
+        marks_file = os.path.join(tmp, "marks")
+        exporter = subprocess.Popen(
+            [
+                "git", "fast-export", "--no-data", "--show-original-ids",
+                "--reference-excluded-parents", "--reencode=no",
+                "--signed-tags=strip", "--use-done-feature", "--stdin",
+            ],
+            stdin=subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            cwd=repo,
+        )
+        importer = subprocess.Popen(
+            ["git", "fast-import", "--quiet", "--force", f"--export-marks={marks_file}"],
+            stdin=subprocess.PIPE,
+            cwd=repo,
+        )
+
+        revisions = result.refs + [f"^{commit}" for commit in exclude]
+        exporter.stdin.write("".join(r + "\n" for r in revisions).encode())
+        exporter.stdin.close()
+        try:
+            marks, result.replaced = filter_stream(exporter.stdout, importer.stdin, messages)
+        finally:
+            exporter.stdout.close()
+            importer.stdin.close()
+        if exporter.wait() != 0:
+            importer.wait()
+            raise RuntimeError("git fast-export failed")
+        if importer.wait() != 0:
+            raise RuntimeError("git fast-import failed")
+
+        with open(marks_file, "r", encoding="ascii") as f:
+            for line in f:
+                mark, new_hash = line.split()
+                original = marks.get(int(mark[1:]))
+                # Commits re-emitted unchanged keep their hash
+                if original is not None and original != new_hash:
+                    result.commit_map[original] = new_hash
+
+    result.seconds = time.perf_counter() - start
+    return result
+
+
+def save_commit_map(path: str, commit_map: Dict[str, str]):
+    """Write `old new` lines, in the layout of git-filter-repo's commit-map"""
+    with open(path, "w", encoding="ascii") as f:
+        f.write("old new\n")
+        for old, new in commit_map.items():
+            f.write(f"{old} {new}\n")
+
+
+def load_commit_map(path: str) -> Dict[str, str]:
+    """Read a commit map written by save_commit_map"""
+    commit_map = {}
+    with open(path, "r", encoding="ascii") as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) == 2 and parts[0] != "old":
+                commit_map[parts[0]] = parts[1]
+    return commit_map
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Rewrite commit messages from a fix plan")
+    parser.add_argument(
+        "report",
+        nargs="?",
+        default=default_report_file(),
+        help="Fix plan with fixed_subject/fixed_body filled in (default: %(default)s)",
+    )
+    parser.add_argument("--repo", default=".", help="Repository to rewrite (default: .)")
+    parser.add_argument(
+        "--exclude-ref",
+        action="append",
+        default=[],
+        metavar="REF",
+        help="Full ref name to leave untouched, e.g. a backup branch (repeatable)",
+    )
+    parser.add_argument(
+        "--commit-map",
+        default=DEFAULT_COMMIT_MAP_FILE,
+        help="Where to write the old -> new hash map (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="Show which refs and how many commits would be rewritten",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main function"""
+    args = parse_args(argv)
+
+    messages, unfilled = load_fix_messages(iter_report(args.report))
+    if unfilled:
+        print(f"⚠️  {unfilled} fix records have no fixed_subject and are skipped")
+    if not messages:
+        print("❌ No filled-in fixes to apply")
+        return 1
+
+    if args.dry_run:
+        fixed = existing_commits(args.repo, messages)
+        refs = list_refs(args.repo, args.exclude_ref)
+        rewritten, refs_to_update, _ = plan_rewrite(args.repo, fixed, refs) if fixed else (set(), [], [])
+        print(f"🔍 {len(messages)} new messages, {len(rewritten)} commits to rewrite")
+        for ref in refs_to_update:
+            print(f"  - {ref}")
+        return 0
+
+    result = rewrite_messages(args.repo, messages, args.exclude_ref)
+    if result.unreachable:
+        print(f"⚠️  {len(result.unreachable)} fixed commits are not on any branch or tag")
+    if not result.refs:
+        print("❌ No branch or tag contains the fixed commits")
+        return 1
+
+    save_commit_map(args.commit_map, result.commit_map)
+    print(
+        f"✅ Rewrote {len(result.commit_map)} commits ({result.replaced} new messages) "
+        f"in {result.seconds:.2f}s"
+    )
+    print(f"✅ Updated refs: {', '.join(result.refs)}")
+    print(f"✅ Commit map saved to: {args.commit_map}")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,615 @@
+#!/usr/bin/env python3
+"""
+Commit Issue Index
+Persistent SQLite index of per-commit issues with author, date and ref,
+updated incrementally and queried without re-reading git or reports
+"""
+
+import argparse
+import calendar
+import json
+import os
+import sqlite3
+import subprocess
+import time
+from typing import Dict, Iterator, List, Optional, Tuple
+from commit_rule_engine import get_rule_engine
+from commit_validation_config import WARNING_ISSUES
+from commit_verdict_cache import VerdictCache, compute_rules_version, default_cache_path
+from fix_report import issue_key
+from repo_discovery import discover_repos
+from unified_commit_checker import (
+    CHECK_BATCH_SIZE,
+    RULE_SOURCE_FILES,
+    SCRIPT_DIR,
+    iter_batches,
+    iter_nul_records,
+)
+
+INDEX_FILE_NAME = "commit-issue-index.sqlite"
+
+# %S is the ref (as given on stdin) the walk first reached the commit from
+RECORD_FORMAT = "%H%x1f%S%x1f%an%x1f%ae%x1f%ct%x1f%s%x1f%b"
+REF_FORMAT = "%(refname)%00%(objecttype)%00%(objectname)%00%(*objecttype)%00%(*objectname)"
+TAG_FORMAT = "%(refname:short)%00%(committerdate:unix)%00%(*committerdate:unix)"
+
+# Keep IN (...) clauses well below SQLite's host parameter limit
+LOOKUP_BATCH_SIZE = 500
+
+# Trend buckets (UTC) and what rows can be grouped by. Weeks are ISO 8601
+# (2021-01-03 is in 2020-W53): the week-year is that of the week's
+# Thursday, which works on SQLite versions without strftime's %G/%V
+_ISO_THURSDAY = "date(c.committed, 'unixepoch', '-3 days', 'weekday 4')"
+PERIOD_BUCKETS = {
+    "day": "strftime('%Y-%m-%d', c.committed, 'unixepoch')",
+    "week": (
+        f"printf('%s-W%02d', strftime('%Y', {_ISO_THURSDAY}), "
+        f"(strftime('%j', {_ISO_THURSDAY}) - 1) / 7 + 1)"
+    ),
+    "month": "strftime('%Y-%m', c.committed, 'unixepoch')",
+}
+GROUP_COLUMNS = {"author": "c.email", "repo": "r.path", "ref": "c.ref", "issue": "i.kind"}
+
+SCHEMA = [
+    "CREATE TABLE IF NOT EXISTS repos (id INTEGER PRIMARY KEY, path TEXT UNIQUE NOT NULL, "
+    "rules_version TEXT, updated INTEGER)",
+    # Ref tips as of the last update: the next one only walks past them
+    "CREATE TABLE IF NOT EXISTS refs (repo_id INTEGER NOT NULL, name TEXT NOT NULL, "
+    "hash TEXT NOT NULL, PRIMARY KEY (repo_id, name))",
+    # Issues point at integer commit ids: joins are rowid lookups, not text compares
+    "CREATE TABLE IF NOT EXISTS commits (id INTEGER PRIMARY KEY, repo_id INTEGER NOT NULL, "
+    "hash TEXT NOT NULL, ref TEXT, author TEXT, email TEXT, committed INTEGER NOT NULL, "
+    "subject TEXT, UNIQUE (repo_id, hash))",
+    "CREATE INDEX IF NOT EXISTS commits_by_date ON commits (committed)",
+    # kind groups parameterised issues (subject-too-long-123 -> subject-too-long)
+    "CREATE TABLE IF NOT EXISTS issues (commit_id INTEGER NOT NULL, issue TEXT NOT NULL, "
+    "kind TEXT NOT NULL)",
+    "CREATE INDEX IF NOT EXISTS issues_by_commit ON issues (commit_id)",
+    "CREATE INDEX IF NOT EXISTS issues_by_kind ON issues (kind, commit_id)",
+    "CREATE TABLE IF NOT EXISTS tags (repo_id INTEGER NOT NULL, name TEXT NOT NULL, "
+    "committed INTEGER NOT NULL, PRIMARY KEY (repo_id, name))",
+]
+
+
+def _git(repo: str, args: List[str], stdin: Optional[str] = None) -> str:
+    result = subprocess.run(
+        ["git", *args], input=stdin, capture_output=True, text=True, cwd=repo
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"git {args[0]} failed in {repo}: {result.stderr.strip()}")
+    return result.stdout
+
+
+def list_ref_tips(repo: str) -> List[Tuple[str, str]]:
+    """(ref name, commit hash) of every ref reaching a commit, tags peeled"""
+    tips = []
+    for line in _git(repo, ["for-each-ref", f"--format={REF_FORMAT}"]).splitlines():
+        name, kind, target, peeled_kind, peeled = line.split("\0")
+        if kind == "commit":
+            tips.append((name, target))
+        elif peeled_kind == "commit":
+            tips.append((name, peeled))
+    return tips
+
+
+def list_tags(repo: str) -> List[Tuple[str, int]]:
+    """(tag name, committer date of the tagged commit)"""
+    tags = []
+    for line in _git(repo, ["for-each-ref", f"--format={TAG_FORMAT}", "refs/tags"]).splitlines():
+        name, date, peeled_date = line.split("\0")
+        if peeled_date or date:
+            tags.append((name, int(peeled_date or date)))
+    return tags
+
+
+def default_branch(repo: str) -> Optional[str]:
+    """The ref HEAD points at, or None when HEAD is detached"""
+    result = subprocess.run(
+        ["git", "symbolic-ref", "-q", "HEAD"], capture_output=True, text=True, cwd=repo
+    )
+    return result.stdout.strip() or None
+
+
+def existing_objects(repo: str, hashes: List[str]) -> List[str]:
+    """The hashes still present in the object database (old tips may be gone)"""
+    if not hashes:
+        return []
+    output = _git(
+        repo,
+        ["cat-file", "--batch-check=%(objectname) %(objecttype)"],
+        "".join(h + "\n" for h in hashes),
+    )
+    return [line.split()[0] for line in output.splitlines() if not line.endswith(" missing")]
+
+
+def iter_new_commits(repo: str, refs: List[str], exclude: List[str]) -> Iterator[Tuple]:
+    """Stream (hash, ref, author, email, committed, subject, body) of commits
+    reachable from `refs` but not from `exclude`"""
+    if not refs:
+        return  # An empty --stdin list would make git log fall back to HEAD
+    process = subprocess.Popen(
+        ["git", "log", "-z", "--source", "--stdin", f"--format={RECORD_FORMAT}"],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        cwd=repo,
+    )
+    try:
+        lines = refs + ["^" + full_hash for full_hash in exclude]
+        process.stdin.write("".join(line + "\n" for line in lines).encode())
+        process.stdin.close()
+        for record in iter_nul_records(process.stdout):
+            fields = record.split("\x1f", 6)
+            if len(fields) < 6:
+                continue
+            full_hash, ref, author, email, committed, subject = (f.strip() for f in fields[:6])
+            body = fields[6].strip() if len(fields) > 6 else ""
+            yield full_hash, ref, author, email, int(committed), subject, body
+    finally:
+        # Closing stdout early makes git exit on SIGPIPE
+        process.stdout.close()
+        process.wait()
+
+
+def parse_date(value: str) -> int:
+    """YYYY-MM-DD (UTC) as a Unix timestamp"""
+    return calendar.timegm(time.strptime(value, "%Y-%m-%d"))
+
+
+class IndexUpdate:
+    """Outcome of bringing one repository's index up to date"""
+
+    __slots__ = ("repo", "new_commits", "validated", "problems", "rebuilt", "seconds")
+
+    def __init__(self, repo: str):
+        self.repo = repo
+        self.new_commits = 0
+        self.validated = 0  # Commits checked here rather than taken from the verdict cache
+        self.problems = 0
+        self.rebuilt = False  # Rules changed, so every commit was indexed again
+        self.seconds = 0.0
+
+
+class QueryFilter:
+    """Which indexed commits a query covers"""
+
+    __slots__ = ("repo", "since", "until", "since_tag", "author", "issue")
+
+    def __init__(
+        self,
+        repo: Optional[str] = None,
+        since: Optional[int] = None,
+        until: Optional[int] = None,
+        since_tag: Optional[str] = None,
+        author: Optional[str] = None,
+        issue: Optional[str] = None,
+    ):
+        self.repo = os.path.abspath(repo) if repo else None
+        self.since = since
+        self.until = until
+        self.since_tag = since_tag  # Committed after the tagged commit, per repository
+        self.author = author  # Name or email
+        self.issue = issue  # Issue kind, e.g. markdown-chaos-in-body
+
+    def where(self) -> Tuple[str, List]:
+        """SQL conditions on commits `c` joined with repos `r`, and their parameters"""
+        clauses = ["1"]
+        params = []
+        if self.repo is not None:
+            clauses.append("r.path = ?")
+            params.append(self.repo)
+        if self.since is not None:
+            clauses.append("c.committed >= ?")
+            params.append(self.since)
+        if self.until is not None:
+            clauses.append("c.committed < ?")
+            params.append(self.until)
+        if self.since_tag is not None:
+            # Repositories without the tag match nothing (NULL comparison)
+            clauses.append(
+                "c.committed > (SELECT t.committed FROM tags t "
+                "WHERE t.repo_id = c.repo_id AND t.name = ?)"
+            )
+            params.append(self.since_tag)
+        if self.author is not None:
+            clauses.append("(c.author = ? OR c.email = ?)")
+            params.extend([self.author, self.author])
+        return " AND ".join(clauses), params
+
+    def issue_clause(self) -> Tuple[str, List]:
+        """Condition on issues `i`"""
+        if self.issue is None:
+            return "1", []
+        return "i.kind = ?", [self.issue]
+
+
+class IssueIndex:
+    """Per-commit issues of any number of repositories in one SQLite file
+
+    Each update walks only the commits no previously indexed ref tip
+    reaches, takes verdicts from the checker's cache where it has them and
+    checks the rest. Commits stay indexed after their refs are deleted.
+    """
+
+    def __init__(self, path: str, timeout: float = 30):
+        self.path = path
+        # Dashboards read while audits write
+        self.conn = sqlite3.connect(path, timeout=timeout)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        for statement in SCHEMA:
+            self.conn.execute(statement)
+        self.conn.commit()
+
+    def _repo(self, path: str) -> Tuple[int, Optional[str]]:
+        self.conn.execute("INSERT OR IGNORE INTO repos (path) VALUES (?)", (path,))
+        self.conn.commit()
+        return self.conn.execute(
+            "SELECT id, rules_version FROM repos WHERE path = ?", (path,)
+        ).fetchone()
+
+    def forget(self, repo_path: str):
+        """Make the next update index a repository from scratch"""
+        repo_id, _ = self._repo(os.path.abspath(repo_path))
+        self.conn.execute("UPDATE repos SET rules_version = NULL WHERE id = ?", (repo_id,))
+        self.conn.commit()
+
+    def update(self, repo_path: str, cache: Optional[VerdictCache] = None) -> IndexUpdate:
+        """Index the commits added to a repository since its last update
+
+        Walking and checking happen before anything is written, and all
+        writes go in one short transaction at the end: concurrent updates
+        of other repositories barely wait, and an interrupted update leaves
+        the previous state.
+        """
+        start = time.perf_counter()
+        repo_path = os.path.abspath(repo_path)
+        result = IndexUpdate(repo_path)
+        rules_version = compute_rules_version(RULE_SOURCE_FILES)
+        repo_id, indexed_version = self._repo(repo_path)
+        # Verdicts from other rules are stale: index every commit again
+        rebuild = indexed_version != rules_version
+        result.rebuilt = rebuild and indexed_version is not None
+
+        tips = list_ref_tips(repo_path)
+        old_tips = [] if rebuild else [
+            full_hash
+            for (full_hash,) in self.conn.execute(
+                "SELECT DISTINCT hash FROM refs WHERE repo_id = ?", (repo_id,)
+            )
+        ]
+        exclude = existing_objects(repo_path, old_tips)
+
+        # A commit's ref is the first one the walk reaches it from, and the
+        # newest tips are walked first: walk the checked-out branch alone
+        # first so the trunk is not credited to whichever branch moved last
+        names = [name for name, _ in tips]
+        head = default_branch(repo_path)
+        passes = [(names, exclude)]
+        if head in names and len(names) > 1:
+            others = [name for name in names if name != head]
+            passes = [([head], exclude), (others, exclude + [dict(tips)[head]])]
+        new_commits = []  # (commit fields, issues)
+        for refs, excluded in passes:
+            commits = iter_new_commits(repo_path, refs, excluded)
+            for batch in iter_batches(commits, CHECK_BATCH_SIZE):
+                if not rebuild:
+                    # A walk past deleted or rewound tips can meet indexed commits again
+                    known = self._indexed(repo_id, [commit[0] for commit in batch])
+                    batch = [commit for commit in batch if commit[0] not in known]
+                for commit, issues in zip(batch, self._verdicts(batch, cache, result)):
+                    new_commits.append((commit[:6], issues))
+                    result.problems += bool(issues)
+        result.new_commits = len(new_commits)
+        tags = list_tags(repo_path)
+
+        with self.conn:
+            # Taken up front so the ids counted from MAX(id) stay free
+            self.conn.execute("BEGIN IMMEDIATE")
+            if rebuild:
+                self.conn.execute(
+                    "DELETE FROM issues WHERE commit_id IN "
+                    "(SELECT id FROM commits WHERE repo_id = ?)",
+                    (repo_id,),
+                )
+                self.conn.execute("DELETE FROM commits WHERE repo_id = ?", (repo_id,))
+            (first_id,) = self.conn.execute(
+                "SELECT COALESCE(MAX(id), 0) + 1 FROM commits"
+            ).fetchone()
+            self.conn.executemany(
+                "INSERT INTO commits (id, repo_id, hash, ref, author, email, committed, subject) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [(first_id + i, repo_id, *commit) for i, (commit, _) in enumerate(new_commits)],
+            )
+            self.conn.executemany(
+                "INSERT INTO issues (commit_id, issue, kind) VALUES (?, ?, ?)",
+                [
+                    (first_id + i, issue, issue_key(issue))
+                    for i, (_, issues) in enumerate(new_commits)
+                    for issue in issues
+                ],
+            )
+            self.conn.execute("DELETE FROM refs WHERE repo_id = ?", (repo_id,))
+            self.conn.executemany(
+                "INSERT INTO refs (repo_id, name, hash) VALUES (?, ?, ?)",
+                [(repo_id, name, full_hash) for name, full_hash in tips],
+            )
+            self.conn.execute("DELETE FROM tags WHERE repo_id = ?", (repo_id,))
+            self.conn.executemany(
+                "INSERT INTO tags (repo_id, name, committed) VALUES (?, ?, ?)",
+                [(repo_id, name, committed) for name, committed in tags],
+            )
+            self.conn.execute(
+                "UPDATE repos SET rules_version = ?, updated = ? WHERE id = ?",
+                (rules_version, int(time.time()), repo_id),
+            )
+        result.seconds = time.perf_counter() - start
+        return result
+
+    def _verdicts(
+        self, batch: List[Tuple], cache: Optional[VerdictCache], result: IndexUpdate
+    ) -> List[List[str]]:
+        """Issues of each commit: cached verdicts where there are any, else checked
+
+        Warnings (messages too large to check) are not issues and are dropped.
+        """
+        hashes = [commit[0] for commit in batch]
+        verdicts = cache.lookup_many(hashes) if cache is not None else {}
+        todo = [commit for commit in batch if commit[0] not in verdicts]
+        if todo:
+            checked = get_rule_engine().check_many([(commit[5], commit[6]) for commit in todo])
+            for commit, issues in zip(todo, checked):
+                verdicts[commit[0]] = issues
+                if cache is not None:
+                    cache.store(commit[0], issues)
+            result.validated += len(todo)
+        return [
+            [issue for issue in verdicts[full_hash] if issue not in WARNING_ISSUES]
+            for full_hash in hashes
+        ]
+
+    def _indexed(self, repo_id: int, hashes: List[str]) -> set:
+        found = set()
+        for start in range(0, len(hashes), LOOKUP_BATCH_SIZE):
+            batch = hashes[start : start + LOOKUP_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            rows = self.conn.execute(
+                f"SELECT hash FROM commits WHERE repo_id = ? AND hash IN ({placeholders})",
+                [repo_id, *batch],
+            )
+            found.update(full_hash for (full_hash,) in rows)
+        return found
+
+    # --- Queries -----------------------------------------------------------
+
+    def issue_counts(self, query: QueryFilter) -> List[Tuple[str, int]]:
+        """(issue kind, commits with it), most frequent first"""
+        where, params = query.where()
+        issue_where, issue_params = query.issue_clause()
+        return self.conn.execute(
+            "SELECT i.kind, COUNT(*) AS n FROM issues i "
+            "JOIN commits c ON c.id = i.commit_id JOIN repos r ON r.id = c.repo_id "
+            f"WHERE {where} AND {issue_where} GROUP BY i.kind ORDER BY n DESC, i.kind",
+            params + issue_params,
+        ).fetchall()
+
+    def trend(self, query: QueryFilter, period: str = "week", by: str = "author") -> List[Dict]:
+        """Commits, problem commits and issues per period and group
+
+        Grouped by issue, all three count the commits having that issue.
+        """
+        where, params = query.where()
+        issue_where, issue_params = query.issue_clause()
+        bucket = PERIOD_BUCKETS[period]
+        group = GROUP_COLUMNS[by]
+        if by == "issue":
+            sql = (
+                f"SELECT {bucket} AS period, {group} AS grp, COUNT(*), COUNT(*), COUNT(*) "
+                "FROM issues i JOIN commits c ON c.id = i.commit_id "
+                "JOIN repos r ON r.id = c.repo_id "
+                f"WHERE {where} AND {issue_where} GROUP BY period, grp ORDER BY period, grp"
+            )
+            params = params + issue_params
+        else:
+            # Per commit: how many (matching) issues it has
+            counted = f"(SELECT COUNT(*) FROM issues i WHERE i.commit_id = c.id AND {issue_where})"
+            sql = (
+                f"SELECT period, grp, COUNT(*), SUM(n > 0), SUM(n) FROM ("
+                f"SELECT {bucket} AS period, {group} AS grp, {counted} AS n "
+                f"FROM commits c JOIN repos r ON r.id = c.repo_id WHERE {where}"
+                ") GROUP BY period, grp ORDER BY period, grp"
+            )
+            params = issue_params + params
+        return [
+            {"period": row[0], by: row[1], "commits": row[2], "problems": row[3], "issues": row[4]}
+            for row in self.conn.execute(sql, params)
+        ]
+
+    def find_commits(self, query: QueryFilter, limit: Optional[int] = None) -> List[Dict]:
+        """Problem commits matching the filter, newest first"""
+        where, params = query.where()
+        issue_where, issue_params = query.issue_clause()
+        sql = (
+            "SELECT r.path, c.hash, c.committed, c.author, c.email, c.ref, c.subject, "
+            "(SELECT group_concat(i.issue, ' ') FROM issues i WHERE i.commit_id = c.id) "
+            "FROM commits c JOIN repos r ON r.id = c.repo_id "
+            f"WHERE {where} AND c.id IN (SELECT i.commit_id FROM issues i WHERE {issue_where}) "
+            "ORDER BY c.committed DESC, c.id"
+        )
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return [
+            {
+                "repo": row[0],
+                "hash": row[1],
+                "committed": row[2],
+                "author": row[3],
+                "email": row[4],
+                "ref": row[5],
+                "subject": row[6],
+                "issues": row[7].split(" "),
+            }
+            for row in self.conn.execute(sql, params + issue_params)
+        ]
+
+    def close(self):
+        self.conn.close()
+
+
+def default_index_path(repo_path: str) -> Optional[str]:
+    """The index inside the repository's git dir"""
+    return default_cache_path(repo_path, INDEX_FILE_NAME)
+
+
+def update_repos(index: IssueIndex, repos: List[str], use_cache: bool = True) -> List[IndexUpdate]:
+    """Update the index for each repository, reusing its checker verdict cache"""
+    results = []
+    for repo in repos:
+        cache = None
+        cache_path = default_cache_path(repo) if use_cache else None
+        if cache_path:
+            cache = VerdictCache(cache_path, compute_rules_version(RULE_SOURCE_FILES))
+        try:
+            result = index.update(repo, cache)
+        finally:
+            if cache is not None:
+                cache.close()
+        results.append(result)
+    return results
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Persistent index of commit message issues")
+    parser.add_argument(
+        "--index",
+        metavar="FILE",
+        help=f"Index database shared by any number of repositories "
+        f"(default: {INDEX_FILE_NAME} in this repository's git dir)",
+    )
+    parser.add_argument("--json", action="store_true", help="Print query results as JSON")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    update = commands.add_parser("update", help="Index commits added since the last update")
+    update.add_argument(
+        "repos", nargs="*", metavar="REPO", help="Repository paths (default: this one)"
+    )
+    update.add_argument(
+        "--repos-under",
+        action="append",
+        default=[],
+        metavar="DIR",
+        help="Update every git repository directly inside DIR (repeatable)",
+    )
+    update.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Check new commits instead of reusing the checker's cached verdicts",
+    )
+    update.add_argument(
+        "--rebuild",
+        action="store_true",
+        help="Drop the repositories' indexed commits and index them from scratch",
+    )
+
+    summary = commands.add_parser("summary", help="Commits per issue kind")
+    trend = commands.add_parser("trend", help="Commits and problems per period and group")
+    trend.add_argument("--period", choices=sorted(PERIOD_BUCKETS), default="week")
+    trend.add_argument("--by", choices=sorted(GROUP_COLUMNS), default="author")
+    commits = commands.add_parser("commits", help="List problem commits")
+    commits.add_argument(
+        "--limit", type=int, default=50, metavar="N", help="0 = no limit (default: %(default)s)"
+    )
+
+    for query in (summary, trend, commits):
+        query.add_argument("--repo", metavar="PATH", help="Only this repository")
+        query.add_argument(
+            "--since", metavar="YYYY-MM-DD", help="Committed on or after this date (UTC)"
+        )
+        query.add_argument("--until", metavar="YYYY-MM-DD", help="Committed before this date (UTC)")
+        query.add_argument(
+            "--since-tag", metavar="TAG", help="Committed after the commit TAG points at"
+        )
+        query.add_argument("--author", metavar="NAME", help="Author name or email")
+        query.add_argument(
+            "--issue", metavar="ISSUE", help="Only this issue kind, e.g. markdown-chaos-in-body"
+        )
+    return parser.parse_args(argv)
+
+
+def print_update(result: IndexUpdate):
+    """One line per updated repository"""
+    rebuilt = ", rules changed: rebuilt" if result.rebuilt else ""
+    print(
+        f"  ✅ {result.repo}: {result.new_commits} new commits, {result.problems} with issues "
+        f"({result.validated} checked{rebuilt}, {result.seconds:.2f}s)"
+    )
+
+
+def main(argv=None):
+    """Main function"""
+    args = parse_args(argv)
+
+    # Auto-detect repository path
+    repo_path = os.path.abspath(os.path.join(SCRIPT_DIR, "../.."))
+    index_path = args.index or default_index_path(repo_path)
+    if index_path is None:
+        print("❌ Not in a git repository; use --index FILE")
+        return 1
+
+    index = IssueIndex(index_path)
+    try:
+        if args.command == "update":
+            repos = discover_repos(args.repos, args.repos_under) or [repo_path]
+            if args.rebuild:
+                for repo in repos:
+                    index.forget(repo)
+            print(f"🗂️  Updating issue index {index_path} ({len(repos)} repositories)...")
+            try:
+                for result in update_repos(index, repos, not args.no_cache):
+                    print_update(result)
+            except RuntimeError as e:
+                print(f"❌ {e}")
+                return 1
+            return 0
+
+        query = QueryFilter(
+            repo=args.repo,
+            since=parse_date(args.since) if args.since else None,
+            until=parse_date(args.until) if args.until else None,
+            since_tag=args.since_tag,
+            author=args.author,
+            issue=args.issue,
+        )
+        if args.command == "summary":
+            rows = index.issue_counts(query)
+            if args.json:
+                print(json.dumps(dict(rows), ensure_ascii=False, indent=2))
+            else:
+                print("Issue type statistics:")
+                for kind, count in rows:
+                    print(f"  {kind}: {count} commits")
+        elif args.command == "trend":
+            rows = index.trend(query, args.period, args.by)
+            if args.json:
+                print(json.dumps(rows, ensure_ascii=False, indent=2))
+            else:
+                for row in rows:
+                    print(
+                        f"  {row['period']}  {row[args.by]}: {row['problems']}/{row['commits']} "
+                        f"commits with issues, {row['issues']} issues"
+                    )
+        else:
+            rows = index.find_commits(query, args.limit or None)
+            if args.json:
+                print(json.dumps(rows, ensure_ascii=False, indent=2))
+            else:
+                for row in rows:
+                    date = time.strftime("%Y-%m-%d", time.gmtime(row["committed"]))
+                    print(f"{row['hash'][:7]} {date} {row['email']} - {row['subject'][:60]}")
+                    print(f"  Issues: {', '.join(row['issues'])}")
+    finally:
+        index.close()
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
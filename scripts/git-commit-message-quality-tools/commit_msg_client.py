@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Commit Message Validation Client
+Thin commit-msg hook entry point: asks a running commit_msg_server.py and
+falls back to in-process validation when no server is available
+"""
+
+import os
+import sys
+
+SOCKET_ENV_VAR = "COMMIT_MSG_VALIDATOR_SOCKET"
+SOCKET_NAME = "validator.sock"
+CONNECT_TIMEOUT = 0.2
+RESPONSE_TIMEOUT = 5.0
+READ_CHUNK_SIZE = 64 * 1024
+
+# First response line: the hook's exit code, or STALE when the server's
+# rules are out of date and the caller must validate in-process
+RESPONSE_STALE = "STALE"
+
+
+def default_socket_path() -> str:
+    """Per-user socket path (overridable via COMMIT_MSG_VALIDATOR_SOCKET)
+
+    The socket lives in a directory only its owner can enter, which the
+    server creates and checks, since TMPDIR or /tmp may be shared.
+    """
+    path = os.environ.get(SOCKET_ENV_VAR)
+    if path:
+        return path
+    runtime_dir = os.environ.get("XDG_RUNTIME_DIR") or os.environ.get("TMPDIR") or "/tmp"
+    return os.path.join(runtime_dir, f"commit-msg-validator-{os.getuid()}", SOCKET_NAME)
+
+
+# Annotations are strings so the hook never pays for importing typing
+def request_validation(message: bytes, path: str) -> "tuple[int, str] | None":
+    """Send a message to the server, returns (exit_code, output) or None
+
+    A socket owned by another user is never trusted: its answers could
+    accept anything, so the caller validates in-process instead.
+    """
+    try:
+        if os.stat(path).st_uid != os.getuid():
+            return None
+        # Only here, past the skip and fast-path checks: it costs more than
+        # the rest of a plain hook call's imports together
+        import socket
+
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.settimeout(CONNECT_TIMEOUT)
+            sock.connect(path)
+            sock.settimeout(RESPONSE_TIMEOUT)
+            sock.sendall(message)
+            sock.shutdown(socket.SHUT_WR)
+
+            chunks = []
+            while True:
+                chunk = sock.recv(READ_CHUNK_SIZE)
+                if not chunk:
+                    break
+                chunks.append(chunk)
+    except OSError:
+        return None
+
+    status, _, output = b"".join(chunks).decode("utf-8").partition("\n")
+    if not status.isdigit():
+        return None  # STALE or garbled: let the caller validate itself
+    return int(status), output
+
+
+def main():
+    """Main function for commit-msg hook"""
+    if len(sys.argv) >= 2:
+        try:
+            with open(sys.argv[1], "rb") as f:
+                message = f.read()
+        except OSError:
+            message = None  # The in-process validator reports the error
+
+        if message is not None:
+            # Skip validation for merge commits, revert commits, etc.
+            if message.startswith(b"Merge ") or message.startswith(b"Revert "):
+                sys.exit(0)
+
+            # Plain messages are accepted without a round trip; importing the
+            # validator here loads only its constants, not the rule engine
+            from commit_msg_validator import is_trivially_valid
+
+            if message.isascii() and is_trivially_valid(message.decode("ascii")):
+                sys.exit(0)
+
+            result = request_validation(message, default_socket_path())
+            if result is not None:
+                exit_code, output = result
+                if output:
+                    print(output)
+                sys.exit(exit_code)
+
+    # No server running: validate in this process
+    import commit_msg_validator
+
+    commit_msg_validator.main()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""
+Commit Message Validation Server
+Keeps the compiled rules resident and validates commit messages sent by
+commit_msg_client.py over a Unix domain socket
+"""
+
+import argparse
+import os
+import socket
+import socketserver
+import stat
+import sys
+from typing import Dict
+from commit_msg_client import RESPONSE_STALE, default_socket_path
+from commit_msg_validator import HOOK_RULES, CommitMessageValidator, render_failure
+from commit_rule_engine import get_rule_engine
+
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Editing any of these makes the running server stale
+RULE_SOURCE_FILES = [
+    os.path.join(SCRIPT_DIR, "commit_validation_config.py"),
+    os.path.join(SCRIPT_DIR, "commit_rule_engine.py"),
+    os.path.join(SCRIPT_DIR, "commit_msg_validator.py"),
+]
+
+DEFAULT_IDLE_TIMEOUT = 3600
+# The server handles one connection at a time: a client that never
+# finishes sending must not hold up the hooks queued behind it
+REQUEST_TIMEOUT = 1.0
+
+
+def rule_source_mtimes() -> Dict[str, float]:
+    """Snapshot modification times of the rule sources"""
+    return {path: os.stat(path).st_mtime for path in RULE_SOURCE_FILES}
+
+
+class ValidationHandler(socketserver.StreamRequestHandler):
+    """Validates one message per connection"""
+
+    timeout = REQUEST_TIMEOUT
+
+    def handle(self):
+        try:
+            raw = self.rfile.read()
+        except OSError:
+            return  # Timed out or gone; the client validates in-process
+
+        if rule_source_mtimes() != self.server.rule_mtimes:
+            # Answer STALE so the client validates in-process, then exit
+            self.wfile.write(f"{RESPONSE_STALE}\n".encode())
+            self.server.stale = True
+            return
+
+        try:
+            message = raw.decode("utf-8")
+        except UnicodeDecodeError as e:
+            response = f"1\n❌ Error reading commit message file: {e}"
+        else:
+            validator = CommitMessageValidator(message)
+            is_valid, errors = validator.validate()
+            if is_valid:
+                response = "0\n" + "\n".join(validator.warnings)
+            else:
+                response = f"1\n{render_failure(errors)}"
+
+        self.wfile.write(response.encode("utf-8"))
+
+
+class ValidationServer(socketserver.UnixStreamServer):
+    """Single-threaded server; each request takes microseconds"""
+
+    def __init__(self, path: str, idle_timeout: float):
+        self.rule_mtimes = rule_source_mtimes()
+        self.stale = False
+        self.idle = False
+        self.timeout = idle_timeout
+        # Created owner-only, so nobody can connect before a chmod
+        old_umask = os.umask(0o177)
+        try:
+            super().__init__(path, ValidationHandler)
+        finally:
+            os.umask(old_umask)
+
+    def handle_timeout(self):
+        self.idle = True
+
+
+def prepare_socket_dir(path: str):
+    """Create the socket's directory owner-only, or refuse one others can use"""
+    directory = os.path.dirname(os.path.abspath(path))
+    os.makedirs(directory, mode=0o700, exist_ok=True)
+    info = os.lstat(directory)
+    if (
+        not stat.S_ISDIR(info.st_mode)
+        or info.st_uid != os.getuid()
+        or info.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+    ):
+        raise PermissionError(
+            f"{directory} must be a directory owned by you and writable only by you"
+        )
+
+
+def server_running(path: str) -> bool:
+    """Check whether something is already accepting on the socket"""
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(path)
+        return True
+    except OSError:
+        return False
+
+
+def main():
+    """Main function"""
+    parser = argparse.ArgumentParser(description="Commit message validation server")
+    parser.add_argument(
+        "--socket",
+        default=default_socket_path(),
+        help="Unix socket path (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--idle-timeout",
+        type=float,
+        default=DEFAULT_IDLE_TIMEOUT,
+        metavar="SECONDS",
+        help="Exit after this long without requests (default: %(default)s)",
+    )
+    args = parser.parse_args()
+
+    try:
+        prepare_socket_dir(args.socket)
+    except OSError as e:
+        print(f"❌ Cannot use socket {args.socket}: {e}")
+        return 1
+
+    if os.path.exists(args.socket):
+        if server_running(args.socket):
+            print(f"✅ Server already running on {args.socket}")
+            return 0
+        os.unlink(args.socket)  # Left over from a server that died
+
+    # Compile rules before accepting the first request
+    get_rule_engine(HOOK_RULES)
+
+    server = ValidationServer(args.socket, args.idle_timeout)
+    print(f"🚀 Validation server listening on {args.socket}")
+    sys.stdout.flush()
+
+    try:
+        while not (server.stale or server.idle):
+            server.handle_request()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        os.unlink(args.socket)
+
+    if server.stale:
+        print("♻️  Rule sources changed, server stopped")
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
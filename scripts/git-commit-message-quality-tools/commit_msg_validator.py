@@ -1,119 +1,310 @@
 #!/usr/bin/env python3
 """
 Commit Message Validator for Git Hooks
-Validates a single commit message file (used by .husky/commit-msg)
+Validates a single commit message file (used by .husky/commit-msg), or a
+NUL-separated stream of messages on stdin with --stdin0
 """
 
 import sys
-import re
-from typing import List, Tuple
 from commit_validation_config import (
-    MAX_SUBJECT_LENGTH,
-    EMOJIS,
-    CHINESE_RANGE,
-    INCOMPLETE_LIST_THRESHOLD,
     INCOMPLETE_LIST_MARKERS,
+    INCOMPLETE_LIST_THRESHOLD,
+    MAX_SUBJECT_LENGTH,
+    ISSUE_CONTAINS_PLACEHOLDER,
+    ISSUE_SUBJECT_TOO_LONG,
+    ISSUE_CONTAINS_CHINESE,
+    ISSUE_EMOJI_IN_SUBJECT,
+    ISSUE_MARKDOWN_IN_SUBJECT,
+    ISSUE_INVALID_FORMAT,
+    ISSUE_EMOJI_FIRST_LINE,
+    ISSUE_INCOMPLETE_LIST_ITEMS,
+    ISSUE_TOO_MANY_EMPTY_LINES,
+    ISSUE_INCOMPLETE_SUBJECT_ENDING,
+    ISSUE_MULTIPLE_SPACES,
+    ISSUE_MARKDOWN_CHAOS_IN_BODY,
+    ISSUE_MALFORMED_CODE_BLOCKS,
+    ISSUE_SKIPPED_OVERSIZED,
+    MAX_MESSAGE_LENGTH,
+    WARNING_ISSUES,
+)
+
+# Only sys and the constants above load at import time. json and the rule
+# engine (re plus compiled patterns) are imported by the functions that need
+# them, so a hook call that takes the fast path never pays for them.
+# Annotations are strings so typing is never loaded; the abstract types they
+# name are imported for type checkers only.
+TYPE_CHECKING = False
+if TYPE_CHECKING:
+    from collections.abc import Iterable, Iterator
+    from typing import IO
+
+# Rules the hook enforces. Subject length and format are left out because
+# commitlint checks them in the same hook.
+HOOK_RULES = (
+    ISSUE_CONTAINS_PLACEHOLDER,
+    ISSUE_CONTAINS_CHINESE,
+    ISSUE_EMOJI_IN_SUBJECT,
+    ISSUE_MARKDOWN_IN_SUBJECT,
+    ISSUE_EMOJI_FIRST_LINE,
+    ISSUE_INCOMPLETE_LIST_ITEMS,
+    ISSUE_TOO_MANY_EMPTY_LINES,
+    ISSUE_INCOMPLETE_SUBJECT_ENDING,
+    ISSUE_MULTIPLE_SPACES,
+    ISSUE_MARKDOWN_CHAOS_IN_BODY,
+    ISSUE_MALFORMED_CODE_BLOCKS,
 )
 
+ERROR_MESSAGES = {
+    ISSUE_CONTAINS_PLACEHOLDER: "❌ Contains **** placeholder - please replace with actual content",
+    ISSUE_SUBJECT_TOO_LONG: (
+        "❌ Subject too long ({0} characters) - "
+        f"limit is {MAX_SUBJECT_LENGTH}"
+    ),
+    ISSUE_CONTAINS_CHINESE: "❌ Contains Chinese characters - use English only",
+    ISSUE_EMOJI_IN_SUBJECT: "❌ Subject contains emoji - remove emoji from subject line",
+    ISSUE_MARKDOWN_IN_SUBJECT: "❌ Subject contains markdown markers (## or ###)",
+    ISSUE_INVALID_FORMAT: "❌ Subject does not follow type(scope): description format",
+    ISSUE_EMOJI_FIRST_LINE: "❌ Body starts with standalone emoji line",
+    ISSUE_INCOMPLETE_LIST_ITEMS: (
+        "❌ Too many incomplete list items ({0}) - "
+        f"threshold is {INCOMPLETE_LIST_THRESHOLD}"
+    ),
+    ISSUE_TOO_MANY_EMPTY_LINES: (
+        "❌ Too many empty lines ({0}/{1}) - exceeds 30% threshold"
+    ),
+    ISSUE_INCOMPLETE_SUBJECT_ENDING: "❌ Subject has incomplete ending (proposal/tasks/...)",
+    ISSUE_MULTIPLE_SPACES: "❌ Subject contains multiple consecutive spaces",
+    ISSUE_MARKDOWN_CHAOS_IN_BODY: (
+        "❌ Chaotic markdown markers in body ({0} issues) - "
+        "use proper markdown formatting"
+    ),
+    ISSUE_MALFORMED_CODE_BLOCKS: (
+        "❌ Malformed code blocks detected - "
+        "code blocks should have line breaks, not inline"
+    ),
+    ISSUE_SKIPPED_OVERSIZED: (
+        "⚠️  Message too large to validate ({0} characters) - "
+        f"limit is {MAX_MESSAGE_LENGTH}, not checked"
+    ),
+}
+
+
+def split_warnings(findings: "list[tuple[str, tuple[int, ...]]]") -> "tuple[list, list]":
+    """Separate WARNING_ISSUES findings, returns (errors, warnings)"""
+    errors = [finding for finding in findings if finding[0] not in WARNING_ISSUES]
+    if len(errors) == len(findings):
+        return findings, []
+    return errors, [finding for finding in findings if finding[0] in WARNING_ISSUES]
+
+
+def format_error(issue_type: str, details: "tuple[int, ...]") -> str:
+    """Render a rule finding as a hook error message"""
+    return ERROR_MESSAGES[issue_type].format(*details)
+
+
+# Messages git generates itself are not validated
+SKIPPED_PREFIXES = ("Merge ", "Revert ")
+
+STDIN_CHUNK_SIZE = 64 * 1024
+
+# Subject endings INCOMPLETE_ENDING_RE can match, checked without a regex
+INCOMPLETE_ENDINGS = ("proposal", "tasks", "...")
+
+INCOMPLETE_LIST_MARKER_SET = frozenset(INCOMPLETE_LIST_MARKERS)
+
+
+def split_message(message: str, with_body: bool = True) -> "tuple[str, str]":
+    """Split a message into subject (first line) and body (from the third line)
+
+    Without `with_body` only the subject is cut out, for rule sets that
+    never read the body.
+    """
+    if not with_body:
+        return message.strip().split("\n", 1)[0], ""
+    lines = message.strip().split("\n")
+    subject = lines[0] if lines else ""
+    body = "\n".join(lines[2:]) if len(lines) > 2 else ""
+    return subject, body
+
+
+def is_trivially_valid(message: str) -> bool:
+    """True when no HOOK_RULES rule can fire, decided with plain str checks
+
+    A False answer only means the rule engine has to look: ASCII text has no
+    Chinese characters or emoji, and without `****`, `##` or fences the
+    placeholder, markdown and code block rules cannot match. What is left
+    (spaces, subject ending and the body line counts) is checked directly.
+    """
+    if (
+        len(message) > MAX_MESSAGE_LENGTH
+        or not message.isascii()
+        or "****" in message
+        or "##" in message
+        or "```" in message
+    ):
+        return False
+
+    subject, body = split_message(message)
+    if "  " in subject or subject.rstrip().endswith(INCOMPLETE_ENDINGS):
+        return False
+    if not body:
+        return True
+
+    body_lines = body.split("\n")
+    empty_lines = 0
+    incomplete_items = 0
+    for line in body_lines:
+        stripped = line.strip()
+        if not stripped:
+            empty_lines += 1
+        elif stripped in INCOMPLETE_LIST_MARKER_SET:
+            incomplete_items += 1
+    if len(body_lines) > 10 and empty_lines > len(body_lines) * 0.3:
+        return False
+    return incomplete_items <= INCOMPLETE_LIST_THRESHOLD
+
+
+def _get_rule_engine(rules: "Iterable[str]"):
+    """Compile (or reuse) the engine for a rule set, loading it on first use"""
+    from commit_rule_engine import get_rule_engine
+
+    return get_rule_engine(rules)
+
+
+def validate_messages(
+    messages: "Iterable[str]", rules: "Iterable[str]" = HOOK_RULES
+) -> "Iterator[dict]":
+    """Validate many messages in one process, yielding one result per message
+
+    Each result has `valid`, `skipped` (merge/revert messages), `issues`
+    (issue codes), `errors` (hook error messages) and `warnings` (messages
+    for WARNING_ISSUES findings, which do not make a message invalid).
+    """
+    engine = _get_rule_engine(rules)
+    find = engine.find
+    with_body = engine.needs_body
+    for message in messages:
+        if message.startswith(SKIPPED_PREFIXES):
+            yield {"valid": True, "skipped": True, "issues": [], "errors": [], "warnings": []}
+            continue
+
+        findings, warnings = split_warnings(find(*split_message(message, with_body)))
+        yield {
+            "valid": not findings,
+            "skipped": False,
+            "issues": [issue_type for issue_type, _ in findings],
+            "errors": [format_error(issue_type, details) for issue_type, details in findings],
+            "warnings": [format_error(issue_type, details) for issue_type, details in warnings],
+        }
+
+
+def iter_nul_messages(stream: "IO[bytes]") -> "Iterator[bytes]":
+    """Split a binary stream on NUL bytes; a trailing NUL is optional"""
+    pending = b""
+    while True:
+        chunk = stream.read(STDIN_CHUNK_SIZE)
+        if not chunk:
+            break
+        pending += chunk
+        *complete, pending = pending.split(b"\0")
+        yield from complete
+    if pending:
+        yield pending
+
+
+def decode_messages(raw_messages: "Iterable[bytes]") -> "Iterator[tuple[str, str | None]]":
+    """Decode UTF-8 messages lazily, yielding (message, error)
+
+    An undecodable message comes back empty, with the error text.
+    """
+    for raw in raw_messages:
+        try:
+            yield raw.decode("utf-8"), None
+        except UnicodeDecodeError as e:
+            yield "", str(e)
+
+
+def validate_stream(source: "IO[bytes]", sink: "IO[str]") -> int:
+    """--stdin0: one JSON line per NUL-separated message, returns invalid count"""
+    import json
+    from itertools import tee
+
+    # One validate_messages() pass over the whole stream, paired back up
+    # with the decoded input to report decode errors in place
+    decoded, inputs = tee(decode_messages(iter_nul_messages(source)))
+    results = validate_messages(message for message, _ in decoded)
+    invalid = 0
+    for index, ((_, error), result) in enumerate(zip(inputs, results)):
+        if error is not None:
+            result = {"valid": False, "skipped": False, "issues": [], "errors": [
+                f"❌ Error reading commit message: {error}"
+            ], "warnings": []}
+
+        if not result["valid"]:
+            invalid += 1
+        sink.write(json.dumps({"index": index, **result}, ensure_ascii=False))
+        sink.write("\n")
+    return invalid
+
 
 class CommitMessageValidator:
     """Validates a single commit message"""
 
-    def __init__(self, message: str):
+    def __init__(self, message: str, rules: "Iterable[str]" = HOOK_RULES):
         self.message = message
-        lines = message.strip().split("\n")
-        self.subject = lines[0] if lines else ""
-        self.body = "\n".join(lines[2:]) if len(lines) > 2 else ""
-
-    def validate(self) -> Tuple[bool, List[str]]:
-        """Validate commit message, returns (is_valid, error_messages)"""
-        errors = []
-
-        # Rule 1: Check **** placeholder
-        if "****" in self.subject or "****" in self.body:
-            errors.append("❌ Contains **** placeholder - please replace with actual content")
-
-        # Rule 3: Check Chinese characters
-        if any(CHINESE_RANGE[0] <= c <= CHINESE_RANGE[1] 
-               for c in self.subject + self.body):
-            errors.append("❌ Contains Chinese characters - use English only")
-
-        # Rule 4: Check emoji in subject
-        if any(emoji in self.subject for emoji in EMOJIS):
-            errors.append("❌ Subject contains emoji - remove emoji from subject line")
-
-        # Rule 5: Check markdown markers in subject
-        if "##" in self.subject or "###" in self.subject:
-            errors.append("❌ Subject contains markdown markers (## or ###)")
-
-        # Rule 7: Check if body starts with standalone emoji line
-        body_lines = self.body.split("\n")
-        if body_lines and body_lines[0].strip() in EMOJIS:
-            errors.append("❌ Body starts with standalone emoji line")
-
-        # Rule 8: Check incomplete list items
-        incomplete_items = sum(
-            1 for line in body_lines
-            if line.strip() in INCOMPLETE_LIST_MARKERS
-        )
-        if incomplete_items > INCOMPLETE_LIST_THRESHOLD:
-            errors.append(
-                f"❌ Too many incomplete list items ({incomplete_items}) - "
-                f"threshold is {INCOMPLETE_LIST_THRESHOLD}"
-            )
-
-        # Rule 9: Check too many empty lines
-        if body_lines:
-            empty_lines = sum(1 for line in body_lines if not line.strip())
-            if empty_lines > len(body_lines) * 0.3 and len(body_lines) > 10:
-                errors.append(
-                    f"❌ Too many empty lines ({empty_lines}/{len(body_lines)}) - "
-                    f"exceeds 30% threshold"
-                )
-
-        # Rule 10: Check incomplete subject ending
-        if re.search(r"\s+(proposal|tasks|\.\.\.)\s*$", self.subject):
-            errors.append("❌ Subject has incomplete ending (proposal/tasks/...)")
-
-        # Rule 11: Check multiple spaces in subject
-        if "  " in self.subject:
-            errors.append("❌ Subject contains multiple consecutive spaces")
-
-        # Rule 12: Check chaotic markdown markers in body
-        if self.body:
-            markdown_chaos = 0
-            for line in body_lines:
-                # Isolated markdown marker
-                if re.search(r"[^\s]##|##[^\s#]", line):
-                    markdown_chaos += 1
-                # Markdown marker in middle of line
-                if re.search(r"\s##\s.*\S", line) and not line.strip().startswith("##"):
-                    markdown_chaos += 1
-
-            if markdown_chaos > 2:
-                errors.append(
-                    f"❌ Chaotic markdown markers in body ({markdown_chaos} issues) - "
-                    "use proper markdown formatting"
-                )
-
-        # Rule 13: Check malformed code blocks
-        if self.body:
-            inline_code_blocks = re.findall(r"```\w+[^`]{50,}```", self.body)
-            if inline_code_blocks:
-                errors.append(
-                    "❌ Malformed code blocks detected - "
-                    "code blocks should have line breaks, not inline"
-                )
+        self.engine = _get_rule_engine(rules)
+        self.subject, self.body = split_message(message, self.engine.needs_body)
+        self.warnings: "list[str]" = []
+
+    def validate(self) -> "tuple[bool, list[str]]":
+        """Validate commit message, returns (is_valid, error_messages)
+
+        Warnings (e.g. a message too large to check) are kept in
+        `self.warnings` and do not make the message invalid.
+        """
+        findings, warnings = split_warnings(self.engine.find(self.subject, self.body))
+        errors = [format_error(issue_type, details) for issue_type, details in findings]
+        self.warnings = [format_error(issue_type, details) for issue_type, details in warnings]
 
         return len(errors) == 0, errors
 
 
+def render_failure(errors: "list[str]") -> str:
+    """Render the hook's failure report for the given error messages"""
+    lines = [
+        "",
+        "=" * 80,
+        "❌ COMMIT MESSAGE VALIDATION FAILED",
+        "=" * 80,
+        "",
+        "The following issues were found:",
+        "",
+    ]
+    lines.extend(f"  {error}" for error in errors)
+    lines.extend(
+        [
+            "",
+            "=" * 80,
+            "Please fix these issues and try again.",
+            "=" * 80,
+            "",
+        ]
+    )
+    return "\n".join(lines)
+
+
 def main():
     """Main function for commit-msg hook"""
     if len(sys.argv) < 2:
         print("Usage: commit_msg_validator.py <commit-msg-file>")
+        print("       commit_msg_validator.py --stdin0 < messages  (NUL-separated)")
         sys.exit(1)
 
+    if sys.argv[1] == "--stdin0":
+        # Batch mode: JSON lines on stdout, exit 1 if any message is invalid
+        invalid = validate_stream(sys.stdin.buffer, sys.stdout)
+        sys.exit(1 if invalid else 0)
+
     commit_msg_file = sys.argv[1]
 
     try:
@@ -124,29 +315,23 @@ def main():
         sys.exit(1)
 
     # Skip validation for merge commits, revert commits, etc.
-    if message.startswith("Merge ") or message.startswith("Revert "):
+    if message.startswith(SKIPPED_PREFIXES):
+        sys.exit(0)
+
+    # Most messages are a plain subject: accept them before loading the rules
+    if is_trivially_valid(message):
         sys.exit(0)
 
     validator = CommitMessageValidator(message)
     is_valid, errors = validator.validate()
 
     if not is_valid:
-        print()
-        print("=" * 80)
-        print("❌ COMMIT MESSAGE VALIDATION FAILED")
-        print("=" * 80)
-        print()
-        print("The following issues were found:")
-        print()
-        for error in errors:
-            print(f"  {error}")
-        print()
-        print("=" * 80)
-        print("Please fix these issues and try again.")
-        print("=" * 80)
-        print()
+        print(render_failure(errors))
         sys.exit(1)
 
+    for warning in validator.warnings:
+        print(warning)
+
     # Success - silent exit
     sys.exit(0)
 
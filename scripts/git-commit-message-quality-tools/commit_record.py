@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Commit Records
+Compact per-commit record shared by the git log and object database
+readers: a 20-byte object id, the subject, and the body kept as UTF-8.
+Also decides how a commit message is cut into the subject and body the
+rules check, so it is one of the files that version cached verdicts.
+"""
+
+from typing import Optional, Tuple
+
+# `git log -z` layout parse_commit_record() reads, with unit separators
+# between fields so bodies can contain anything except NUL
+RECORD_FORMAT = "%H%x1f%s%x1f%b"
+# git's isspace(): message lines are trimmed of these only
+GIT_WHITESPACE = " \t\n\r"
+
+
+class CommitRecord:
+    """One commit, stored once and referenced by everything that needs it
+
+    A str holding any emoji takes 4 bytes per character, so bodies are kept
+    as UTF-8 and decoded on access. Hex hashes are derived from the binary
+    id instead of being stored.
+    """
+
+    __slots__ = ("oid", "subject", "raw_body")
+
+    def __init__(self, oid: bytes, subject: str, raw_body: bytes):
+        self.oid = oid
+        self.subject = subject
+        self.raw_body = raw_body
+
+    @classmethod
+    def from_text(cls, full_hash: str, subject: str, body: str) -> "CommitRecord":
+        return cls(bytes.fromhex(full_hash), subject, body.encode("utf-8"))
+
+    @property
+    def full_hash(self) -> str:
+        return self.oid.hex()
+
+    @property
+    def hash(self) -> str:
+        return self.oid[:4].hex()[:7]
+
+    @property
+    def body(self) -> str:
+        return self.raw_body.decode("utf-8")
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, CommitRecord):
+            return NotImplemented
+        return (
+            self.oid == other.oid
+            and self.subject == other.subject
+            and self.raw_body == other.raw_body
+        )
+
+    def __repr__(self) -> str:
+        return f"CommitRecord({self.hash}, {self.subject!r})"
+
+
+def split_message(message: str) -> Tuple[str, str]:
+    """Reproduce git's %s (first paragraph joined by spaces) and %b"""
+    lines = message.split("\n")
+    index = 0
+    while index < len(lines) and not lines[index].strip(GIT_WHITESPACE):
+        index += 1
+
+    subject_lines = []
+    while index < len(lines) and lines[index].strip(GIT_WHITESPACE):
+        subject_lines.append(lines[index].rstrip(GIT_WHITESPACE))
+        index += 1
+
+    return " ".join(subject_lines), "\n".join(lines[index:])
+
+
+def parse_commit_record(record: str) -> Optional[CommitRecord]:
+    """Parse a single RECORD_FORMAT record into a commit record"""
+    if not record.strip():
+        return None
+
+    parts = record.split("\x1f", 2)  # Split into max 3 parts
+    if len(parts) < 2:
+        return None
+
+    return CommitRecord.from_text(
+        parts[0].strip(),
+        parts[1].strip(),
+        parts[2].strip() if len(parts) > 2 else "",
+    )
@@ -0,0 +1,436 @@
+#!/usr/bin/env python3
+"""
+Compiled Commit Rule Engine
+Compiles the rules from commit_validation_config once and checks each
+message in a single pass over its subject, body characters and body lines
+"""
+
+import heapq
+import re
+import time
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+from commit_validation_config import (
+    MAX_SUBJECT_LENGTH,
+    MAX_MESSAGE_LENGTH,
+    EMOJIS,
+    CHINESE_RANGE,
+    INCOMPLETE_LIST_THRESHOLD,
+    INCOMPLETE_LIST_MARKERS,
+    ISSUE_CONTAINS_PLACEHOLDER,
+    ISSUE_SUBJECT_TOO_LONG,
+    ISSUE_CONTAINS_CHINESE,
+    ISSUE_EMOJI_IN_SUBJECT,
+    ISSUE_MARKDOWN_IN_SUBJECT,
+    ISSUE_INVALID_FORMAT,
+    ISSUE_EMOJI_FIRST_LINE,
+    ISSUE_INCOMPLETE_LIST_ITEMS,
+    ISSUE_TOO_MANY_EMPTY_LINES,
+    ISSUE_INCOMPLETE_SUBJECT_ENDING,
+    ISSUE_MULTIPLE_SPACES,
+    ISSUE_MARKDOWN_CHAOS_IN_BODY,
+    ISSUE_MALFORMED_CODE_BLOCKS,
+    ISSUE_SKIPPED_OVERSIZED,
+)
+
+# What part of a message a rule reads
+SCOPE_SUBJECT = "subject"  # The subject line only
+SCOPE_BODY_LINES = "body-lines"  # The body, line by line
+SCOPE_FULL = "full"  # Subject and body text as a whole
+
+
+class Rule:
+    """One registered rule: its issue code and the message scope it reads"""
+
+    __slots__ = ("code", "scope")
+
+    def __init__(self, code: str, scope: str):
+        self.code = code
+        self.scope = scope
+
+
+# The rule registry, in the order issues are reported. Both the commit-msg
+# hook and the history checker report these codes; each maps them to its
+# own output (hook error messages, checker issue IDs).
+RULES = (
+    Rule(ISSUE_CONTAINS_PLACEHOLDER, SCOPE_FULL),
+    Rule(ISSUE_SUBJECT_TOO_LONG, SCOPE_SUBJECT),
+    Rule(ISSUE_CONTAINS_CHINESE, SCOPE_FULL),
+    Rule(ISSUE_EMOJI_IN_SUBJECT, SCOPE_SUBJECT),
+    Rule(ISSUE_MARKDOWN_IN_SUBJECT, SCOPE_SUBJECT),
+    Rule(ISSUE_INVALID_FORMAT, SCOPE_SUBJECT),
+    Rule(ISSUE_EMOJI_FIRST_LINE, SCOPE_BODY_LINES),
+    Rule(ISSUE_INCOMPLETE_LIST_ITEMS, SCOPE_BODY_LINES),
+    Rule(ISSUE_TOO_MANY_EMPTY_LINES, SCOPE_BODY_LINES),
+    Rule(ISSUE_INCOMPLETE_SUBJECT_ENDING, SCOPE_SUBJECT),
+    Rule(ISSUE_MULTIPLE_SPACES, SCOPE_SUBJECT),
+    Rule(ISSUE_MARKDOWN_CHAOS_IN_BODY, SCOPE_BODY_LINES),
+    Rule(ISSUE_MALFORMED_CODE_BLOCKS, SCOPE_FULL),
+)
+
+RULE_SCOPES = {rule.code: rule.scope for rule in RULES}
+
+ALL_RULES = tuple(rule.code for rule in RULES)
+
+# Character-level token kinds found by the multi-pattern scanner
+TOKEN_PLACEHOLDER = "placeholder"
+TOKEN_CHINESE = "chinese"
+TOKEN_EMOJI = "emoji"
+TOKEN_MARKDOWN = "markdown"
+TOKEN_SPACES = "spaces"
+
+# Longest alternatives first so multi-codepoint emoji win over their prefixes
+_TOKEN_PATTERNS = {
+    TOKEN_PLACEHOLDER: re.escape("****"),
+    TOKEN_CHINESE: f"[{CHINESE_RANGE[0]}-{CHINESE_RANGE[1]}]",
+    TOKEN_EMOJI: "|".join(re.escape(e) for e in sorted(EMOJIS, key=len, reverse=True)),
+    TOKEN_MARKDOWN: "##",
+    TOKEN_SPACES: "  ",
+}
+
+FORMAT_RE = re.compile(r"^[a-z]+(\([^)]+\))?:\s+.+")
+# A single whitespace before the keyword is enough for a search, and avoids
+# backtracking over long whitespace runs
+INCOMPLETE_ENDING_RE = re.compile(r"\s(proposal|tasks|\.\.\.)\s*$")
+
+# Every body pattern below runs in time linear in the text it scans, so a
+# message's cost is bounded by its length (and MAX_MESSAGE_LENGTH caps that).
+#
+# Fixed-width alternatives: constant work per start position
+CHAOS_ISOLATED_RE = re.compile(r"[^\s]##|##[^\s#]")
+# Was `\s##\s.*\S`, whose `.*` runs to the end of the line and backs up.
+# The first ` ## ` leaves the most room for a later non-space, so a
+# positioned non-space search after it is equivalent and never backs up.
+CHAOS_MIDLINE_RE = re.compile(r"\s##\s")
+NON_SPACE_RE = re.compile(r"\S")
+# Was "```\w+[^`]{50,}```", which backtracks over the whole run after every
+# fence when the closing fence is missing (quadratic on unbalanced fences).
+# Both mean: a backtick-free run of 51+ chars, starting with a word char,
+# directly between two fences. The lookbehind only admits the first
+# position of each run, and that run is scanned once, so the total is linear.
+MALFORMED_CODE_BLOCK_RE = re.compile(r"(?<=```)\w[^`]{50,}(?=```)")
+
+EMOJI_SET = frozenset(EMOJIS)
+INCOMPLETE_LIST_MARKER_SET = frozenset(INCOMPLETE_LIST_MARKERS)
+
+# (issue_type, details) where details carries the counts some messages need
+Finding = Tuple[str, Tuple[int, ...]]
+
+_scanner_cache: Dict[FrozenSet[str], "re.Pattern"] = {}
+
+
+def _scanner(kinds: FrozenSet[str]) -> "re.Pattern":
+    """Return one alternation regex matching any of the given token kinds"""
+    pattern = _scanner_cache.get(kinds)
+    if pattern is None:
+        pattern = re.compile(
+            "|".join(f"(?P<{kind}>{_TOKEN_PATTERNS[kind]})" for kind in sorted(kinds))
+        )
+        _scanner_cache[kinds] = pattern
+    return pattern
+
+
+def token_scanner(kinds: Iterable[str]) -> "re.Pattern":
+    """The compiled alternation the rules use, one named group per token kind"""
+    return _scanner(frozenset(kinds))
+
+
+def scan_tokens(text: str, kinds: FrozenSet[str]) -> FrozenSet[str]:
+    """Find which token kinds occur in text, in one left-to-right pass
+
+    Once a kind is found it is dropped from the pattern, so the scan never
+    revisits a position and stops as soon as every kind has been seen.
+    """
+    found = set()
+    remaining = kinds
+    pos = 0
+    while remaining:
+        match = _scanner(remaining).search(text, pos)
+        if match is None:
+            break
+        found.add(match.lastgroup)
+        remaining = remaining - found
+        pos = match.end()  # token alphabets are disjoint, nothing can straddle
+    return frozenset(found)
+
+
+class RuleEngine:
+    """Checks commit messages against a precompiled set of rules"""
+
+    def __init__(self, rules: Optional[Iterable[str]] = None):
+        enabled = set(ALL_RULES if rules is None else rules)
+        unknown = enabled - set(ALL_RULES)
+        if unknown:
+            raise ValueError(f"Unknown rules: {', '.join(sorted(unknown))}")
+
+        self.rules = tuple(rule for rule in ALL_RULES if rule in enabled)
+
+        # Scopes decide which parts of a message are read at all: a
+        # subject-only rule set never touches the body
+        scopes = {RULE_SCOPES[rule] for rule in self.rules}
+        self.needs_body = bool(scopes - {SCOPE_SUBJECT})
+        self._needs_lines = SCOPE_BODY_LINES in scopes
+
+        subject_kinds = set()
+        body_kinds = set()
+        if ISSUE_CONTAINS_PLACEHOLDER in enabled:
+            subject_kinds.add(TOKEN_PLACEHOLDER)
+            body_kinds.add(TOKEN_PLACEHOLDER)
+        if ISSUE_CONTAINS_CHINESE in enabled:
+            subject_kinds.add(TOKEN_CHINESE)
+            body_kinds.add(TOKEN_CHINESE)
+        if ISSUE_EMOJI_IN_SUBJECT in enabled:
+            subject_kinds.add(TOKEN_EMOJI)
+        if ISSUE_MARKDOWN_IN_SUBJECT in enabled:
+            subject_kinds.add(TOKEN_MARKDOWN)
+        if ISSUE_MULTIPLE_SPACES in enabled:
+            subject_kinds.add(TOKEN_SPACES)
+        self._subject_kinds = frozenset(subject_kinds)
+        self._body_kinds = frozenset(body_kinds)
+
+        # Warm the scanner cache for the full sets
+        for kinds in (self._subject_kinds, self._body_kinds):
+            if kinds:
+                _scanner(kinds)
+
+    def find(self, subject: str, body: str, label: str = "") -> List[Finding]:
+        """Return (issue_type, details) for every rule the message violates
+
+        `label` identifies the message for profiling and is otherwise unused.
+        """
+        length = len(subject) + len(body)
+        if length > MAX_MESSAGE_LENGTH:
+            return [(ISSUE_SKIPPED_OVERSIZED, (length,))]
+
+        # Character rules: one scan over the subject, one over the body
+        tokens = scan_tokens(subject, self._subject_kinds)
+        body_kinds = self._body_kinds - tokens
+        if body_kinds and body:
+            tokens = tokens | scan_tokens(body, body_kinds)
+        return self._find_with_tokens(subject, body, tokens)
+
+    def find_many(
+        self, messages: Sequence[Tuple[str, str]], vectorized: Optional[bool] = None
+    ) -> List[List[Finding]]:
+        """find() for many (subject, body) pairs
+
+        The character rules are classified for the whole batch at once
+        (commit_batch_classifier, vectorized when NumPy is available); the
+        remaining rules run per message. Results equal find() on each pair.
+        """
+        from commit_batch_classifier import classify_messages
+
+        # Oversized messages are reported without being scanned
+        oversized = [len(s) + len(b) > MAX_MESSAGE_LENGTH for s, b in messages]
+        tokens = classify_messages(
+            [("" if skip else s) for (s, _), skip in zip(messages, oversized)],
+            [("" if skip else b) for (_, b), skip in zip(messages, oversized)],
+            self._subject_kinds,
+            self._body_kinds,
+            vectorized,
+        )
+        return [
+            [(ISSUE_SKIPPED_OVERSIZED, (len(subject) + len(body),))]
+            if skip
+            else self._find_with_tokens(subject, body, found)
+            for (subject, body), skip, found in zip(messages, oversized, tokens)
+        ]
+
+    def _find_with_tokens(
+        self, subject: str, body: str, tokens: FrozenSet[str]
+    ) -> List[Finding]:
+        """All findings, given the token kinds the character scan found"""
+        enabled = self.rules
+        findings = {}
+
+        if TOKEN_PLACEHOLDER in tokens:
+            findings[ISSUE_CONTAINS_PLACEHOLDER] = ()
+        if TOKEN_CHINESE in tokens:
+            findings[ISSUE_CONTAINS_CHINESE] = ()
+        if TOKEN_EMOJI in tokens:
+            findings[ISSUE_EMOJI_IN_SUBJECT] = ()
+        if TOKEN_MARKDOWN in tokens:
+            findings[ISSUE_MARKDOWN_IN_SUBJECT] = ()
+        if TOKEN_SPACES in tokens:
+            findings[ISSUE_MULTIPLE_SPACES] = ()
+
+        # Subject rules
+        if ISSUE_SUBJECT_TOO_LONG in enabled and len(subject) > MAX_SUBJECT_LENGTH:
+            findings[ISSUE_SUBJECT_TOO_LONG] = (len(subject),)
+        if ISSUE_INVALID_FORMAT in enabled and not FORMAT_RE.match(subject):
+            findings[ISSUE_INVALID_FORMAT] = ()
+        if (
+            ISSUE_INCOMPLETE_SUBJECT_ENDING in enabled
+            and INCOMPLETE_ENDING_RE.search(subject)
+        ):
+            findings[ISSUE_INCOMPLETE_SUBJECT_ENDING] = ()
+
+        if self._needs_lines:
+            self._find_line_issues(body, findings)
+
+        # Whole-body rules
+        if (
+            ISSUE_MALFORMED_CODE_BLOCKS in enabled
+            and "```" in body
+            and MALFORMED_CODE_BLOCK_RE.search(body)
+        ):
+            findings[ISSUE_MALFORMED_CODE_BLOCKS] = ()
+
+        return [(rule, findings[rule]) for rule in enabled if rule in findings]
+
+    def _find_line_issues(self, body: str, findings: Dict[str, Tuple[int, ...]]):
+        """Body line rules: one pass over the lines"""
+        enabled = self.rules
+        body_lines = body.split("\n")
+        if ISSUE_EMOJI_FIRST_LINE in enabled and body_lines[0].strip() in EMOJI_SET:
+            findings[ISSUE_EMOJI_FIRST_LINE] = ()
+
+        incomplete_items = 0
+        empty_lines = 0
+        markdown_chaos = 0
+        for line in body_lines:
+            stripped = line.strip()
+            if not stripped:
+                empty_lines += 1
+            elif stripped in INCOMPLETE_LIST_MARKER_SET:
+                incomplete_items += 1
+            elif "##" in line:
+                # Isolated markdown marker
+                if CHAOS_ISOLATED_RE.search(line):
+                    markdown_chaos += 1
+                # Markdown marker in middle of line
+                if not stripped.startswith("##"):
+                    marker = CHAOS_MIDLINE_RE.search(line)
+                    if marker and NON_SPACE_RE.search(line, marker.end()):
+                        markdown_chaos += 1
+
+        if (
+            ISSUE_INCOMPLETE_LIST_ITEMS in enabled
+            and incomplete_items > INCOMPLETE_LIST_THRESHOLD
+        ):
+            findings[ISSUE_INCOMPLETE_LIST_ITEMS] = (incomplete_items,)
+        if (
+            ISSUE_TOO_MANY_EMPTY_LINES in enabled
+            and empty_lines > len(body_lines) * 0.3
+            and len(body_lines) > 10
+        ):
+            findings[ISSUE_TOO_MANY_EMPTY_LINES] = (empty_lines, len(body_lines))
+        if ISSUE_MARKDOWN_CHAOS_IN_BODY in enabled and markdown_chaos > 2:
+            findings[ISSUE_MARKDOWN_CHAOS_IN_BODY] = (markdown_chaos,)
+
+    def check(self, subject: str, body: str, label: str = "") -> List[str]:
+        """Return checker-style issue IDs (e.g. subject-too-long-123)"""
+        return issue_ids(self.find(subject, body, label))
+
+    def check_many(
+        self, messages: Sequence[Tuple[str, str]], vectorized: Optional[bool] = None
+    ) -> List[List[str]]:
+        """check() for many (subject, body) pairs, classified as one batch"""
+        return [issue_ids(findings) for findings in self.find_many(messages, vectorized)]
+
+
+def issue_ids(findings: List[Finding]) -> List[str]:
+    """Checker-style issue IDs for findings (e.g. subject-too-long-123)"""
+    issues = []
+    for issue_type, details in findings:
+        if issue_type == ISSUE_SUBJECT_TOO_LONG:
+            issues.append(f"{issue_type}-{details[0]}")
+        else:
+            issues.append(issue_type)
+    return issues
+
+
+class RuleStats:
+    """Accumulated cost of one rule"""
+
+    __slots__ = ("calls", "hits", "seconds", "slowest")
+
+    def __init__(self):
+        self.calls = 0
+        self.hits = 0
+        self.seconds = 0.0
+        self.slowest = []  # min-heap of (seconds, label)
+
+
+class RuleProfiler:
+    """Collects per-rule wall time, call/hit counts and slowest messages"""
+
+    def __init__(self, slowest: int = 5):
+        self.slowest_count = slowest
+        self.stats = {rule: RuleStats() for rule in ALL_RULES}
+
+    def record(self, rule: str, elapsed: float, hit: bool, label: str):
+        stats = self.stats[rule]
+        stats.calls += 1
+        stats.seconds += elapsed
+        if hit:
+            stats.hits += 1
+        if len(stats.slowest) < self.slowest_count:
+            heapq.heappush(stats.slowest, (elapsed, label))
+        elif elapsed > stats.slowest[0][0]:
+            heapq.heapreplace(stats.slowest, (elapsed, label))
+
+    def to_dict(self) -> Dict[str, Dict]:
+        """Machine-readable summary, slowest rules first"""
+        summary = {}
+        for rule, stats in sorted(self.stats.items(), key=lambda x: -x[1].seconds):
+            if not stats.calls:
+                continue
+            summary[rule] = {
+                "calls": stats.calls,
+                "hits": stats.hits,
+                "total_ms": round(stats.seconds * 1000, 3),
+                "mean_us": round(stats.seconds / stats.calls * 1e6, 3),
+                "slowest": [
+                    {"message": label, "ms": round(seconds * 1000, 3)}
+                    for seconds, label in sorted(stats.slowest, reverse=True)
+                ],
+            }
+        return summary
+
+
+class ProfilingRuleEngine(RuleEngine):
+    """RuleEngine that evaluates and times each rule on its own
+
+    Each rule runs through a single-rule RuleEngine, so findings are
+    identical to the fused engine; only the normal engine's single pass is
+    given up. Used only when profiling is requested, so the default path
+    carries no instrumentation at all.
+    """
+
+    def __init__(self, profiler: RuleProfiler, rules: Optional[Iterable[str]] = None):
+        super().__init__(rules)
+        self.profiler = profiler
+        self._single = [(rule, RuleEngine([rule])) for rule in self.rules]
+
+    def find(self, subject: str, body: str, label: str = "") -> List[Finding]:
+        length = len(subject) + len(body)
+        if length > MAX_MESSAGE_LENGTH:
+            return [(ISSUE_SKIPPED_OVERSIZED, (length,))]
+
+        findings = []
+        clock = time.perf_counter
+        for rule, engine in self._single:
+            start = clock()
+            found = engine.find(subject, body)
+            self.profiler.record(rule, clock() - start, bool(found), label)
+            findings.extend(found)
+        return findings
+
+    def find_many(
+        self, messages: Sequence[Tuple[str, str]], vectorized: Optional[bool] = None
+    ) -> List[List[Finding]]:
+        # Timings are per rule and message, so nothing is batched
+        return [self.find(subject, body) for subject, body in messages]
+
+
+_engines: Dict[FrozenSet[str], RuleEngine] = {}
+
+
+def get_rule_engine(rules: Optional[Iterable[str]] = None) -> RuleEngine:
+    """Return the process-wide engine for a rule set, compiling it on first use"""
+    key = frozenset(ALL_RULES if rules is None else rules)
+    engine = _engines.get(key)
+    if engine is None:
+        engine = RuleEngine(key)
+        _engines[key] = engine
+    return engine
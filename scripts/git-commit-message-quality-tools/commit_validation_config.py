@@ -8,6 +8,8 @@ constants, and configurations used across multiple validation tools.
 # Validation rule configuration
 MAX_SUBJECT_LENGTH = 100
 INCOMPLETE_LIST_THRESHOLD = 3
+# Messages longer than this (subject + body, in characters) are not checked
+MAX_MESSAGE_LENGTH = 1_000_000
 
 # Emoji list for detection
 EMOJIS = [
@@ -33,6 +35,11 @@ ISSUE_INCOMPLETE_SUBJECT_ENDING = "incomplete-subject-ending"
 ISSUE_MULTIPLE_SPACES = "multiple-spaces"
 ISSUE_MARKDOWN_CHAOS_IN_BODY = "markdown-chaos-in-body"
 ISSUE_MALFORMED_CODE_BLOCKS = "malformed-code-blocks"
+ISSUE_SKIPPED_OVERSIZED = "skipped-oversized"
+
+# Findings that are reported as warnings: they never fail a check and
+# never end up in a fix plan
+WARNING_ISSUES = frozenset({ISSUE_SKIPPED_OVERSIZED})
 
 # Incomplete list markers
 INCOMPLETE_LIST_MARKERS = [
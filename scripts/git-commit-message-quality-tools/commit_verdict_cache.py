@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Commit Verdict Cache
+Persists per-commit check results so re-scans only validate new commits
+"""
+
+import hashlib
+import os
+import sqlite3
+import subprocess
+from typing import Dict, Iterable, List, Optional
+
+CACHE_FILE_NAME = "commit-checker-cache.sqlite"
+
+# Stored issue lists are joined with this separator ("" means clean commit)
+ISSUE_SEP = "\n"
+
+# Keep IN (...) clauses well below SQLite's host parameter limit
+LOOKUP_BATCH_SIZE = 500
+
+
+def compute_rules_version(source_files: Iterable[str]) -> str:
+    """Fingerprint the files that define the rules (config + implementation)"""
+    digest = hashlib.sha1()
+    for path in source_files:
+        with open(path, "rb") as f:
+            digest.update(f.read())
+    return digest.hexdigest()
+
+
+def default_cache_path(repo_path: str, file_name: str = CACHE_FILE_NAME) -> Optional[str]:
+    """Return the cache location inside the repository's git dir"""
+    result = subprocess.run(
+        ["git", "rev-parse", "--absolute-git-dir"],
+        capture_output=True,
+        text=True,
+        cwd=repo_path,
+    )
+    if result.returncode != 0:
+        return None
+    return os.path.join(result.stdout.strip(), file_name)
+
+
+class VerdictCache:
+    """Maps full commit hash -> issue list for one rule-set version"""
+
+    def __init__(self, path: str, rules_version: str, timeout: float = 30, wal: bool = False):
+        self.path = path
+        self.rules_version = rules_version
+        self.hits = 0
+        self.misses = 0
+        self._pending = []
+
+        # A generous timeout lets concurrent runs share the same cache file
+        self.conn = sqlite3.connect(path, timeout=timeout)
+        if wal:
+            # Many short-lived writers: readers never wait for a writer
+            self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)"
+        )
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS verdicts "
+            "(hash TEXT PRIMARY KEY, issues TEXT NOT NULL)"
+        )
+
+        row = self.conn.execute(
+            "SELECT value FROM meta WHERE key = 'rules_version'"
+        ).fetchone()
+        if row is None or row[0] != rules_version:
+            # Rules changed: every stored verdict is stale
+            self.conn.execute("DELETE FROM verdicts")
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta (key, value) VALUES ('rules_version', ?)",
+                (rules_version,),
+            )
+        self.conn.commit()
+
+    def lookup_many(self, hashes: List[str]) -> Dict[str, List[str]]:
+        """Return cached issues for the given hashes (unknown hashes are omitted)"""
+        found = {}
+        for start in range(0, len(hashes), LOOKUP_BATCH_SIZE):
+            batch = hashes[start : start + LOOKUP_BATCH_SIZE]
+            placeholders = ",".join("?" * len(batch))
+            rows = self.conn.execute(
+                f"SELECT hash, issues FROM verdicts WHERE hash IN ({placeholders})",
+                batch,
+            )
+            for full_hash, issues in rows:
+                found[full_hash] = issues.split(ISSUE_SEP) if issues else []
+
+        self.hits += len(found)
+        self.misses += len(hashes) - len(found)
+        return found
+
+    def store(self, full_hash: str, issues: List[str]):
+        """Queue a verdict; written on flush()"""
+        self._pending.append((full_hash, ISSUE_SEP.join(issues)))
+        if len(self._pending) >= LOOKUP_BATCH_SIZE:
+            self.flush()
+
+    def flush(self):
+        """Write queued verdicts to disk"""
+        if not self._pending:
+            return
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO verdicts (hash, issues) VALUES (?, ?)",
+            self._pending,
+        )
+        self.conn.commit()
+        self._pending = []
+
+    def clear(self):
+        """Drop all cached verdicts"""
+        self._pending = []
+        self.conn.execute("DELETE FROM verdicts")
+        self.conn.commit()
+
+    def close(self):
+        """Flush and close the database"""
+        self.flush()
+        self.conn.close()
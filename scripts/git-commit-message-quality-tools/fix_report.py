@@ -0,0 +1,317 @@
+#!/usr/bin/env python3
+"""
+Fix Report I/O
+Streams fix plans as newline-delimited JSON (one commit per line), with the
+legacy pretty-printed JSON array still readable and writable
+"""
+
+import bisect
+import json
+import os
+import sys
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+DEFAULT_REPORT_FILE = "/tmp/unified_commit_fixes.jsonl"
+LEGACY_REPORT_FILE = "/tmp/unified_commit_fixes.json"
+
+FORMAT_JSONL = "jsonl"
+FORMAT_JSON = "json"
+
+# fix_status values set by the auto-fixer and the fix pipeline
+STATUS_ACCEPTED = "accepted"  # Passed re-validation, fixed_* filled in
+STATUS_REJECTED = "rejected"  # A fix was proposed, but it breaks rules
+STATUS_FAILED = "failed"  # No usable fix came back; retried next run
+
+# Sidecar offset index, rebuilt whenever the report's size or mtime changes
+INDEX_SUFFIX = ".idx"
+INDEX_HEADER = "# fix-report-index 1"
+
+
+def default_report_file() -> str:
+    """Prefer the JSONL report, fall back to a legacy JSON array report"""
+    if not os.path.exists(DEFAULT_REPORT_FILE) and os.path.exists(LEGACY_REPORT_FILE):
+        return LEGACY_REPORT_FILE
+    return DEFAULT_REPORT_FILE
+
+
+def issue_key(issue: str) -> str:
+    """Group parameterised issues (subject-too-long-123 -> subject-too-long)"""
+    if issue.startswith("subject-too-long-"):
+        return "subject-too-long"
+    return issue
+
+
+class JsonlReportWriter:
+    """Writes one fix record per line as soon as it is produced"""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.count = 0
+        self._file = open(path, "w", encoding="utf-8")
+
+    def write(self, record: Dict):
+        self._file.write(json.dumps(record, ensure_ascii=False))
+        self._file.write("\n")
+        self.count += 1
+
+    def close(self):
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class JsonArrayReportWriter(JsonlReportWriter):
+    """Writes the legacy `json.dump(fixes, indent=2)` layout incrementally"""
+
+    def write(self, record: Dict):
+        item = json.dumps(record, indent=2, ensure_ascii=False).replace("\n", "\n  ")
+        self._file.write(("[\n  " if self.count == 0 else ",\n  ") + item)
+        self.count += 1
+
+    def close(self):
+        self._file.write("\n]" if self.count else "[]")
+        self._file.close()
+
+
+def open_report_writer(path: str, fmt: str = FORMAT_JSONL) -> JsonlReportWriter:
+    """Create a writer for the requested report format"""
+    if fmt == FORMAT_JSON:
+        return JsonArrayReportWriter(path)
+    return JsonlReportWriter(path)
+
+
+def report_format(path: str) -> str:
+    """FORMAT_JSON for a legacy array report, otherwise FORMAT_JSONL"""
+    with open(path, "r", encoding="utf-8") as f:
+        first = f.read(1)
+        while first.isspace():
+            first = f.read(1)
+    return FORMAT_JSON if first == "[" else FORMAT_JSONL
+
+
+def iter_report(path: str) -> Iterator[Dict]:
+    """Stream fix records from either report format"""
+    with open(path, "r", encoding="utf-8") as f:
+        first = f.read(1)
+        while first.isspace():
+            first = f.read(1)
+
+        if first == "[":
+            # Legacy array: no streaming parser in the stdlib, load it whole
+            f.seek(0)
+            yield from json.load(f)
+            return
+
+        f.seek(0)
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+def write_report(path: str, records: Iterable[Dict], fmt: str = FORMAT_JSONL) -> int:
+    """Write all records, returns how many were written"""
+    with open_report_writer(path, fmt) as writer:
+        for record in records:
+            writer.write(record)
+        return writer.count
+
+
+def count_records(path: str) -> int:
+    """Number of fix records in a report"""
+    return sum(1 for _ in iter_report(path))
+
+
+class IndexEntry:
+    """Where one record sits in the report, plus what it is looked up by"""
+
+    __slots__ = ("offset", "length", "full_hash", "issues")
+
+    def __init__(self, offset: int, length: int, full_hash: str, issues: Tuple[str, ...]):
+        self.offset = offset
+        self.length = length
+        self.full_hash = full_hash
+        self.issues = issues  # issue_key() of each issue
+
+
+class ReportIndex:
+    """Random access to fix records by position, hash prefix or issue type
+
+    JSONL reports are indexed by byte offset, so reading a record is one
+    seek. The index is saved next to the report and reused until the report
+    changes. Legacy JSON arrays cannot be seeked into and are held in memory.
+    """
+
+    def __init__(self, path: str, entries: List[IndexEntry], records: Optional[List[Dict]] = None):
+        self.path = path
+        self.entries = entries
+        self._records = records
+        self._file = None
+        self._by_hash = None
+
+    @classmethod
+    def open(cls, path: str, save: bool = True) -> "ReportIndex":
+        """Load the sidecar index if it is current, otherwise build it"""
+        stat = os.stat(path)
+        stamp = f"{INDEX_HEADER} {stat.st_size} {stat.st_mtime_ns}"
+        index_path = path + INDEX_SUFFIX
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                if f.readline().rstrip("\n") == stamp:
+                    return cls(path, [_parse_index_line(line) for line in f])
+        except OSError:
+            pass
+
+        index = cls.build(path)
+        if save and index._records is None:
+            try:
+                with open(index_path, "w", encoding="utf-8") as f:
+                    f.write(stamp + "\n")
+                    for entry in index.entries:
+                        f.write(
+                            f"{entry.offset} {entry.length} {entry.full_hash} "
+                            f"{','.join(entry.issues)}\n"
+                        )
+            except OSError:
+                pass  # Read-only location: the index just isn't reused
+        return index
+
+    @classmethod
+    def build(cls, path: str) -> "ReportIndex":
+        """Scan the report once, recording each line's offset and keys"""
+        entries = []
+        with open(path, "rb") as f:
+            head = f.read(64).lstrip()
+            if head.startswith(b"["):
+                records = list(iter_report(path))
+                entries = [_index_entry(-1, 0, record) for record in records]
+                return cls(path, entries, records)
+
+            f.seek(0)
+            offset = 0
+            for line in f:
+                if line.strip():
+                    entries.append(_index_entry(offset, len(line), json.loads(line)))
+                offset += len(line)
+        return cls(path, entries)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def find_hash(self, prefix: str) -> List[int]:
+        """Positions of records whose full hash starts with prefix"""
+        if self._by_hash is None:
+            self._by_hash = sorted((e.full_hash, i) for i, e in enumerate(self.entries))
+        prefix = prefix.lower()
+        positions = []
+        start = bisect.bisect_left(self._by_hash, (prefix,))
+        for full_hash, position in self._by_hash[start:]:
+            if not full_hash.startswith(prefix):
+                break
+            positions.append(position)
+        return sorted(positions)
+
+    def select(
+        self, issues: Iterable[str] = (), hash_prefixes: Iterable[str] = ()
+    ) -> List[int]:
+        """Positions matching any hash prefix and any issue type, in report order"""
+        prefixes = list(hash_prefixes)
+        if prefixes:
+            positions = sorted({p for prefix in prefixes for p in self.find_hash(prefix)})
+        else:
+            positions = range(len(self.entries))
+
+        wanted = {issue_key(issue) for issue in issues}
+        if not wanted:
+            return list(positions)
+        return [p for p in positions if wanted.intersection(self.entries[p].issues)]
+
+    def read(self, position: int) -> Dict:
+        """The full record at a position"""
+        if self._records is not None:
+            return self._records[position]
+        if self._file is None:
+            self._file = open(self.path, "rb")
+        entry = self.entries[position]
+        self._file.seek(entry.offset)
+        return json.loads(self._file.read(entry.length))
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _index_entry(offset: int, length: int, record: Dict) -> IndexEntry:
+    issues = tuple(dict.fromkeys(issue_key(issue) for issue in record["issues"]))
+    return IndexEntry(offset, length, record["full_hash"], issues)
+
+
+def _parse_index_line(line: str) -> IndexEntry:
+    offset, length, full_hash, *issues = line.rstrip("\n").split(" ")
+    keys = tuple(issues[0].split(",")) if issues and issues[0] else ()
+    return IndexEntry(int(offset), int(length), full_hash, keys)
+
+
+def working_text(record: Dict) -> Tuple[str, str, List[str]]:
+    """(subject, body, issues) a fixer should start from
+
+    After the auto-fixer this is its partly fixed draft and the issues it
+    left unresolved, otherwise the original message and issues.
+    """
+    if "unresolved_issues" in record:
+        return record["autofix_subject"], record["autofix_body"], record["unresolved_issues"]
+    return record["original_subject"], record.get("original_body", ""), record["issues"]
+
+
+def issue_statistics(records: Iterable[Dict]) -> List[Tuple[str, int]]:
+    """(issue, commit count) pairs, most common first"""
+    counts = {}
+    for record in records:
+        for issue in record["issues"]:
+            key = issue_key(issue)
+            counts[key] = counts.get(key, 0) + 1
+    return sorted(counts.items(), key=lambda x: x[1], reverse=True)
+
+
+def main():
+    """Small CLI used by unified_commit_fixer.sh"""
+    usage = "Usage: fix_report.py {count|stats|head N|list} <report-file>"
+    if len(sys.argv) < 3:
+        print(usage)
+        return 1
+
+    command, path = sys.argv[1], sys.argv[-1]
+    if command == "count":
+        print(count_records(path))
+    elif command == "stats":
+        for issue, count in issue_statistics(iter_report(path)):
+            print(f"  {issue}: {count} commits")
+    elif command == "head" and len(sys.argv) == 4:
+        limit = int(sys.argv[2])
+        for index, record in enumerate(iter_report(path)):
+            if index >= limit:
+                break
+            print(f"{record['hash']} - {record['original_subject'][:60]}...")
+            print(f"  Issues: {', '.join(record['issues'])}")
+            print(f"  Fixed: {record['fixed_subject'][:60]}...")
+    elif command == "list":
+        for record in iter_report(path):
+            print(f"{record['hash']} - {record['original_subject'][:60]}...")
+    else:
+        print(usage)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    exit(main())
@@ -0,0 +1,451 @@
+#!/usr/bin/env python3
+"""
+Git Object Database Reader
+Reads commits straight from loose objects and packfiles (mmap-ed packs,
+.idx v2 lookup, zlib inflate, delta resolution) without running git
+"""
+
+import heapq
+import mmap
+import os
+import struct
+import zlib
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from commit_record import CommitRecord, split_message
+
+OBJ_COMMIT = 1
+OBJ_TREE = 2
+OBJ_BLOB = 3
+OBJ_TAG = 4
+OBJ_OFS_DELTA = 6
+OBJ_REF_DELTA = 7
+
+TYPE_NAMES = {b"commit": OBJ_COMMIT, b"tree": OBJ_TREE, b"blob": OBJ_BLOB, b"tag": OBJ_TAG}
+
+IDX_MAGIC = b"\377tOc"
+INFLATE_CHUNK_SIZE = 4 * 1024
+# Resolved delta bases kept around; commits chain deltas on each other
+DELTA_BASE_CACHE_SIZE = 256
+
+class ObjectNotFound(KeyError):
+    """Object id not present in the repository"""
+
+
+def find_git_dir(repo_path: str) -> str:
+    """Locate the git dir for a work tree or bare repository"""
+    dot_git = os.path.join(repo_path, ".git")
+    if os.path.isdir(dot_git):
+        return dot_git
+    if os.path.isfile(dot_git):
+        # Worktrees and submodules: ".git" is a file pointing elsewhere
+        with open(dot_git, "r", encoding="utf-8") as f:
+            target = f.read().strip()
+        if target.startswith("gitdir:"):
+            return os.path.normpath(os.path.join(repo_path, target[len("gitdir:") :].strip()))
+    if os.path.isdir(os.path.join(repo_path, "objects")) and os.path.exists(
+        os.path.join(repo_path, "HEAD")
+    ):
+        return repo_path
+    raise FileNotFoundError(f"Not a git repository: {repo_path}")
+
+
+def common_dir(git_dir: str) -> str:
+    """Linked worktrees keep objects and refs in the main git dir"""
+    path = os.path.join(git_dir, "commondir")
+    if os.path.isfile(path):
+        with open(path, "r", encoding="utf-8") as f:
+            return os.path.normpath(os.path.join(git_dir, f.read().strip()))
+    return git_dir
+
+
+def _inflate(buffer, offset: int) -> bytes:
+    """Inflate a zlib stream starting at offset, without knowing its length"""
+    decompressor = zlib.decompressobj()
+    chunks = []
+    while not decompressor.eof:
+        chunk = buffer[offset : offset + INFLATE_CHUNK_SIZE]
+        if not chunk:
+            raise ValueError("Truncated zlib stream")
+        chunks.append(decompressor.decompress(chunk))
+        offset += INFLATE_CHUNK_SIZE
+    return b"".join(chunks)
+
+
+def _delta_size(delta: bytes, pos: int) -> Tuple[int, int]:
+    """Read a delta header varint, returns (value, new_pos)"""
+    value = 0
+    shift = 0
+    while True:
+        byte = delta[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        shift += 7
+        if not byte & 0x80:
+            return value, pos
+
+
+def apply_delta(base: bytes, delta: bytes) -> bytes:
+    """Apply a git delta (copy/insert instructions) to a base object"""
+    _, pos = _delta_size(delta, 0)  # source size
+    result_size, pos = _delta_size(delta, pos)
+    out = bytearray()
+    end = len(delta)
+    while pos < end:
+        opcode = delta[pos]
+        pos += 1
+        if opcode & 0x80:
+            # Copy from base: offset and size bytes present per flag bit
+            offset = 0
+            size = 0
+            for bit in range(4):
+                if opcode & (1 << bit):
+                    offset |= delta[pos] << (8 * bit)
+                    pos += 1
+            for bit in range(3):
+                if opcode & (1 << (4 + bit)):
+                    size |= delta[pos] << (8 * bit)
+                    pos += 1
+            out += base[offset : offset + (size or 0x10000)]
+        elif opcode:
+            out += delta[pos : pos + opcode]
+            pos += opcode
+        else:
+            raise ValueError("Invalid delta opcode 0")
+    if len(out) != result_size:
+        raise ValueError("Delta produced wrong size")
+    return bytes(out)
+
+
+class PackFile:
+    """One packfile and its version 2 index, both mmap-ed"""
+
+    def __init__(self, idx_path: str):
+        self.idx_path = idx_path
+        self.pack_path = idx_path[: -len(".idx")] + ".pack"
+
+        with open(idx_path, "rb") as f:
+            self.idx = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        with open(self.pack_path, "rb") as f:
+            self.pack = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        if self.idx[:4] != IDX_MAGIC or struct.unpack(">I", self.idx[4:8])[0] != 2:
+            raise ValueError(f"Unsupported pack index: {idx_path}")
+
+        self.fanout = struct.unpack(">256I", self.idx[8 : 8 + 256 * 4])
+        self.count = self.fanout[255]
+        self._names = 8 + 256 * 4
+        self._offsets = self._names + self.count * 20 + self.count * 4
+        self._large_offsets = self._offsets + self.count * 4
+
+    def _name(self, index: int) -> bytes:
+        start = self._names + index * 20
+        return self.idx[start : start + 20]
+
+    def find_offset(self, oid: bytes) -> Optional[int]:
+        """Pack offset of an object, via fan-out table and binary search"""
+        first = oid[0]
+        lo = self.fanout[first - 1] if first else 0
+        hi = self.fanout[first]
+        while lo < hi:
+            mid = (lo + hi) // 2
+            name = self._name(mid)
+            if name < oid:
+                lo = mid + 1
+            elif name > oid:
+                hi = mid
+            else:
+                return self._offset(mid)
+        return None
+
+    def _offset(self, index: int) -> int:
+        start = self._offsets + index * 4
+        offset = struct.unpack(">I", self.idx[start : start + 4])[0]
+        if offset & 0x80000000:
+            # MSB set: index into the 64-bit offset table
+            start = self._large_offsets + (offset & 0x7FFFFFFF) * 8
+            offset = struct.unpack(">Q", self.idx[start : start + 8])[0]
+        return offset
+
+    def read_entry(self, offset: int) -> Tuple[int, bytes, Optional[object]]:
+        """Read the entry at offset: (type, data, delta_base)
+
+        delta_base is an absolute pack offset for OFS_DELTA, an object id
+        for REF_DELTA, and None for whole objects.
+        """
+        pack = self.pack
+        byte = pack[offset]
+        pos = offset + 1
+        obj_type = (byte >> 4) & 0x7
+        while byte & 0x80:  # remaining size bytes; inflate tells us the size
+            byte = pack[pos]
+            pos += 1
+
+        base = None
+        if obj_type == OBJ_OFS_DELTA:
+            byte = pack[pos]
+            pos += 1
+            rel = byte & 0x7F
+            while byte & 0x80:
+                byte = pack[pos]
+                pos += 1
+                rel = ((rel + 1) << 7) | (byte & 0x7F)
+            base = offset - rel
+        elif obj_type == OBJ_REF_DELTA:
+            base = bytes(pack[pos : pos + 20])
+            pos += 20
+
+        return obj_type, _inflate(pack, pos), base
+
+    def close(self):
+        self.idx.close()
+        self.pack.close()
+
+
+class ObjectDatabase:
+    """Reads objects from a repository's loose objects and packs"""
+
+    def __init__(self, git_dir: str):
+        self.git_dir = git_dir
+        self.objects_dirs = [os.path.join(common_dir(git_dir), "objects")]
+        self._add_alternates(self.objects_dirs[0])
+        self.packs: List[PackFile] = []
+        for objects_dir in self.objects_dirs:
+            pack_dir = os.path.join(objects_dir, "pack")
+            if os.path.isdir(pack_dir):
+                for name in sorted(os.listdir(pack_dir)):
+                    if name.endswith(".idx"):
+                        self.packs.append(PackFile(os.path.join(pack_dir, name)))
+        self._base_cache: Dict[Tuple[int, int], Tuple[int, bytes]] = {}
+
+    def _add_alternates(self, objects_dir: str):
+        path = os.path.join(objects_dir, "info", "alternates")
+        if not os.path.isfile(path):
+            return
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    alternate = os.path.normpath(os.path.join(objects_dir, line))
+                    if alternate not in self.objects_dirs:
+                        self.objects_dirs.append(alternate)
+                        self._add_alternates(alternate)
+
+    def read(self, oid: bytes) -> Tuple[int, bytes]:
+        """Return (type, content) of an object by binary id"""
+        for pack_index, pack in enumerate(self.packs):
+            offset = pack.find_offset(oid)
+            if offset is not None:
+                return self._read_packed(pack_index, offset)
+
+        hex_id = oid.hex()
+        for objects_dir in self.objects_dirs:
+            path = os.path.join(objects_dir, hex_id[:2], hex_id[2:])
+            if os.path.isfile(path):
+                with open(path, "rb") as f:
+                    raw = zlib.decompress(f.read())
+                header, _, content = raw.partition(b"\0")
+                return TYPE_NAMES[header.split(b" ", 1)[0]], content
+
+        raise ObjectNotFound(hex_id)
+
+    def _read_packed(self, pack_index: int, offset: int) -> Tuple[int, bytes]:
+        obj_type, data, base = self.packs[pack_index].read_entry(offset)
+        if obj_type == OBJ_OFS_DELTA:
+            base_type, base_data = self._read_base(pack_index, base)
+            obj_type, data = base_type, apply_delta(base_data, data)
+        elif obj_type == OBJ_REF_DELTA:
+            base_type, base_data = self.read(base)
+            obj_type, data = base_type, apply_delta(base_data, data)
+        return obj_type, data
+
+    def _read_base(self, pack_index: int, offset: int) -> Tuple[int, bytes]:
+        """Delta base lookup; only bases are cached, plain reads are not"""
+        key = (pack_index, offset)
+        cached = self._base_cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = self._read_packed(pack_index, offset)
+        if len(self._base_cache) >= DELTA_BASE_CACHE_SIZE:
+            self._base_cache.pop(next(iter(self._base_cache)))
+        self._base_cache[key] = result
+        return result
+
+    def close(self):
+        for pack in self.packs:
+            pack.close()
+
+
+def read_refs(git_dir: str) -> List[Tuple[str, str]]:
+    """All refs as (name, hex id), sorted by name, followed by HEAD"""
+    refs = {}
+    ref_root = common_dir(git_dir)
+
+    packed = os.path.join(ref_root, "packed-refs")
+    if os.path.isfile(packed):
+        with open(packed, "r", encoding="utf-8") as f:
+            for line in f:
+                if line.startswith(("#", "^")):
+                    continue
+                parts = line.split()
+                if len(parts) == 2:
+                    refs[parts[1]] = parts[0]
+
+    # Loose refs override packed ones
+    refs_dir = os.path.join(ref_root, "refs")
+    for dirpath, _, filenames in os.walk(refs_dir):
+        for filename in filenames:
+            path = os.path.join(dirpath, filename)
+            name = os.path.relpath(path, ref_root).replace(os.sep, "/")
+            target = _resolve_ref_file(ref_root, path, refs)
+            if target:
+                refs[name] = target
+
+    result = sorted(refs.items())
+    head = _resolve_ref_file(ref_root, os.path.join(git_dir, "HEAD"), refs)
+    if head:
+        result.append(("HEAD", head))
+    return result
+
+
+def _resolve_ref_file(ref_root: str, path: str, packed: Dict[str, str], depth: int = 0) -> Optional[str]:
+    """Read a ref file, following symbolic refs"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            content = f.read().strip()
+    except (OSError, UnicodeDecodeError):
+        return None
+
+    if content.startswith("ref:"):
+        target = content[4:].strip()
+        if depth > 5:
+            return None
+        target_path = os.path.join(ref_root, target)
+        if os.path.isfile(target_path):
+            return _resolve_ref_file(ref_root, target_path, packed, depth + 1)
+        return packed.get(target)
+
+    if len(content) == 40:
+        return content
+    return None
+
+
+def parse_commit_header(header: bytes) -> Tuple[List[bytes], int, str]:
+    """Parse a raw commit header into (parent ids, committer time, encoding)"""
+    parents = []
+    timestamp = 0
+    encoding = "utf-8"
+    for line in header.split(b"\n"):
+        if line.startswith(b"parent "):
+            parents.append(bytes.fromhex(line[7:47].decode("ascii")))
+        elif line.startswith(b"committer "):
+            # "committer Name <email> 1700000000 +0000"
+            fields = line.rsplit(b" ", 2)
+            if len(fields) == 3 and fields[1].isdigit():
+                timestamp = int(fields[1])
+        elif line.startswith(b"encoding "):
+            encoding = line[9:].decode("ascii", errors="replace").strip()
+    return parents, timestamp, encoding
+
+
+def parse_commit(content: bytes) -> Tuple[List[bytes], int, str]:
+    """Split a raw commit into (parent ids, committer time, message text)"""
+    header, _, raw_message = content.partition(b"\n\n")
+    parents, timestamp, encoding = parse_commit_header(header)
+    try:
+        message = raw_message.decode(encoding, errors="replace")
+    except LookupError:
+        message = raw_message.decode("utf-8", errors="replace")
+    return parents, timestamp, message
+
+
+def parse_commit_links(content: bytes) -> Tuple[List[bytes], int, None]:
+    """parse_commit() without the message, for walks that only need the graph"""
+    end = content.find(b"\n\n")
+    parents, timestamp, _ = parse_commit_header(content if end < 0 else content[:end])
+    return parents, timestamp, None
+
+
+class ObjectDatabaseReader:
+    """Yields commit records like `git log --all`, straight from the ODB"""
+
+    def __init__(self, repo_path: str):
+        self.git_dir = find_git_dir(repo_path)
+        self.odb = ObjectDatabase(self.git_dir)
+
+    def _peel_to_commit(self, oid: bytes) -> Optional[bytes]:
+        """Follow annotated tags down to a commit id"""
+        for _ in range(10):
+            try:
+                obj_type, content = self.odb.read(oid)
+            except ObjectNotFound:
+                return None
+            if obj_type == OBJ_COMMIT:
+                return oid
+            if obj_type != OBJ_TAG or not content.startswith(b"object "):
+                return None
+            oid = bytes.fromhex(content[7:47].decode("ascii"))
+        return None
+
+    def _record(self, oid: bytes, message: str) -> CommitRecord:
+        subject, body = split_message(message)
+        return CommitRecord(oid, subject.strip(), body.strip().encode("utf-8"))
+
+    def iter_commits(self, hashes: Optional[List[str]] = None) -> Iterator[CommitRecord]:
+        """All commits reachable from any ref, newest first
+
+        Mirrors git's default walk: tips sorted by committer date, then a
+        date-ordered queue where equal dates keep insertion order. With
+        `hashes`, only those commits are read, in the given order.
+        """
+        if hashes is not None:
+            for full_hash in hashes:
+                oid = bytes.fromhex(full_hash)
+                _, _, message = parse_commit(self.odb.read(oid)[1])
+                yield self._record(oid, message)
+            return
+
+        for oid, message in self._walk(parse_commit):
+            yield self._record(oid, message)
+
+    def _walk(self, parse) -> Iterator[Tuple[bytes, Optional[str]]]:
+        """(commit id, message) in git's default order; `parse` reads a raw commit"""
+        seen = set()
+        queue = []
+        counter = 0
+        for _, hex_id in read_refs(self.git_dir):
+            oid = self._peel_to_commit(bytes.fromhex(hex_id))
+            if oid is None or oid in seen:
+                continue
+            seen.add(oid)
+            parents, timestamp, message = parse(self.odb.read(oid)[1])
+            heapq.heappush(queue, (-timestamp, counter, oid, parents, message))
+            counter += 1
+
+        while queue:
+            _, _, oid, parents, message = heapq.heappop(queue)
+            yield oid, message
+            for parent in parents:
+                if parent in seen:
+                    continue
+                seen.add(parent)
+                try:
+                    content = self.odb.read(parent)[1]
+                except ObjectNotFound:
+                    continue  # Shallow clone boundary
+                parent_parents, timestamp, parent_message = parse(content)
+                heapq.heappush(
+                    queue, (-timestamp, counter, parent, parent_parents, parent_message)
+                )
+                counter += 1
+
+    def list_commit_hashes(self) -> List[str]:
+        """Full hashes of all commits, in walk order
+
+        Only commit headers are parsed: no message is decoded or split.
+        """
+        return [oid.hex() for oid, _ in self._walk(parse_commit_links)]
+
+    def close(self):
+        self.odb.close()
@@ -0,0 +1,388 @@
+#!/usr/bin/env python3
+"""
+Pre-receive Validator
+Server-side enforcement of the commit-msg hook rules: reads the
+`<old> <new> <ref>` lines of a pre-receive hook and rejects the push when
+any commit it introduces fails validation
+"""
+
+import argparse
+import os
+import sqlite3
+import subprocess
+import sys
+import threading
+import time
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from commit_msg_validator import (
+    SKIPPED_PREFIXES,
+    is_trivially_valid,
+    iter_nul_messages,
+    render_failure,
+    validate_messages,
+)
+from commit_verdict_cache import VerdictCache, compute_rules_version, default_cache_path
+
+# Verdicts here are hook error messages for the hook rule set, so they live
+# apart from the checker's cache (a different rule set would wipe it)
+CACHE_FILE_NAME = "commit-pre-receive-cache.sqlite"
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+RULE_SOURCE_FILES = [
+    os.path.join(SCRIPT_DIR, "commit_validation_config.py"),
+    os.path.join(SCRIPT_DIR, "commit_rule_engine.py"),
+    os.path.join(SCRIPT_DIR, "commit_msg_validator.py"),
+]
+
+# Per-push budget: a push needing more fresh validations than this, or
+# taking longer, gets the --on-limit policy instead of an open-ended wait
+DEFAULT_MAX_COMMITS = 5000
+DEFAULT_TIMEOUT = 20.0
+# A concurrent push holding the cache lock must not eat the budget
+CACHE_LOCK_TIMEOUT = 2.0
+VALIDATE_BATCH_SIZE = 256
+MAX_REPORTED_COMMITS = 10
+
+ON_LIMIT_REJECT = "reject"
+ON_LIMIT_ACCEPT = "accept"
+
+
+def parse_update_lines(lines: Iterable[str]) -> List[Tuple[str, str, str]]:
+    """Parse pre-receive stdin into (old, new, ref) updates"""
+    updates = []
+    for line in lines:
+        fields = line.split()
+        if len(fields) == 3:
+            updates.append((fields[0], fields[1], fields[2]))
+    return updates
+
+
+def pushed_tips(updates: Iterable[Tuple[str, str, str]]) -> List[str]:
+    """New ref values, without deletions (which introduce nothing)"""
+    return list(dict.fromkeys(new for _, new, _ in updates if set(new) != {"0"}))
+
+
+def validate_batch(messages: List[str]) -> List[List[str]]:
+    """Hook error messages for each message ([] means accepted)
+
+    Merge/revert messages and messages the fast path accepts never reach
+    the rule engine, so a push of plain subjects does not even load it.
+    """
+    results = [[] for _ in messages]
+    todo = [
+        i for i, message in enumerate(messages)
+        if not message.startswith(SKIPPED_PREFIXES) and not is_trivially_valid(message)
+    ]
+    for i, result in zip(todo, validate_messages([messages[i] for i in todo])):
+        results[i] = result["errors"]
+    return results
+
+
+class PushVerdict:
+    """Outcome of validating the commits one push introduces"""
+
+    __slots__ = ("new_commits", "cached", "validated", "rejected", "limit")
+
+    def __init__(self):
+        self.new_commits = 0
+        self.cached = 0  # Verdicts reused from earlier pushes
+        self.validated = 0
+        self.rejected: List[Tuple[str, str, List[str]]] = []  # (hash, subject, errors)
+        self.limit: Optional[str] = None  # Why validation stopped early
+
+    def accepted(self, on_limit: str = ON_LIMIT_REJECT) -> bool:
+        if self.rejected:
+            return False
+        return self.limit is None or on_limit == ON_LIMIT_ACCEPT
+
+
+class PreReceiveValidator:
+    """Validates the commits of a push in one pass over the repository
+
+    Only commits no existing ref reaches are listed (`--not --all`), so
+    commits already accepted on another ref are never re-validated. Verdicts
+    are cached by hash, which covers concurrent and retried pushes of the
+    same commits before any ref points at them.
+    """
+
+    def __init__(
+        self,
+        repo_path: str,
+        cache: Optional[VerdictCache] = None,
+        max_commits: int = DEFAULT_MAX_COMMITS,
+        timeout: float = DEFAULT_TIMEOUT,
+    ):
+        self.repo_path = repo_path
+        self.cache = cache
+        self.max_commits = max_commits
+        self.timeout = timeout
+
+    def list_new_commits(self, tips: List[str], deadline: float) -> List[str]:
+        """Commits reachable from the pushed tips but from no existing ref"""
+        # New objects sit in the push quarantine; git finds them through the
+        # environment the hook inherits
+        result = subprocess.run(
+            ["git", "rev-list", "--stdin", "--not", "--all"],
+            input="".join(tip + "\n" for tip in tips),
+            capture_output=True,
+            text=True,
+            cwd=self.repo_path,
+            timeout=max(deadline - time.monotonic(), 0.001),
+        )
+        if result.returncode != 0:
+            raise RuntimeError(f"git rev-list failed: {result.stderr.strip()}")
+        return result.stdout.split()
+
+    def iter_messages(
+        self, hashes: List[str], deadline: Optional[float] = None
+    ) -> Iterator[Tuple[str, str]]:
+        """Stream (hash, raw message) for the given commits, in order
+
+        With a deadline (time.monotonic() value), git is killed when it
+        passes and subprocess.TimeoutExpired is raised.
+        """
+        if not hashes:
+            return  # An empty --stdin list would make git log fall back to HEAD
+        args = ["git", "log", "-z", "--no-walk=unsorted", "--stdin", "--format=%H%x1f%B"]
+        process = subprocess.Popen(
+            args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=self.repo_path
+        )
+        # A stalled git would block the read below, so the timer kills it
+        timeout = None if deadline is None else max(deadline - time.monotonic(), 0.001)
+        expired = threading.Event()
+        timer = None
+        if timeout is not None:
+
+            def expire():
+                expired.set()
+                process.kill()
+
+            timer = threading.Timer(timeout, expire)
+            timer.start()
+        try:
+            process.stdin.write("".join(h + "\n" for h in hashes).encode())
+            process.stdin.close()
+            for record in iter_nul_messages(process.stdout):
+                full_hash, _, message = record.decode("utf-8", errors="replace").partition("\x1f")
+                yield full_hash.strip(), message
+        except BrokenPipeError:
+            pass  # Killed before it read its input; reported below
+        finally:
+            if timer is not None:
+                timer.cancel()
+            # Closing stdout early makes git exit on SIGPIPE
+            process.stdout.close()
+            process.wait()
+        if expired.is_set():
+            raise subprocess.TimeoutExpired(args, timeout)
+
+    def validate(self, updates: List[Tuple[str, str, str]]) -> PushVerdict:
+        """Validate every commit the updates introduce, within the budget"""
+        verdict = PushVerdict()
+        deadline = time.monotonic() + self.timeout
+        tips = pushed_tips(updates)
+        if not tips:
+            return verdict
+
+        try:
+            hashes = self.list_new_commits(tips, deadline)
+        except subprocess.TimeoutExpired:
+            verdict.limit = f"listing new commits took over {self.timeout:g}s"
+            return verdict
+        verdict.new_commits = len(hashes)
+        if not hashes:
+            return verdict
+
+        cached = self._lookup(hashes)
+        verdict.cached = len(cached)
+        fresh = len(hashes) - len(cached)
+        if fresh > self.max_commits:
+            verdict.limit = f"{fresh} commits to validate (limit {self.max_commits})"
+            return verdict
+
+        # Clean cached commits need nothing; cached failures are re-read
+        # for their subjects only
+        needed = [h for h in hashes if cached.get(h, True)]
+        try:
+            self._validate_needed(verdict, needed, cached, fresh, deadline)
+        except subprocess.TimeoutExpired:
+            verdict.limit = (
+                f"reading commits took over {self.timeout:g}s "
+                f"({verdict.validated} of {fresh} commits checked)"
+            )
+
+        self._flush()
+        return verdict
+
+    def _validate_needed(
+        self,
+        verdict: PushVerdict,
+        needed: List[str],
+        cached: Dict[str, List[str]],
+        fresh: int,
+        deadline: float,
+    ):
+        """Validate uncached commits and collect rejections, until the deadline"""
+        for batch in self._iter_batches(needed, deadline):
+            fresh_batch = [(h, m) for h, m in batch if h not in cached]
+            results = validate_batch([m for _, m in fresh_batch])
+            verdict.validated += len(fresh_batch)
+            fresh_errors = {}
+            for (full_hash, _), errors in zip(fresh_batch, results):
+                fresh_errors[full_hash] = errors
+                self._store(full_hash, errors)
+            for full_hash, message in batch:
+                errors = cached[full_hash] if full_hash in cached else fresh_errors[full_hash]
+                if errors:
+                    subject = message.strip().split("\n", 1)[0]
+                    verdict.rejected.append((full_hash, subject, errors))
+
+            if time.monotonic() > deadline and verdict.validated < fresh:
+                verdict.limit = (
+                    f"validation took over {self.timeout:g}s "
+                    f"({verdict.validated} of {fresh} commits checked)"
+                )
+                return
+
+    def _iter_batches(
+        self, hashes: List[str], deadline: float
+    ) -> Iterator[List[Tuple[str, str]]]:
+        """Batches of (hash, message); a batch is cut short once the deadline passes"""
+        batch = []
+        for item in self.iter_messages(hashes, deadline):
+            batch.append(item)
+            if len(batch) >= VALIDATE_BATCH_SIZE or time.monotonic() > deadline:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    # The cache only saves work: if it is locked or broken, validate without it
+
+    def _lookup(self, hashes: List[str]):
+        if self.cache is None:
+            return {}
+        try:
+            return self.cache.lookup_many(hashes)
+        except sqlite3.Error as e:
+            self._drop_cache(e)
+            return {}
+
+    def _store(self, full_hash: str, errors: List[str]):
+        if self.cache is None:
+            return
+        try:
+            self.cache.store(full_hash, errors)
+        except sqlite3.Error as e:
+            self._drop_cache(e)
+
+    def _flush(self):
+        if self.cache is None:
+            return
+        try:
+            self.cache.flush()
+        except sqlite3.Error as e:
+            self._drop_cache(e)
+
+    def _drop_cache(self, error: Exception):
+        print(f"⚠️  Verdict cache unavailable ({error}), continuing without it")
+        self.cache = None
+
+
+def open_cache(repo_path: str) -> Optional[VerdictCache]:
+    """The push verdict cache in the repository's git dir, if it can be opened"""
+    path = default_cache_path(repo_path, CACHE_FILE_NAME)
+    if path is None:
+        return None
+    try:
+        return VerdictCache(
+            path, compute_rules_version(RULE_SOURCE_FILES), timeout=CACHE_LOCK_TIMEOUT, wal=True
+        )
+    except sqlite3.Error as e:
+        print(f"⚠️  Verdict cache unavailable ({e}), continuing without it")
+        return None
+
+
+def render_rejection(verdict: PushVerdict) -> str:
+    """Hook failure report listing the rejected commits"""
+    errors = []
+    for full_hash, subject, commit_errors in verdict.rejected[:MAX_REPORTED_COMMITS]:
+        errors.append(f"{full_hash[:7]} {subject[:60]}")
+        errors.extend(f"  {error}" for error in commit_errors)
+    hidden = len(verdict.rejected) - MAX_REPORTED_COMMITS
+    if hidden > 0:
+        errors.append(f"... and {hidden} more commits")
+    return render_failure(errors)
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(
+        description="Validate pushed commit messages (git pre-receive hook)"
+    )
+    parser.add_argument(
+        "--repo",
+        default=".",
+        help="Repository receiving the push (default: the hook's working directory)",
+    )
+    parser.add_argument(
+        "--max-commits",
+        type=int,
+        default=DEFAULT_MAX_COMMITS,
+        metavar="N",
+        help="Most uncached commits one push may need validated (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--timeout",
+        type=float,
+        default=DEFAULT_TIMEOUT,
+        metavar="SECONDS",
+        help="Validation time budget per push (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--on-limit",
+        choices=[ON_LIMIT_REJECT, ON_LIMIT_ACCEPT],
+        default=ON_LIMIT_REJECT,
+        help="What to do with a push that exceeds --max-commits or --timeout; "
+        "commits already found invalid are rejected either way (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Validate every new commit instead of reusing cached verdicts",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    """Main function for the pre-receive hook"""
+    args = parse_args(argv)
+    updates = parse_update_lines(sys.stdin)
+
+    cache = None if args.no_cache else open_cache(args.repo)
+    validator = PreReceiveValidator(args.repo, cache, args.max_commits, args.timeout)
+    try:
+        verdict = validator.validate(updates)
+    except RuntimeError as e:
+        print(f"❌ {e}")
+        return 1
+    finally:
+        if validator.cache is not None:
+            try:
+                validator.cache.close()
+            except sqlite3.Error:
+                pass
+
+    if verdict.rejected:
+        print(render_rejection(verdict))
+    if verdict.limit is not None:
+        if args.on_limit == ON_LIMIT_ACCEPT and not verdict.rejected:
+            print(f"⚠️  Commit message validation incomplete: {verdict.limit}")
+        else:
+            print(f"❌ Push too large to validate: {verdict.limit}")
+            print("   Push in smaller parts so every commit can be checked.")
+
+    return 0 if verdict.accepted(args.on_limit) else 1
+
+
+if __name__ == "__main__":
+    exit(main())
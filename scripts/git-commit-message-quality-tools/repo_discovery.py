@@ -0,0 +1,32 @@
+#!/usr/bin/env python3
+"""
+Repository Discovery
+Finds the git repositories a multi-repository run covers, shared by the
+batch audit and the issue index
+"""
+
+import os
+from typing import List
+from git_object_reader import find_git_dir
+
+
+def is_git_repo(path: str) -> bool:
+    """Work tree or bare repository"""
+    try:
+        find_git_dir(path)
+        return True
+    except (FileNotFoundError, OSError):
+        return False
+
+
+def discover_repos(paths: List[str], parents: List[str]) -> List[str]:
+    """Explicit repository paths plus git repositories directly under parents"""
+    repos = [os.path.abspath(path) for path in paths]
+    for parent in parents:
+        for name in sorted(os.listdir(parent)):
+            path = os.path.join(parent, name)
+            if os.path.isdir(path) and is_git_repo(path):
+                repos.append(os.path.abspath(path))
+
+    # Keep the first occurrence of each repository
+    return list(dict.fromkeys(repos))
@@ -0,0 +1,233 @@
+#!/usr/bin/env python3
+"""
+Sharded Commit Reader
+Splits history into disjoint shards (ref tips with exclusions, or
+commit-date windows), reads them with concurrent git processes and merges
+them back into one ordered commit stream
+"""
+
+import heapq
+import queue
+import subprocess
+import threading
+from typing import Iterator, List, Optional, Tuple
+from commit_record import RECORD_FORMAT, CommitRecord, parse_commit_record
+
+# How the history is cut
+SHARD_REFS = "refs"  # Groups of ref tips, each excluding the groups before it
+SHARD_DATES = "dates"  # Consecutive committer-date windows of one listing
+
+# Record layout: committer time, then the fields the checker parses
+LOG_FORMAT = f"%ct {RECORD_FORMAT}"
+READ_CHUNK_SIZE = 64 * 1024
+# Output all shards together may read ahead of the merge, split evenly
+# between them; a shard past its share makes its git process wait
+READ_AHEAD_BYTES = 64 * 1024 * 1024
+# Revision arguments that only select refs, so their tips can be listed
+REF_SELECTORS = ("--all", "--branches", "--tags", "--remotes", "--not")
+REF_SELECTOR_PREFIXES = ("--branches=", "--tags=", "--remotes=", "--glob=")
+
+
+def can_shard(revisions: List[str]) -> bool:
+    """True when the revisions are refs, ranges or ref selectors only
+
+    Anything else (date limits, --first-parent, ...) changes the walk in
+    ways the shards cannot split, and is read as one stream instead.
+    """
+    return all(
+        not rev.startswith("-") or rev in REF_SELECTORS or rev.startswith(REF_SELECTOR_PREFIXES)
+        for rev in revisions
+    )
+
+
+def _git_lines(repo: str, args: List[str], stdin: str = "") -> Optional[List[str]]:
+    result = subprocess.run(
+        ["git", *args], input=stdin, capture_output=True, text=True, cwd=repo
+    )
+    return result.stdout.splitlines() if result.returncode == 0 else None
+
+
+def plan_ref_shards(repo: str, revisions: List[str], shards: int) -> Optional[List[List[str]]]:
+    """Split the selected tips into `shards` groups, as git log --stdin inputs
+
+    Each group excludes every tip of the groups before it, so each commit
+    belongs to exactly one shard. Tips are ordered oldest first: a branch
+    that forked early claims the trunk below its fork point, so the
+    trunk is cut where branches leave it. Returns None if a revision
+    cannot be resolved (the single stream skips missing ones).
+    """
+    # The trailing "--" makes an unknown name an error instead of a path
+    resolved = _git_lines(repo, ["rev-parse", *revisions, "--"])
+    if resolved is None:
+        return None
+    positive = [line for line in resolved if line != "--" and not line.startswith("^")]
+    negative = [line for line in resolved if line.startswith("^")]
+
+    # Tip commits (tags peeled) with their committer dates, without a walk
+    listed = _git_lines(
+        repo, ["rev-list", "--no-walk", "--timestamp", "--stdin"], "".join(p + "\n" for p in positive)
+    )
+    if listed is None:
+        return None
+    dated = (line.split() for line in listed)
+    tips = [tip for _, tip in sorted((int(timestamp), tip) for timestamp, tip in dated)]
+
+    plans = []
+    seen = []
+    for group in split_evenly(tips, shards):
+        plans.append(group + ["^" + tip for tip in seen] + negative)
+        seen.extend(group)
+    return plans
+
+
+def split_evenly(items: List[str], shards: int) -> List[List[str]]:
+    """Cut a list into at most `shards` consecutive, non-empty, equal-sized parts"""
+    parts = (items[len(items) * i // shards : len(items) * (i + 1) // shards] for i in range(shards))
+    return [part for part in parts if part]
+
+
+def plan_date_shards(repo: str, revisions: List[str], shards: int) -> Optional[List[List[str]]]:
+    """Cut one listing of the selected commits into consecutive date windows
+
+    The listing is a plain `git rev-list` walk, which a commit-graph makes
+    cheap; each window has the same number of commits and is read by
+    hash, so concatenating the windows gives git log's own order.
+    """
+    listed = _git_lines(repo, ["rev-list", "--ignore-missing", *revisions])
+    if listed is None:
+        return None
+    return split_evenly(listed, shards)
+
+
+class ShardReader:
+    """One `git log` shard whose output is read ahead on a thread
+
+    The thread only moves bytes, so the git processes run in parallel while
+    records are parsed in the consuming thread.
+    """
+
+    def __init__(self, repo: str, stdin_lines: List[str], walk: bool, read_ahead_chunks: int):
+        args = ["git", "log", "-z", f"--format={LOG_FORMAT}", "--stdin"]
+        if not walk:
+            args.insert(2, "--no-walk=unsorted")
+        self.process = subprocess.Popen(
+            args, stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=repo
+        )
+        self._stdin = "".join(line + "\n" for line in stdin_lines).encode()
+        self._chunks = queue.Queue(maxsize=read_ahead_chunks)
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._pump, daemon=True)
+        self._thread.start()
+
+    def _pump(self):
+        try:
+            # git log reads all of stdin before it starts writing
+            self.process.stdin.write(self._stdin)
+            self.process.stdin.close()
+            while not self._stop.is_set():
+                chunk = self.process.stdout.read(READ_CHUNK_SIZE)
+                self._put(chunk)
+                if not chunk:
+                    return
+        except (BrokenPipeError, ValueError, OSError):
+            self._put(b"")
+
+    def _put(self, chunk: bytes):
+        while not self._stop.is_set():
+            try:
+                self._chunks.put(chunk, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+
+    def records(self) -> Iterator[Tuple[int, CommitRecord]]:
+        """Yield (committer time, commit) in the shard's own order"""
+        pending = b""
+        while True:
+            chunk = self._chunks.get()
+            if not chunk:
+                break
+            records = (pending + chunk).split(b"\0")
+            pending = records.pop()
+            for record in records:
+                parsed = _parse(record)
+                if parsed is not None:
+                    yield parsed
+        if pending.strip():
+            parsed = _parse(pending)
+            if parsed is not None:
+                yield parsed
+
+    def close(self):
+        self._stop.set()
+        if self.process.poll() is None:
+            self.process.kill()
+        self._thread.join()
+        self.process.stdout.close()
+        self.process.wait()
+
+
+def _parse(record: bytes) -> Optional[Tuple[int, CommitRecord]]:
+    timestamp, _, rest = record.decode("utf-8", errors="replace").partition(" ")
+    commit = parse_commit_record(rest)
+    if commit is None:
+        return None
+    return int(timestamp.strip()), commit
+
+
+def iter_sharded_commits(
+    repo: str, revisions: List[str], shards: int, shard_by: str = SHARD_REFS
+) -> Optional[Iterator[CommitRecord]]:
+    """Stream the selected commits from concurrent shards
+
+    `refs` shards are merged newest committer date first (ties keep shard
+    order); `dates` windows are concatenated. Returns None when the
+    revisions cannot be sharded, so the caller can read them as one stream.
+    """
+    if not can_shard(revisions):
+        return None
+    if shard_by == SHARD_DATES:
+        plans = plan_date_shards(repo, revisions, shards)
+    else:
+        plans = plan_ref_shards(repo, revisions, shards)
+    if plans is None:
+        return None
+    return _merge(repo, plans, walk=shard_by != SHARD_DATES)
+
+
+def iter_commits_by_hash(repo: str, hashes: List[str], shards: int) -> Iterator[CommitRecord]:
+    """Read the given commits, in the given order, with `shards` concurrent readers"""
+    return _merge(repo, split_evenly(hashes, shards), walk=False)
+
+
+def _merge(repo: str, plans: List[List[str]], walk: bool) -> Iterator[CommitRecord]:
+    read_ahead_chunks = max(1, READ_AHEAD_BYTES // READ_CHUNK_SIZE // max(1, len(plans)))
+    readers = [ShardReader(repo, plan, walk, read_ahead_chunks) for plan in plans]
+    try:
+        if not walk:
+            # Windows of one listing, or given hashes: disjoint and in order
+            for reader in readers:
+                for _, commit in reader.records():
+                    yield commit
+            return
+
+        streams = [
+            ((-timestamp, index, commit) for timestamp, commit in reader.records())
+            for index, reader in enumerate(readers)
+        ]
+        # Ref shards are disjoint by construction; this only guards against
+        # git's date-based exclusion slipping on clock-skewed history. Copies
+        # of a commit share its committer time, so they meet in the merge
+        # and only the hashes seen at the current time are kept.
+        current = None
+        seen = set()
+        for negated_time, _, commit in heapq.merge(*streams, key=lambda item: item[:2]):
+            if negated_time != current:
+                current = negated_time
+                seen.clear()
+            if commit.oid not in seen:
+                seen.add(commit.oid)
+                yield commit
+    finally:
+        for reader in readers:
+            reader.close()
@@ -0,0 +1,11 @@
+"""
+The tools are flat modules run as scripts; make them importable from the
+tests the same way the scripts import each other
+"""
+
+import os
+import sys
+
+TOOLS_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if TOOLS_DIR not in sys.path:
+    sys.path.insert(0, TOOLS_DIR)
@@ -0,0 +1,65 @@
+"""
+Small throwaway repositories for the tests, built with git fast-import so
+timestamps, merges and raw message bytes are exactly what a test asks for
+"""
+
+import subprocess
+from typing import List, Optional, Sequence
+
+IDENTITY = ["-c", "user.name=Test", "-c", "user.email=test@example.com"]
+BASE_TIME = 1700000000
+
+
+def git(repo: str, *args: str, input: Optional[bytes] = None) -> str:
+    """Run git in a repository, returns its stdout"""
+    result = subprocess.run(
+        ["git", *IDENTITY, *args], input=input, capture_output=True, cwd=repo, check=True
+    )
+    return result.stdout.decode("utf-8")
+
+
+def commit_command(
+    ref: str, message: bytes, timestamp: int, merge: Sequence[str] = (), content: str = ""
+) -> bytes:
+    """One fast-import commit; `content` (if any) is written to file.txt"""
+    command = (
+        f"commit {ref}\n"
+        f"committer Test <test@example.com> {timestamp} +0000\n"
+        f"data {len(message)}\n".encode()
+        + message
+        + b"\n"
+        + "".join(f"merge {parent}\n" for parent in merge).encode()
+    )
+    if content:
+        data = content.encode()
+        command += f"M 644 inline file.txt\ndata {len(data)}\n".encode() + data + b"\n"
+    return command + b"\n"
+
+
+def reset_command(ref: str, start: str) -> bytes:
+    """Point a ref at a commit before fast-import adds commits to it"""
+    return f"reset {ref}\nfrom {start}\n\n".encode()
+
+
+def fast_import(repo: str, commands: List[bytes]):
+    git(repo, "fast-import", "--quiet", input=b"".join(commands))
+
+
+def init_repo(path: str, messages: Sequence[str]) -> str:
+    """A repository whose main branch carries the messages, one minute apart"""
+    subprocess.run(["git", "init", "-q", "-b", "main", path], check=True)
+    fast_import(
+        path,
+        [
+            commit_command(
+                "refs/heads/main", message.encode("utf-8"), BASE_TIME + index * 60, content=str(index)
+            )
+            for index, message in enumerate(messages)
+        ],
+    )
+    git(path, "checkout", "-q", "main")
+    return path
+
+
+def rev_list(repo: str, *revisions: str) -> List[str]:
+    return git(repo, "rev-list", *revisions).split()
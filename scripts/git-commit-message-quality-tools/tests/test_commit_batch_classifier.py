@@ -0,0 +1,77 @@
+"""Batch classifier: the NumPy path and find_many() against the per-message scan"""
+
+import random
+
+import pytest
+
+from commit_batch_classifier import classify_messages, classify_scalar, numpy
+from commit_rule_engine import get_rule_engine
+
+# Rule fragments, plus characters at the edges of the CJK range and emoji
+# without their variation selector (or the selector alone): where a
+# byte-level match could slip
+CLASSIFIER_TOKENS = [
+    "`", "```", "a", " ", "  ", "\n", "\n\n", "#", "##", "###", "****", "***", "**",
+    "é", "中", "-", "1.", "✅", "⚠️", "🎉", "\r", "\x0b", "\x1c", "\u3000", "\0",
+    "\u4000", "\u4dff", "\u4e00", "\u9fff", "\ua000", "\uffff", "\u26a1", "\u26a0",
+    "\ufe0f", "\u267b", "\udc80", "\U0001f600",
+]
+
+requires_numpy = pytest.mark.skipif(numpy is None, reason="NumPy not installed")
+
+
+def random_messages(seed: int, count: int):
+    rng = random.Random(seed)
+    return [
+        tuple(
+            "".join(rng.choice(CLASSIFIER_TOKENS) for _ in range(rng.randint(0, 30)))
+            for _ in range(2)
+        )
+        for _ in range(count)
+    ]
+
+
+def engine_kinds():
+    engine = get_rule_engine()
+    return engine._subject_kinds, engine._body_kinds
+
+
+@requires_numpy
+@pytest.mark.parametrize("seed", range(3))
+def test_vectorized_matches_scalar(seed):
+    messages = random_messages(seed, 3000)
+    subjects = [subject for subject, _ in messages]
+    bodies = [body for _, body in messages]
+    kinds = engine_kinds()
+
+    expected = classify_scalar(subjects, bodies, *kinds)
+    actual = classify_messages(subjects, bodies, *kinds, vectorized=True)
+    for message, want, got in zip(messages, expected, actual):
+        assert got == want, message
+
+
+@requires_numpy
+@pytest.mark.parametrize("token", CLASSIFIER_TOKENS)
+def test_vectorized_matches_scalar_per_token(token):
+    # Each token alone, at the start, the end and between regions
+    subjects = [token, "x" + token, token + "x", ""]
+    bodies = ["", token, "y", token * 3]
+    for kinds in [engine_kinds(), *((frozenset({k}), frozenset({k})) for k in engine_kinds()[1])]:
+        expected = classify_scalar(subjects, bodies, *kinds)
+        assert classify_messages(subjects, bodies, *kinds, vectorized=True) == expected
+
+
+@requires_numpy
+def test_vectorized_with_no_kinds():
+    assert classify_messages(["中"], ["✅"], frozenset(), frozenset(), vectorized=True) == [
+        frozenset()
+    ]
+
+
+@pytest.mark.parametrize("seed", range(3))
+def test_find_many_matches_find(seed):
+    engine = get_rule_engine()
+    messages = random_messages(seed, 1000)
+    batched = engine.find_many(messages, vectorized=numpy is not None)
+    for message, findings in zip(messages, batched):
+        assert findings == engine.find(*message), message
@@ -0,0 +1,89 @@
+"""Hook fast path and batch validation"""
+
+import io
+import json
+import random
+
+import pytest
+
+import commit_msg_validator
+from commit_msg_validator import is_trivially_valid, validate_messages, validate_stream
+
+# Fragments of every hook rule, so random messages hit each rule's edges
+FAST_PATH_TOKENS = [
+    "`", "``", "```", "a", "_", "9", " ", "\t", "\n", "#", "##", "###", "é", "中",
+    "-", "x" * 50, "feat: x", "\n\n", "  ", "****", "**", "1.", "7.", "tasks",
+    "proposal", "...", "\r", "\x0b", "\x1c", "　", "✅", "⚠️", "🎉", "word ",
+]
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_fast_path_never_accepts_a_rejected_message(seed):
+    rng = random.Random(seed)
+    messages = [
+        "".join(rng.choice(FAST_PATH_TOKENS) for _ in range(rng.randint(1, 40)))
+        for _ in range(2000)
+    ]
+    accepted = 0
+    for message, result in zip(messages, validate_messages(messages)):
+        if not result["skipped"] and is_trivially_valid(message):
+            accepted += 1
+            assert result["valid"], (message, result["issues"])
+    assert accepted > 0
+
+
+@pytest.mark.parametrize(
+    "message",
+    [
+        "feat: add session export\n",
+        "fix(parser): handle empty input\n\nThe parser returned None.\n",
+        "chore: bump\n\n- one\n- two\n",
+    ],
+)
+def test_fast_path_accepts_plain_messages(message):
+    assert is_trivially_valid(message)
+    assert next(validate_messages([message]))["valid"]
+
+
+@pytest.mark.parametrize(
+    "message, issue",
+    [
+        ("feat: 添加 export\n", "contains-Chinese"),
+        ("feat: ✨ export\n", "emoji-in-subject"),
+        ("feat: export ## notes\n", "markdown-in-subject"),
+        ("feat: export  twice\n", "multiple-spaces"),
+        ("feat: write proposal\n", "incomplete-subject-ending"),
+    ],
+)
+def test_rejected_messages_leave_the_fast_path(message, issue):
+    assert not is_trivially_valid(message)
+    result = next(validate_messages([message]))
+    assert not result["valid"]
+    assert issue in result["issues"]
+
+
+def test_merge_and_revert_messages_are_skipped():
+    results = list(validate_messages(["Merge branch 'x' 中", "Revert \"feat: ✨\""]))
+    assert [result["skipped"] for result in results] == [True, True]
+    assert all(result["valid"] for result in results)
+
+
+def test_stdin0_stream_validates_in_one_batch(monkeypatch):
+    calls = []
+
+    def counting_validate_messages(messages):
+        calls.append(messages)
+        return validate_messages(messages)
+
+    monkeypatch.setattr(commit_msg_validator, "validate_messages", counting_validate_messages)
+    raw = b"\0".join([b"feat: ok", b"fix: \xff bad", "feat: 添加".encode(), b"Merge x"])
+    sink = io.StringIO()
+    assert validate_stream(io.BytesIO(raw), sink) == 2
+    assert len(calls) == 1
+
+    lines = [json.loads(line) for line in sink.getvalue().splitlines()]
+    assert [line["index"] for line in lines] == [0, 1, 2, 3]
+    assert [line["valid"] for line in lines] == [True, False, False, True]
+    assert "Error reading commit message" in lines[1]["errors"][0]
+    assert lines[2]["issues"] == ["contains-Chinese"]
+    assert lines[3]["skipped"]
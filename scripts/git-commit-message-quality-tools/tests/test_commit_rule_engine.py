@@ -0,0 +1,114 @@
+"""Rule engine: linear-time body rules and oversized messages"""
+
+import random
+import re
+import subprocess
+import time
+
+import pytest
+
+from commit_msg_validator import CommitMessageValidator, validate_messages
+from commit_rule_engine import RuleEngine, get_rule_engine
+from unified_commit_checker import CommitChecker
+from commit_validation_config import (
+    ISSUE_MALFORMED_CODE_BLOCKS,
+    ISSUE_MARKDOWN_CHAOS_IN_BODY,
+    ISSUE_SKIPPED_OVERSIZED,
+    MAX_MESSAGE_LENGTH,
+)
+
+# The original (backtracking) forms of the body rules, as the reference
+REFERENCE_MALFORMED_RE = re.compile(r"```\w+[^`]{50,}```")
+REFERENCE_CHAOS_ISOLATED_RE = re.compile(r"[^\s]##|##[^\s#]")
+REFERENCE_CHAOS_MIDLINE_RE = re.compile(r"\s##\s.*\S")
+FUZZ_TOKENS = ["`", "``", "```", "a", "_", "9", " ", "\t", "\n", "#", "##", "###", "é", "中", "-", "x" * 50]
+
+# Seconds any single pathological message may take
+TIME_LIMIT = 1.0
+PATHOLOGICAL_SIZE = 400_000
+PATHOLOGICAL_BODIES = {
+    "unclosed-fence": lambda n: "```a" + "b" * n,
+    "many-unclosed-fences": lambda n: ("```ab" + "c" * 60 + "``") * (n // 67),
+    "fence-runs": lambda n: "`" * (n // 2) + "a" * (n // 2),
+    "chaos-line": lambda n: " ## x" * (n // 5),
+    "chaos-trailing-space": lambda n: "a ## " + " " * n,
+    "many-short-lines": lambda n: "##x\n" * (n // 4),
+}
+
+OVERSIZED_MESSAGE = "feat: 添加 ✨ huge\n\n" + "## x\n" * (MAX_MESSAGE_LENGTH // 5 + 1)
+
+
+def reference_findings(body: str):
+    chaos = 0
+    for line in body.split("\n") if body else []:
+        if REFERENCE_CHAOS_ISOLATED_RE.search(line):
+            chaos += 1
+        if REFERENCE_CHAOS_MIDLINE_RE.search(line) and not line.strip().startswith("##"):
+            chaos += 1
+    findings = []
+    if chaos > 2:
+        findings.append((ISSUE_MARKDOWN_CHAOS_IN_BODY, (chaos,)))
+    if body and REFERENCE_MALFORMED_RE.findall(body):
+        findings.append((ISSUE_MALFORMED_CODE_BLOCKS, ()))
+    return findings
+
+
+@pytest.fixture(scope="module")
+def body_engine():
+    return RuleEngine([ISSUE_MARKDOWN_CHAOS_IN_BODY, ISSUE_MALFORMED_CODE_BLOCKS])
+
+
+@pytest.mark.parametrize("seed", range(4))
+def test_body_rules_match_reference(body_engine, seed):
+    rng = random.Random(seed)
+    for _ in range(2000):
+        body = "".join(rng.choice(FUZZ_TOKENS) for _ in range(rng.randint(0, 120)))
+        assert body_engine.find("fix: fuzz", body) == reference_findings(body), body
+
+
+@pytest.mark.parametrize("name", sorted(PATHOLOGICAL_BODIES))
+def test_pathological_bodies_stay_fast(body_engine, name):
+    body = PATHOLOGICAL_BODIES[name](PATHOLOGICAL_SIZE)
+    start = time.perf_counter()
+    body_engine.find("fix: fuzz", body)
+    assert time.perf_counter() - start < TIME_LIMIT
+
+
+def test_oversized_message_is_not_scanned():
+    engine = get_rule_engine()
+    subject, _, body = OVERSIZED_MESSAGE.partition("\n\n")
+    assert engine.find(subject, body) == [(ISSUE_SKIPPED_OVERSIZED, (len(subject) + len(body),))]
+    assert engine.find_many([(subject, body)]) == [engine.find(subject, body)]
+
+
+def test_message_at_the_limit_is_checked():
+    engine = get_rule_engine()
+    body = "a" * (MAX_MESSAGE_LENGTH - len("feat: 添加"))
+    assert [issue for issue, _ in engine.find("feat: 添加", body)] == ["contains-Chinese"]
+
+
+def test_oversized_message_is_a_warning():
+    result = next(validate_messages([OVERSIZED_MESSAGE]))
+    assert result["valid"]
+    assert result["issues"] == []
+    assert len(result["warnings"]) == 1
+
+    validator = CommitMessageValidator(OVERSIZED_MESSAGE)
+    assert validator.validate() == (True, [])
+    assert validator.warnings == result["warnings"]
+
+
+def test_checker_counts_oversized_commits_outside_the_fix_plan(tmp_path):
+    repo = str(tmp_path)
+    subprocess.run(["git", "init", "-q", repo], check=True)
+    identity = ["-c", "user.name=Test", "-c", "user.email=test@example.com"]
+    for message in (OVERSIZED_MESSAGE, "feat: 添加\n"):
+        subprocess.run(
+            ["git", *identity, "commit", "-q", "--allow-empty", "--cleanup=verbatim", "-F", "-"],
+            input=message.encode(), cwd=repo, check=True,
+        )
+
+    checker = CommitChecker(repo, quiet=True)
+    problems = checker.check_all()
+    assert [problem.issues for problem in problems] == [["contains-Chinese"]]
+    assert checker.skipped_oversized == 1
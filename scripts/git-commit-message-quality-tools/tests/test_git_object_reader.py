@@ -0,0 +1,118 @@
+"""Object database backend against git log on a fixture repository"""
+
+import os
+import random
+
+import pytest
+
+from git_fixtures import (
+    BASE_TIME,
+    commit_command,
+    fast_import,
+    git,
+    init_repo,
+    reset_command,
+    rev_list,
+)
+from git_object_reader import ObjectDatabaseReader
+from unified_commit_checker import BACKEND_GIT_LOG, BACKEND_ODB, CommitChecker
+
+# Raw messages whose %s/%b split is easy to get wrong
+TRICKY_MESSAGES = [
+    b"\n\nfeat: leading blank lines\n\nbody\n",
+    b"fix: subject spread\nover two lines  \n\nbody after\n",
+    b"docs: crlf subject\r\n\r\nbody line\r\n",
+    b"chore: trailing spaces   \n\n\n\n  indented body\n\n",
+    b"refactor: no trailing newline",
+    b"feat: \xe6\xb7\xbb\xe5\x8a\xa0 utf-8\n\n\xf0\x9f\x8e\x89 body\n",
+    b"fix: invalid \xff utf-8\n",
+    b"",
+]
+
+# Loose objects only, fully packed with deltas, then packed plus loose
+LAYOUTS = {
+    "loose": [],
+    "packed": [["repack", "-adf", "--depth=50", "--window=250"], ["pack-refs", "--all"]],
+    "packed+loose": [
+        ["repack", "-adf"],
+        ["pack-refs", "--all"],
+        ["commit", "-q", "--allow-empty", "-m", "fix: loose tip"],
+    ],
+}
+
+
+def build_branchy_repo(path: str) -> str:
+    """Side branches, merges, equal timestamps, tags and odd messages"""
+    rng = random.Random(7)
+    init_repo(path, [f"feat(core): change {i}\n\n- detail {i}\n" for i in range(60)])
+    main = rev_list(path, "--reverse", "main")
+
+    commands = []
+    messages = list(TRICKY_MESSAGES)
+    for branch in range(4):
+        ref = f"refs/heads/side-{branch}"
+        commands.append(reset_command(ref, rng.choice(main)))
+        for index in range(rng.randint(2, 6)):
+            message = messages.pop() if messages else f"feat: side {branch} #{index}\n".encode()
+            # Reused timestamps exercise the walk's tie ordering
+            timestamp = BASE_TIME + rng.randint(0, len(main)) * 60
+            merge = [rng.choice(main)] if index == 1 else []
+            commands.append(commit_command(ref, message, timestamp, merge))
+    fast_import(path, commands)
+
+    # One ISO-8859-1 message with an encoding header, via a raw object
+    tree = git(path, "rev-parse", "main^{tree}").strip()
+    raw = (
+        f"tree {tree}\nparent {main[-1]}\n"
+        "author Test <test@example.com> 1800000000 +0000\n"
+        "committer Test <test@example.com> 1800000000 +0000\n"
+        "encoding ISO-8859-1\n\n".encode()
+        + "fix: café latin-1\n".encode("latin-1")
+    )
+    latin = git(path, "hash-object", "-t", "commit", "-w", "--stdin", input=raw).strip()
+    git(path, "update-ref", "refs/heads/latin", latin)
+    git(path, "tag", "-a", "-m", "release", "v1.0", main[len(main) // 2])
+    return path
+
+
+@pytest.fixture(params=sorted(LAYOUTS))
+def repo(request, tmp_path):
+    path = build_branchy_repo(str(tmp_path / "repo"))
+    for command in LAYOUTS[request.param]:
+        git(path, *command)
+    return path
+
+
+def test_odb_walk_matches_git_log(repo):
+    expected = list(CommitChecker(repo, backend=BACKEND_GIT_LOG).iter_commits())
+    actual = list(CommitChecker(repo, backend=BACKEND_ODB).iter_commits())
+    assert len(expected) == len(rev_list(repo, "--all"))
+    assert actual == expected
+
+
+def test_odb_reads_given_hashes_in_order(repo):
+    hashes = rev_list(repo, "--all")[::-3]
+    expected = list(CommitChecker(repo).iter_commits(hashes))
+    assert list(CommitChecker(repo, backend=BACKEND_ODB).iter_commits(hashes)) == expected
+
+
+def test_list_commit_hashes_matches_the_walk(repo):
+    reader = ObjectDatabaseReader(repo)
+    try:
+        hashes = reader.list_commit_hashes()
+        assert hashes == [commit.full_hash for commit in reader.iter_commits()]
+    finally:
+        reader.close()
+    assert hashes == rev_list(repo, "--all")
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc/self/fd"), reason="needs /proc")
+def test_checker_closes_the_odb_reader(tmp_path):
+    repo = init_repo(str(tmp_path / "repo"), ["feat: one\n", "fix: 两\n"])
+    git(repo, "repack", "-ad")
+    before = len(os.listdir("/proc/self/fd"))
+    for _ in range(3):
+        checker = CommitChecker(repo, backend=BACKEND_ODB, quiet=True)
+        assert len(checker.check_all()) == 1
+        assert checker._odb_reader is None
+    assert len(os.listdir("/proc/self/fd")) == before
@@ -0,0 +1,201 @@
+"""Pre-receive validator: accepted and rejected pushes, cache hits and limits"""
+
+import os
+import shlex
+import subprocess
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import pre_receive_validator
+from commit_verdict_cache import VerdictCache
+from git_fixtures import BASE_TIME, commit_command, fast_import, git, init_repo, reset_command
+from pre_receive_validator import (
+    ON_LIMIT_ACCEPT,
+    ON_LIMIT_REJECT,
+    PreReceiveValidator,
+)
+
+ZERO = "0" * 40
+
+CLEAN = ["feat: add export\n", "fix(parser): handle empty input\n\nNo crash now.\n"]
+# Past the fast path, but valid: the rule engine has to accept them
+CLEAN_NON_ASCII = ["docs: describe café mode\n\n## Usage\n\nRun it.\n"]
+INVALID = ["feat: 添加 export\n", "fix: ✨ sparkle\n"]
+
+BRANCHES = {
+    "clean": CLEAN,
+    "clean-non-ascii": CLEAN_NON_ASCII,
+    "invalid": INVALID,
+    "mixed": CLEAN + INVALID[:1],
+    "merge-only": ["Merge branch 'x' 中\n"],
+}
+EXPECTED = {"clean": True, "clean-non-ascii": True, "invalid": False, "mixed": False, "merge-only": True}
+
+
+def add_branches(repo: str, branches) -> dict:
+    """One branch per message list off main, returns name -> tip"""
+    base = git(repo, "rev-parse", "main").strip()
+    commands = []
+    for index, (name, messages) in enumerate(branches.items()):
+        ref = f"refs/heads/{name}"
+        commands.append(reset_command(ref, base))
+        for offset, message in enumerate(messages):
+            timestamp = BASE_TIME + 10**6 + index * 100 + offset
+            commands.append(commit_command(ref, message.encode("utf-8"), timestamp))
+    fast_import(repo, commands)
+    return {name: git(repo, "rev-parse", name).strip() for name in branches}
+
+
+@pytest.fixture
+def work(tmp_path):
+    repo = init_repo(str(tmp_path / "work"), ["chore: seed\n"])
+    return repo, add_branches(repo, BRANCHES)
+
+
+@pytest.fixture
+def server(tmp_path, work):
+    path = str(tmp_path / "server.git")
+    subprocess.run(["git", "init", "-q", "--bare", path], check=True)
+    git(work[0], "push", "-q", path, "main")
+    hook = os.path.join(path, "hooks", "pre-receive")
+    validator = pre_receive_validator.__file__
+    with open(hook, "w", encoding="utf-8") as f:
+        f.write(f"#!/bin/sh\nexec {shlex.quote(sys.executable)} {shlex.quote(validator)}\n")
+    os.chmod(hook, 0o755)
+    return path
+
+
+def push(work: str, server: str, tip: str, ref: str) -> subprocess.CompletedProcess:
+    # A URL instead of a remote name leaves local refs alone
+    return subprocess.run(
+        ["git", "push", "-q", server, f"{tip}:refs/heads/{ref}"],
+        capture_output=True, text=True, cwd=work,
+    )
+
+
+def server_has(server: str, ref: str) -> bool:
+    result = subprocess.run(
+        ["git", "rev-parse", "-q", "--verify", f"refs/heads/{ref}"],
+        capture_output=True, cwd=server,
+    )
+    return result.returncode == 0
+
+
+def test_pushes_are_accepted_exactly_when_every_commit_passes(work, server):
+    repo, tips = work
+    # Concurrently, then the same tips under new refs: accepted commits are
+    # now reachable from a ref, rejected ones come back from the cache
+    for prefix in ("push", "again"):
+        with ThreadPoolExecutor(max_workers=len(tips)) as pool:
+            futures = {
+                name: pool.submit(push, repo, server, tip, f"{prefix}-{name}")
+                for name, tip in tips.items()
+            }
+        for name, future in futures.items():
+            result = future.result()
+            accepted = EXPECTED[name]
+            assert (result.returncode == 0) == accepted, (name, result.stderr)
+            assert server_has(server, f"{prefix}-{name}") == accepted
+            if not accepted:
+                assert "COMMIT MESSAGE VALIDATION FAILED" in result.stderr
+
+    assert "Contains Chinese characters" in push(repo, server, tips["invalid"], "third").stderr
+
+
+def test_rejected_verdicts_are_cached_for_retries(work, server):
+    repo, tips = work
+    assert push(repo, server, tips["invalid"], "bad").returncode != 0
+
+    # The rejected objects are gone with the push quarantine; their
+    # verdicts stay, so a retry of the same commits is not re-validated
+    hashes = git(repo, "rev-list", tips["invalid"], "^main").split()
+    cache = pre_receive_validator.open_cache(server)
+    try:
+        cached = cache.lookup_many(hashes)
+    finally:
+        cache.close()
+    assert sorted(cached) == sorted(hashes)
+    assert all(cached[h] for h in hashes)
+
+
+@pytest.fixture
+def unreferenced(work):
+    """The work repository with its branches deleted, so every commit is new"""
+    repo, tips = work
+    for name in tips:
+        git(repo, "update-ref", "-d", f"refs/heads/{name}")
+    return repo, tips
+
+
+def test_cache_hits_skip_validation(unreferenced, tmp_path):
+    repo, tips = unreferenced
+    updates = [(ZERO, tips[name], f"refs/heads/{name}") for name in ("clean", "invalid")]
+    path = str(tmp_path / "cache.sqlite")
+
+    def validate(updates):
+        cache = VerdictCache(path, "v1")
+        try:
+            return PreReceiveValidator(repo, cache).validate(updates)
+        finally:
+            cache.close()
+
+    first = validate(updates)
+    assert (first.cached, first.validated) == (0, len(CLEAN) + len(INVALID))
+    assert not first.accepted()
+
+    second = validate(updates)
+    assert (second.cached, second.validated) == (len(CLEAN) + len(INVALID), 0)
+    assert second.rejected == first.rejected
+
+    clean = validate(updates[:1])
+    assert clean.accepted()
+    assert clean.cached == len(CLEAN)
+
+
+def test_deletions_and_known_commits_need_no_validation(work):
+    repo, tips = work
+    validator = PreReceiveValidator(repo)
+    verdict = validator.validate([(tips["invalid"], ZERO, "refs/heads/invalid")])
+    assert verdict.new_commits == 0 and verdict.accepted()
+    # Already reachable from a ref in the receiving repository
+    verdict = validator.validate([(ZERO, tips["invalid"], "refs/heads/copy")])
+    assert verdict.new_commits == 0 and verdict.accepted()
+
+
+def test_max_commits_limit(unreferenced):
+    repo, tips = unreferenced
+    verdict = PreReceiveValidator(repo, max_commits=1).validate(
+        [(ZERO, tips["clean"], "refs/heads/clean")]
+    )
+    assert verdict.limit is not None
+    assert not verdict.accepted(ON_LIMIT_REJECT)
+    assert verdict.accepted(ON_LIMIT_ACCEPT)
+
+
+def test_timeout_stops_validation(unreferenced, monkeypatch):
+    repo, tips = unreferenced
+    validate_batch = pre_receive_validator.validate_batch
+
+    def slow_validate_batch(messages):
+        time.sleep(0.2)
+        return validate_batch(messages)
+
+    monkeypatch.setattr(pre_receive_validator, "VALIDATE_BATCH_SIZE", 1)
+    monkeypatch.setattr(pre_receive_validator, "validate_batch", slow_validate_batch)
+    verdict = PreReceiveValidator(repo, timeout=0.3).validate(
+        [(ZERO, tips["mixed"], "refs/heads/mixed")]
+    )
+    assert verdict.limit is not None
+    assert 0 < verdict.validated < len(BRANCHES["mixed"])
+    assert not verdict.accepted(ON_LIMIT_REJECT)
+
+
+def test_read_timeout_kills_git(unreferenced):
+    repo, tips = unreferenced
+    validator = PreReceiveValidator(repo)
+    with pytest.raises(subprocess.TimeoutExpired):
+        # Already past the deadline: git is killed before it can answer
+        list(validator.iter_messages([tips["clean"]] * 20000, time.monotonic() - 1))
@@ -0,0 +1,169 @@
+"""Sharded history reads against the single git log stream"""
+
+import os
+
+import pytest
+
+import sharded_commit_reader
+from git_fixtures import BASE_TIME, commit_command, fast_import, git, init_repo, reset_command, rev_list
+from sharded_commit_reader import (
+    READ_CHUNK_SIZE,
+    SHARD_DATES,
+    SHARD_REFS,
+    can_shard,
+    iter_commits_by_hash,
+    iter_sharded_commits,
+    split_evenly,
+)
+from unified_commit_checker import CommitChecker
+
+FEATURE_BRANCHES = 8
+REVISIONS = [
+    ["--all"],
+    ["main"],
+    ["--branches"],
+    ["--all", "main"],
+    ["feature-1", "feature-6", "^main"],
+    ["main..feature-3"],
+    ["--branches=feature-*", "--not", "main"],
+    ["v1.0"],
+]
+
+
+@pytest.fixture(scope="module")
+def repo(tmp_path_factory):
+    """Feature branches forked along main, committed between main's own
+    commits (equal dates included), every other one merged back"""
+    path = init_repo(
+        str(tmp_path_factory.mktemp("shards") / "repo"), [f"feat: main {i}\n" for i in range(80)]
+    )
+    main = rev_list(path, "--reverse", "main")
+    commands = []
+    for branch in range(FEATURE_BRANCHES):
+        fork = len(main) * (branch + 1) // (FEATURE_BRANCHES + 1)
+        ref = f"refs/heads/feature-{branch}"
+        commands.append(reset_command(ref, main[fork]))
+        for index in range(6):
+            timestamp = BASE_TIME + (fork + index) * 60 + branch % 2 * 30
+            commands.append(commit_command(ref, f"fix: feature {branch} #{index}\n".encode(), timestamp))
+    commands.append(reset_command("refs/heads/main", main[-1]))
+    for branch in range(0, FEATURE_BRANCHES, 2):
+        message = f"Merge branch 'feature-{branch}'\n".encode()
+        commands.append(
+            commit_command("refs/heads/main", message, BASE_TIME + 10**6 + branch, [f"refs/heads/feature-{branch}"])
+        )
+    fast_import(path, commands)
+    git(path, "tag", "-a", "-m", "release", "v1.0", "feature-5")
+    return path
+
+
+def single_stream(repo, revisions):
+    return list(CommitChecker(repo, revisions=revisions).iter_commits())
+
+
+@pytest.mark.parametrize("items, shards, expected", [
+    ([], 3, []),
+    (["a"], 3, [["a"]]),
+    (["a", "b", "c", "d", "e"], 2, [["a", "b"], ["c", "d", "e"]]),
+    (["a", "b", "c"], 3, [["a"], ["b"], ["c"]]),
+])
+def test_split_evenly(items, shards, expected):
+    assert split_evenly(items, shards) == expected
+
+
+@pytest.mark.parametrize("revisions, expected", [
+    (["--all"], True),
+    (["main", "^feature-1", "--not", "feature-2"], True),
+    (["--branches=feature-*", "--tags"], True),
+    (["--first-parent", "main"], False),
+    (["--since=2020-01-01"], False),
+    (["main", "-n", "5"], False),
+])
+def test_can_shard(revisions, expected):
+    assert can_shard(revisions) == expected
+
+
+@pytest.mark.parametrize("revisions", REVISIONS, ids=" ".join)
+@pytest.mark.parametrize("shards", [2, 3, 8])
+def test_ref_shards_yield_each_commit_once(repo, revisions, shards):
+    expected = single_stream(repo, revisions)
+    actual = list(iter_sharded_commits(repo, revisions, shards, SHARD_REFS))
+    assert len({commit.oid for commit in actual}) == len(actual)
+    assert sorted(c.oid for c in actual) == sorted(c.oid for c in expected)
+
+
+@pytest.mark.parametrize("revisions", REVISIONS, ids=" ".join)
+@pytest.mark.parametrize("shards", [2, 3, 8])
+def test_date_shards_keep_git_log_order(repo, revisions, shards):
+    expected = single_stream(repo, revisions)
+    assert list(iter_sharded_commits(repo, revisions, shards, SHARD_DATES)) == expected
+
+
+@pytest.mark.parametrize("shard_by", [SHARD_REFS, SHARD_DATES])
+def test_checker_reads_the_same_commits_sharded(repo, shard_by):
+    expected = single_stream(repo, ["--all"])
+    checker = CommitChecker(repo, shards=4, shard_by=shard_by)
+    assert sorted(c.oid for c in checker.iter_commits()) == sorted(c.oid for c in expected)
+
+
+def test_reading_by_hash_keeps_the_given_order(repo):
+    hashes = rev_list(repo, "--all")[::-3]
+    expected = list(CommitChecker(repo).iter_commits(hashes))
+    assert list(iter_commits_by_hash(repo, hashes, 4)) == expected
+    assert list(CommitChecker(repo, shards=4).iter_commits(hashes)) == expected
+
+
+@pytest.mark.parametrize("revisions", [["--first-parent", "main"], ["no-such-branch"]])
+def test_unshardable_revisions_fall_back_to_one_stream(repo, revisions):
+    assert iter_sharded_commits(repo, revisions, 4) is None
+    checker = CommitChecker(repo, revisions=revisions, shards=4)
+    assert list(checker.iter_commits()) == single_stream(repo, revisions)
+
+
+def child_processes():
+    children = []
+    for pid in filter(str.isdigit, os.listdir("/proc")):
+        try:
+            with open(f"/proc/{pid}/stat", "rb") as f:
+                fields = f.read().rsplit(b")", 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == os.getpid():
+            children.append(int(pid))
+    return children
+
+
+@pytest.mark.skipif(not os.path.isdir("/proc"), reason="needs /proc")
+@pytest.mark.parametrize("shard_by", [SHARD_REFS, SHARD_DATES])
+def test_stopping_early_reaps_every_reader(repo, shard_by):
+    before = child_processes()
+    commits = iter_sharded_commits(repo, ["--all"], 4, shard_by)
+    assert len([next(commits) for _ in range(3)]) == 3
+    commits.close()
+    assert child_processes() == before
+
+
+@pytest.mark.parametrize("shard_by", [SHARD_REFS, SHARD_DATES])
+def test_shards_share_one_read_ahead_budget(repo, monkeypatch, shard_by):
+    sizes = []
+    reader_class = sharded_commit_reader.ShardReader
+
+    def recording_reader(repo, stdin_lines, walk, read_ahead_chunks):
+        sizes.append(read_ahead_chunks)
+        return reader_class(repo, stdin_lines, walk, read_ahead_chunks)
+
+    # Room for a single chunk per shard still yields every commit
+    monkeypatch.setattr(sharded_commit_reader, "READ_AHEAD_BYTES", 3 * READ_CHUNK_SIZE)
+    monkeypatch.setattr(sharded_commit_reader, "ShardReader", recording_reader)
+    expected = single_stream(repo, ["--all"])
+    actual = list(iter_sharded_commits(repo, ["--all"], 8, shard_by))
+    assert sorted(c.oid for c in actual) == sorted(c.oid for c in expected)
+    assert sizes == [1] * 8
+
+
+def test_ref_merge_drops_commits_read_twice(repo):
+    # Overlapping plans, which ref shards never produce on their own
+    actual = list(sharded_commit_reader._merge(repo, [["main"], ["feature-2", "main"]], walk=True))
+    assert len({commit.oid for commit in actual}) == len(actual)
+    expected = single_stream(repo, ["main", "feature-2"])
+    assert sorted(c.oid for c in actual) == sorted(c.oid for c in expected)
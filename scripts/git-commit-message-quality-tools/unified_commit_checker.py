@@ -4,224 +4,778 @@ Unified Git Commit Message Checker
 Integrates all previously used validation rules
 """
 
+import argparse
+import os
 import subprocess
+import sys
 import json
-import re
-from typing import List, Dict, Tuple
-from commit_validation_config import (
-    MAX_SUBJECT_LENGTH,
-    EMOJIS,
-    CHINESE_RANGE,
-    INCOMPLETE_LIST_THRESHOLD,
-    INCOMPLETE_LIST_MARKERS,
+from collections import deque
+from concurrent.futures import Executor, ProcessPoolExecutor
+from itertools import islice
+from typing import IO, Dict, Iterable, Iterator, List, Optional, Tuple
+from commit_rule_engine import ProfilingRuleEngine, RuleProfiler, get_rule_engine
+from fix_report import (
+    DEFAULT_REPORT_FILE,
+    FORMAT_JSON,
+    FORMAT_JSONL,
+    LEGACY_REPORT_FILE,
+    JsonlReportWriter,
+    issue_key,
+    open_report_writer,
+    write_report,
 )
+from commit_record import RECORD_FORMAT, CommitRecord, parse_commit_record
+from commit_validation_config import MAX_MESSAGE_LENGTH, WARNING_ISSUES
+from commit_verdict_cache import VerdictCache, compute_rules_version, default_cache_path
+from git_object_reader import ObjectDatabaseReader
+from sharded_commit_reader import (
+    SHARD_DATES,
+    SHARD_REFS,
+    iter_commits_by_hash,
+    iter_sharded_commits,
+)
+from commit_history_rewriter import existing_commits, load_commit_map
+
+# Field separator inside a git log record (records themselves are NUL-delimited)
+READ_CHUNK_SIZE = 64 * 1024
+
+# Commit sources: a `git log` subprocess, or reading the object database directly
+BACKEND_GIT_LOG = "git-log"
+BACKEND_ODB = "odb"
+
+# Parallel checking: commits per worker task, and tasks queued per worker
+CHECK_BATCH_SIZE = 512
+BATCHES_IN_FLIGHT_PER_JOB = 4
+
+# Exit codes of a rewrite verification
+VERIFY_OK = 0
+VERIFY_PROBLEMS = 1
+VERIFY_MISSING = 2
+
+# Files whose contents define the verdicts; editing any of them invalidates the
+# cache. This module only feeds records to the engine, so it is not one of them.
+SCRIPT_DIR = os.path.dirname(os.path.abspath(__file__))
+RULE_SOURCE_FILES = [
+    os.path.join(SCRIPT_DIR, "commit_validation_config.py"),
+    os.path.join(SCRIPT_DIR, "commit_rule_engine.py"),
+    os.path.join(SCRIPT_DIR, "commit_batch_classifier.py"),
+    os.path.join(SCRIPT_DIR, "commit_record.py"),
+]
+
+
+def iter_nul_records(stream: IO[bytes]) -> Iterator[str]:
+    """Yield NUL-terminated records from a byte stream without buffering it all"""
+    pending = b""
+    while True:
+        chunk = stream.read(READ_CHUNK_SIZE)
+        if not chunk:
+            break
+
+        records = (pending + chunk).split(b"\0")
+        pending = records.pop()
+        for record in records:
+            yield record.decode("utf-8", errors="replace")
+
+    if pending.strip():
+        yield pending.decode("utf-8", errors="replace")
+
+
+def iter_batches(items: Iterable, size: int) -> Iterator[List]:
+    """Split an iterable into lists of at most `size` items"""
+    iterator = iter(items)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def check_messages(messages: List[Tuple[str, bytes]]) -> List[List[str]]:
+    """Check (subject, UTF-8 body) pairs; runs inside pool workers"""
+    engine = get_rule_engine()
+    return engine.check_many([(subject, body.decode("utf-8")) for subject, body in messages])
+
+
+def pre_push_revisions(lines: Iterable[str], remote: Optional[str] = None) -> List[str]:
+    """Build rev-list arguments for the commits a push introduces
+
+    `lines` are pre-push hook stdin lines:
+    `<local ref> <local sha> <remote ref> <remote sha>`.
+    Returns an empty list when nothing new is pushed (e.g. only deletions).
+    """
+    tips = []
+    exclude = []
+    new_ref = False
+    for line in lines:
+        fields = line.split()
+        if len(fields) != 4:
+            continue
+        _, local_sha, _, remote_sha = fields
+        if set(local_sha) == {"0"}:
+            continue  # Deleting a remote ref introduces nothing
+        tips.append(local_sha)
+        if set(remote_sha) == {"0"}:
+            new_ref = True
+        else:
+            exclude.append(remote_sha)
+
+    if not tips:
+        return []
+
+    revisions = tips + ["--not"] + exclude
+    if new_ref:
+        # A new branch only introduces what no remote-tracking ref has yet
+        revisions.append(f"--remotes={remote}" if remote else "--remotes")
+    return revisions
+
+
+def profile_report_path(output_file: str) -> str:
+    """Location of the rule profile written next to a report"""
+    return os.path.splitext(output_file)[0] + ".profile.json"
+
+
+def print_rule_profile(profiler: RuleProfiler):
+    """Print per-rule timing and hit counts"""
+    print("⏱️  Rule profile (slowest first):")
+    print(f"  {'rule':<28} {'calls':>8} {'hits':>7} {'total ms':>10} {'µs/call':>9}")
+    for rule, stats in profiler.to_dict().items():
+        print(
+            f"  {rule:<28} {stats['calls']:>8} {stats['hits']:>7} "
+            f"{stats['total_ms']:>10.1f} {stats['mean_us']:>9.2f}"
+        )
+        if stats["slowest"]:
+            worst = stats["slowest"][0]
+            print(f"  {'':<28} slowest: {worst['message']} ({worst['ms']:.2f} ms)")
+
+
+class Problem:
+    """A commit that broke rules; refers to the commit record, never copies it"""
+
+    __slots__ = ("commit", "issues")
+
+    def __init__(self, commit: CommitRecord, issues: List[str]):
+        self.commit = commit
+        self.issues = issues
+
+
+def fix_record(problem: Problem) -> Dict:
+    """Build the fix plan entry for a problem (fix fields left for AI)"""
+    commit = problem.commit
+    full_hash = commit.full_hash
+    return {
+        "hash": full_hash[:7],
+        "full_hash": full_hash,
+        "original_subject": commit.subject,
+        "original_body": commit.body,  # Fully preserved, no truncation
+        "issues": problem.issues,
+        "fixed_subject": "",  # Reserved field, populated by AI
+        "fixed_body": "",  # Reserved field, populated by AI
+    }
+
+
+class VerificationResult:
+    """Outcome of re-checking the commits produced by a history rewrite"""
+
+    __slots__ = ("checked", "problems", "missing", "full_scan")
+
+    def __init__(self, checked: int, problems: List[Problem], missing: List[str], full_scan: bool):
+        self.checked = checked
+        self.problems = problems
+        self.missing = missing  # New hashes from the map that are not in the repo
+        self.full_scan = full_scan
+
+    @property
+    def exit_code(self) -> int:
+        if self.missing:
+            return VERIFY_MISSING
+        return VERIFY_PROBLEMS if self.problems else VERIFY_OK
+
+    def to_dict(self) -> Dict:
+        return {
+            "exit_code": self.exit_code,
+            "full_scan": self.full_scan,
+            "checked": self.checked,
+            "problems": len(self.problems),
+            "missing": self.missing,
+            "problem_hashes": [problem.commit.full_hash for problem in self.problems],
+        }
 
 
 class CommitChecker:
     """Commit message checker"""
 
-    def __init__(self, repo_path: str):
+    def __init__(
+        self,
+        repo_path: str,
+        jobs: int = 1,
+        revisions: Optional[List[str]] = None,
+        profiler: Optional[RuleProfiler] = None,
+        backend: str = BACKEND_GIT_LOG,
+        pool: Optional[Executor] = None,
+        quiet: bool = False,
+        shards: int = 1,
+        shard_by: str = SHARD_REFS,
+    ):
         self.repo_path = repo_path
+        self.jobs = jobs
+        # A pool shared with other checkers; otherwise one is made per run
+        self.pool = pool
+        self.quiet = quiet
+        # git rev-list arguments selecting the commits to check
+        self.revisions = list(revisions) if revisions else ["--all"]
+        if backend == BACKEND_ODB and self.revisions != ["--all"]:
+            raise ValueError("The odb backend only reads all commits (--all)")
+        self.backend = backend
+        if backend == BACKEND_ODB and shards > 1:
+            raise ValueError("Sharded reading needs the git-log backend")
+        # Concurrent git readers, and how history is split between them
+        self.shards = shards
+        self.shard_by = shard_by
+        self._odb_reader = None
         self.problems = []
-
-    def get_all_commits(self) -> List[Dict]:
+        self.total_commits = 0
+        self.skipped_oversized = 0  # Commits too large to check, not problems
+        self.profiler = profiler
+        if profiler is None:
+            self.engine = get_rule_engine()
+        else:
+            # Timings come from this process only, so profiling runs serially
+            self.engine = ProfilingRuleEngine(profiler)
+            self.jobs = 1
+            self.pool = None
+
+    def get_all_commits(self) -> List[CommitRecord]:
         """Get all commits"""
-        # Use special separator to avoid newline issues in body
-        separator = "<<<COMMIT_SEP>>>"
+        return list(self.iter_commits())
+
+    def iter_commits(self, hashes: Optional[List[str]] = None) -> Iterator[CommitRecord]:
+        """Stream commits from git log as they are produced
+
+        With `hashes`, only those commits are read, in the given order.
+        With several shards, `dates` keeps git log order and `refs` orders
+        by committer date (equal dates may come out in another order).
+        """
+
+        if hashes is not None and not hashes:
+            return  # An empty --stdin list would make git log fall back to HEAD
+        if self.backend == BACKEND_ODB:
+            yield from self.odb_reader.iter_commits(hashes)
+            return
+        if self.shards > 1:
+            if hashes is not None:
+                yield from iter_commits_by_hash(self.repo_path, hashes, self.shards)
+                return
+            sharded = iter_sharded_commits(self.repo_path, self.revisions, self.shards, self.shard_by)
+            if sharded is not None:
+                yield from sharded
+                return
+
+        args = ["git", "log", "-z", f"--format={RECORD_FORMAT}"]
+        if hashes is None:
+            args.extend(["--ignore-missing", *self.revisions])
+        else:
+            args.extend(["--no-walk=unsorted", "--stdin"])
+
+        process = subprocess.Popen(
+            args,
+            stdin=subprocess.PIPE if hashes is not None else None,
+            stdout=subprocess.PIPE,
+            cwd=self.repo_path,
+        )
+
+        try:
+            if hashes is not None:
+                # git log reads all of stdin before it starts writing
+                process.stdin.write("".join(h + "\n" for h in hashes).encode())
+                process.stdin.close()
+
+            for record in iter_nul_records(process.stdout):
+                commit = parse_commit_record(record)
+                if commit is not None:
+                    yield commit
+        finally:
+            # Closing stdout early makes git exit on SIGPIPE
+            process.stdout.close()
+            process.wait()
+
+    @property
+    def odb_reader(self) -> ObjectDatabaseReader:
+        """Object database reader, opened on first use"""
+        if self._odb_reader is None:
+            self._odb_reader = ObjectDatabaseReader(self.repo_path)
+        return self._odb_reader
+
+    def close(self):
+        """Release the object database reader's pack maps and files
+
+        check_all() and verify_rewrite() call this when they finish; a
+        later check reopens the reader.
+        """
+        if self._odb_reader is not None:
+            self._odb_reader.close()
+            self._odb_reader = None
+
+    def list_commit_hashes(self) -> List[str]:
+        """List full hashes of the selected commits, in git log order"""
+        if self.backend == BACKEND_ODB:
+            return self.odb_reader.list_commit_hashes()
+
         result = subprocess.run(
-            ["git", "log", f"--format=%H|||%s|||%b{separator}", "--all"],
+            ["git", "rev-list", "--ignore-missing", *self.revisions],
             capture_output=True,
             text=True,
             cwd=self.repo_path,
         )
+        return result.stdout.split()
 
-        commits = []
-        # Split each commit by separator
-        commit_blocks = result.stdout.strip().split(separator)
-
-        for block in commit_blocks:
-            if not block.strip():
-                continue
-
-            parts = block.split("|||", 2)  # Split into max 3 parts
-            if len(parts) < 2:
-                continue
-
-            commits.append(
-                {
-                    "full_hash": parts[0].strip(),
-                    "hash": parts[0].strip()[:7],
-                    "subject": parts[1].strip() if len(parts) > 1 else "",
-                    "body": parts[2].strip() if len(parts) > 2 else "",
-                }
-            )
-
-        return commits
-
-    def check_commit(self, commit: Dict) -> Tuple[bool, List[str]]:
+    def check_commit(self, commit: CommitRecord) -> Tuple[bool, List[str]]:
         """Check single commit, returns (has_problem, issue_list)"""
-        subject = commit["subject"]
-        body = commit["body"]
-        issues = []
-
-        # Rule 1: Check **** placeholder
-        if "****" in subject or "****" in body:
-            issues.append("contains-****")
-
-        # Rule 2: Check subject length
-        if len(subject) > MAX_SUBJECT_LENGTH:
-            issues.append(f"subject-too-long-{len(subject)}")
-
-        # Rule 3: Check Chinese characters
-        if any(
-            CHINESE_RANGE[0] <= c <= CHINESE_RANGE[1] for c in subject + body
-        ):
-            issues.append("contains-Chinese")
-
-        # Rule 4: Check emoji in subject
-        if any(emoji in subject for emoji in EMOJIS):
-            issues.append("emoji-in-subject")
-
-        # Rule 5: Check markdown markers in subject
-        if "##" in subject or "###" in subject:
-            issues.append("markdown-in-subject")
-
-        # Rule 6: Check subject format (should be type(scope): description)
-        if not re.match(r"^[a-z]+(\([^)]+\))?:\s+.+", subject):
-            issues.append("invalid-format")
-
-        # Rule 7: Check if body starts with standalone emoji line
-        body_lines = body.split("\n")
-        if body_lines and body_lines[0].strip() in EMOJIS:
-            issues.append("emoji-first-line")
-
-        # Rule 8: Check incomplete list items
-        incomplete_items = sum(
-            1
-            for line in body_lines
-            if line.strip() in INCOMPLETE_LIST_MARKERS
-        )
-        if incomplete_items > INCOMPLETE_LIST_THRESHOLD:
-            issues.append("incomplete-list-items")
-
-        # Rule 9: Check too many empty lines
-        empty_lines = sum(1 for line in body_lines if not line.strip())
-        if empty_lines > len(body_lines) * 0.3 and len(body_lines) > 10:
-            issues.append("too-many-empty-lines")
-
-        # Rule 10: Check incomplete subject ending
-        if re.search(r"\s+(proposal|tasks|\.\.\.)\s*$", subject):
-            issues.append("incomplete-subject-ending")
-
-        # Rule 11: Check multiple spaces in subject
-        if "  " in subject:
-            issues.append("multiple-spaces")
-
-        # Rule 12: Check chaotic markdown markers in body
-        if body:
-            # Check for isolated ## or ### markers (no space after or in middle of line)
-            markdown_chaos = 0
-            for line in body_lines:
-                # Isolated markdown marker
-                if re.search(r"[^\s]##|##[^\s#]", line):
-                    markdown_chaos += 1
-                # Markdown marker in middle of line
-                if re.search(r"\s##\s.*\S", line) and not line.strip().startswith("##"):
-                    markdown_chaos += 1
-
-            if markdown_chaos > 2:
-                issues.append("markdown-chaos-in-body")
-
-        # Rule 13: Check code block format
-        if body:
-            # Check for code block markers without line breaks
-            inline_code_blocks = re.findall(r"```\w+[^`]{50,}```", body)
-            if inline_code_blocks:
-                issues.append("malformed-code-blocks")
-
+        issues = self.engine.check(commit.subject, commit.body)
         return len(issues) > 0, issues
 
-    def check_all(self) -> List[Dict]:
-        """Check all commits"""
-        print("🔍 Starting check of all commits...")
-        print()
-
-        commits = self.get_all_commits()
-        print(f"📊 Total {len(commits)}  commits")
-        print()
+    def _print(self, message: str = ""):
+        """Progress output, silenced for checkers run side by side"""
+        if not self.quiet:
+            print(message)
+
+    def check_all(
+        self,
+        cache: Optional[VerdictCache] = None,
+        report: Optional[JsonlReportWriter] = None,
+    ) -> List[Problem]:
+        """Check all commits
+
+        With a verdict cache, only commits without a cached verdict are
+        validated; cached problem commits are re-read for the report.
+        With a report writer, each fix record is written as soon as its
+        problem is found.
+        """
+        if self.revisions == ["--all"]:
+            self._print("🔍 Starting check of all commits...")
+        else:
+            self._print(f"🔍 Starting check of commits in: {' '.join(self.revisions)}")
+        self._print()
+
+        try:
+            if cache is None:
+                total, problems = self._check_stream(self.iter_commits(), report=report)
+            else:
+                hashes = self.list_commit_hashes()
+                total = len(hashes)
+                cached = cache.lookup_many(hashes)
+                self._print(
+                    f"💾 Verdict cache: {len(cached)} cached, {total - len(cached)} to check"
+                )
+                self._print()
 
-        problems = []
-        for commit in commits:
-            has_problem, issues = self.check_commit(commit)
-            if has_problem:
-                problems.append(
-                    {
-                        "hash": commit["hash"],
-                        "full_hash": commit["full_hash"],
-                        "original_subject": commit["subject"],
-                        "original_body": commit["body"],
-                        "issues": issues,
-                    }
+                # Clean cached commits need no further work at all
+                needed = [h for h in hashes if cached.get(h, True)]
+                _, problems = self._check_stream(
+                    self.iter_commits(needed), cache, cached, report
                 )
+        finally:
+            self.close()
+
+        self._print(f"📊 Total {total}  commits")
+        if self.skipped_oversized:
+            self._print(
+                f"⚠️  {self.skipped_oversized} commits too large to check "
+                f"(over {MAX_MESSAGE_LENGTH} characters), skipped"
+            )
+        self._print()
 
+        self.total_commits = total
         self.problems = problems
         return problems
 
-    def generate_fixes(self) -> List[Dict]:
-        """Generate fix plan for all problematic commits (without auto-fix content)"""
+    def verify_rewrite(
+        self,
+        commit_map: Dict[str, str],
+        cache: Optional[VerdictCache] = None,
+        report: Optional[JsonlReportWriter] = None,
+        full: bool = False,
+    ) -> VerificationResult:
+        """Re-check the commits a history rewrite produced
+
+        Only the new side of the old -> new map is validated; commits the
+        rewrite did not touch kept their hashes and verdicts. With `full`,
+        the checker's whole revision selection is re-scanned instead.
+        """
+        if full:
+            problems = self.check_all(cache, report)
+            return VerificationResult(self.total_commits, problems, [], True)
+
+        new_hashes = list(dict.fromkeys(commit_map.values()))
+        present = existing_commits(self.repo_path, new_hashes) if new_hashes else set()
+        missing = [h for h in new_hashes if h not in present]
+        hashes = [h for h in new_hashes if h in present]
+
+        self._print(f"🔍 Verifying {len(hashes)} rewritten commits...")
+        self._print()
+        cached = cache.lookup_many(hashes) if cache is not None else {}
+        try:
+            total, problems = self._check_stream(
+                self.iter_commits(hashes), cache, cached, report
+            )
+        finally:
+            self.close()
+
+        self.total_commits = total
+        self.problems = problems
+        return VerificationResult(total, problems, missing, False)
+
+    def _check_stream(
+        self,
+        commits: Iterator[CommitRecord],
+        cache: Optional[VerdictCache] = None,
+        cached: Optional[Dict[str, List[str]]] = None,
+        report: Optional[JsonlReportWriter] = None,
+    ) -> Tuple[int, List[Problem]]:
+        """Check a commit stream, returns (commit_count, problems)
+
+        Clean commits are dropped as soon as they are checked; problems keep
+        their commit record, which is the only copy of its message. Warnings
+        (messages too large to check) are counted, never reported as problems.
+        """
+        problems = []
+        total = 0
+        self.skipped_oversized = 0
+        for commit, issues, fresh in self._iter_verdicts(commits, cached or {}):
+            total += 1
+            if fresh and cache is not None:
+                cache.store(commit.full_hash, issues)
+
+            if issues and not WARNING_ISSUES.isdisjoint(issues):
+                self.skipped_oversized += 1
+                issues = [issue for issue in issues if issue not in WARNING_ISSUES]
+            if issues:
+                problem = Problem(commit, issues)
+                problems.append(problem)
+                if report is not None:
+                    report.write(fix_record(problem))
+
+        if cache is not None:
+            cache.flush()
+        return total, problems
+
+    def _iter_verdicts(
+        self, commits: Iterator[CommitRecord], cached: Dict[str, List[str]]
+    ) -> Iterator[Tuple[CommitRecord, List[str], bool]]:
+        """Yield (commit, issues, freshly_checked) in input order"""
+        if self.profiler is not None:
+            # Commit by commit, so the profile can name the slowest ones
+            for commit in commits:
+                issues = cached.get(commit.full_hash) if cached else None
+                if issues is None:
+                    issues = self.engine.check(commit.subject, commit.body, commit.hash)
+                    yield commit, issues, True
+                else:
+                    yield commit, issues, False
+            return
+
+        if self.jobs <= 1 and self.pool is None:
+            # Batches let the engine classify characters for many at once
+            for batch in iter_batches(commits, CHECK_BATCH_SIZE):
+                todo = [c for c in batch if c.full_hash not in cached] if cached else batch
+                results = self.engine.check_many([(c.subject, c.body) for c in todo])
+                yield from self._merge_batch(batch, results, cached)
+            return
+
+        if self.pool is not None:
+            yield from self._iter_pooled(self.pool, commits, cached)
+            return
+
+        with ProcessPoolExecutor(max_workers=self.jobs) as pool:
+            yield from self._iter_pooled(pool, commits, cached)
+
+    def _iter_pooled(
+        self, pool: Executor, commits: Iterator[CommitRecord], cached: Dict[str, List[str]]
+    ) -> Iterator[Tuple[CommitRecord, List[str], bool]]:
+        """Check batches on a process pool, yielding results in input order"""
+        # Batches keep IPC per task small relative to the work it carries;
+        # a bounded window of in-flight batches keeps memory flat
+        max_in_flight = self.jobs * BATCHES_IN_FLIGHT_PER_JOB
+        in_flight = deque()
+        for batch in iter_batches(commits, CHECK_BATCH_SIZE):
+            todo = [c for c in batch if c.full_hash not in cached] if cached else batch
+            # Bodies travel as UTF-8, which is also smaller to pickle
+            future = pool.submit(check_messages, [(c.subject, c.raw_body) for c in todo])
+            in_flight.append((batch, future))
+            if len(in_flight) >= max_in_flight:
+                batch, future = in_flight.popleft()
+                yield from self._merge_batch(batch, future.result(), cached)
+
+        while in_flight:
+            batch, future = in_flight.popleft()
+            yield from self._merge_batch(batch, future.result(), cached)
+
+    @staticmethod
+    def _merge_batch(
+        batch: List[CommitRecord], results: List[List[str]], cached: Dict[str, List[str]]
+    ) -> Iterator[Tuple[CommitRecord, List[str], bool]]:
+        """Combine a checked batch's results with cached verdicts, in order"""
+        results = iter(results)
+        for commit in batch:
+            issues = cached.get(commit.full_hash) if cached else None
+            if issues is None:
+                yield commit, next(results), True
+            else:
+                yield commit, issues, False
+
+    def generate_fixes(self) -> Iterator[Dict]:
+        """Generate fix plan for all problematic commits (without auto-fix content)
+
+        Entries are built one at a time, so writing them out never holds a
+        second copy of every message.
+        """
         print(f"🔧 to {len(self.problems)}  problematic commits generating fix plan...")
         print()
 
-        fixes = []
-        for problem in self.problems:
-            fixes.append(
-                {
-                    "hash": problem["hash"],
-                    "full_hash": problem["full_hash"],
-                    "original_subject": problem["original_subject"],
-                    "original_body": problem["original_body"],  # Fully preserved, no truncation
-                    "issues": problem["issues"],
-                    "fixed_subject": "",  # Reserved field, populated by AI
-                    "fixed_body": "",  # Reserved field, populated by AI
-                }
-            )
+        return (fix_record(problem) for problem in self.problems)
 
-        return fixes
+    def save_report(self, output_file: str, fmt: str = FORMAT_JSONL) -> int:
+        """Save check report, returns the number of fix records written"""
+        count = write_report(output_file, self.generate_fixes(), fmt)
 
-    def save_report(self, output_file: str):
-        """Save check report"""
-        fixes = self.generate_fixes()
+        print(f"✅ Fix plan saved to: {output_file}")
+        self.save_profile(output_file)
+        return count
+
+    def save_profile(self, output_file: str):
+        """Save the rule profile next to a report, when profiling"""
+        if self.profiler is None:
+            return
+
+        # Kept beside the fix plan so report consumers keep their format
+        profile_file = profile_report_path(output_file)
+        with open(profile_file, "w", encoding="utf-8") as f:
+            json.dump(
+                {"total_commits": self.total_commits, "rules": self.profiler.to_dict()},
+                f,
+                indent=2,
+            )
+        print(f"✅ Rule profile saved to: {profile_file}")
+
+
+def parse_args(argv=None):
+    """Parse command line arguments"""
+    parser = argparse.ArgumentParser(description="Git Commit Message Unified Checker")
+    parser.add_argument(
+        "--no-cache",
+        action="store_true",
+        help="Validate every commit instead of reusing cached verdicts",
+    )
+    parser.add_argument(
+        "--clear-cache",
+        action="store_true",
+        help="Drop cached verdicts before checking",
+    )
+    parser.add_argument(
+        "--jobs",
+        "-j",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Check commits in N worker processes (0 = one per CPU)",
+    )
+    parser.add_argument(
+        "--profile",
+        nargs="?",
+        type=int,
+        const=5,
+        metavar="N",
+        help="Record per-rule time and hit counts, keeping the N slowest "
+        "messages per rule (default N: 5)",
+    )
+    parser.add_argument(
+        "--report-format",
+        choices=[FORMAT_JSONL, FORMAT_JSON],
+        default=FORMAT_JSONL,
+        help="jsonl: one fix record per line, written as found (default); "
+        "json: legacy pretty-printed array",
+    )
+    parser.add_argument(
+        "--output",
+        "-o",
+        help=f"Fix plan path (default: {DEFAULT_REPORT_FILE}, "
+        f"or {LEGACY_REPORT_FILE} with --report-format json)",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=[BACKEND_GIT_LOG, BACKEND_ODB],
+        default=BACKEND_GIT_LOG,
+        help="git-log: stream `git log` output (default); "
+        "odb: read loose objects and packfiles directly (all commits only)",
+    )
+    parser.add_argument(
+        "--index",
+        nargs="?",
+        const="",
+        metavar="FILE",
+        help="After checking, add the new commits to the issue index "
+        "(commit_issue_index.py; default FILE: in the git dir)",
+    )
+    parser.add_argument(
+        "--shards",
+        type=int,
+        default=1,
+        metavar="N",
+        help="Read history with N concurrent git processes (git-log backend only)",
+    )
+    parser.add_argument(
+        "--shard-by",
+        choices=[SHARD_REFS, SHARD_DATES],
+        default=SHARD_REFS,
+        help="refs: split by ref tips, each shard excluding the ones before it (default); "
+        "dates: split one commit listing into date windows, keeping git log order",
+    )
+    parser.add_argument(
+        "revisions",
+        nargs="*",
+        metavar="REVISION",
+        help="Revision range to check, e.g. origin/main..HEAD (default: --all)",
+    )
+    parser.add_argument(
+        "--since",
+        metavar="REF",
+        help="Check only commits in REF..HEAD",
+    )
+    parser.add_argument(
+        "--verify-map",
+        metavar="FILE",
+        help="Re-check only the new commits in an old -> new commit map "
+        "written by commit_history_rewriter.py; exit 0 if all pass, "
+        "1 on problems, 2 if mapped commits are missing",
+    )
+    parser.add_argument(
+        "--full-verify",
+        action="store_true",
+        help="With --verify-map, re-scan all selected commits instead",
+    )
+    parser.add_argument(
+        "--pre-push",
+        nargs="?",
+        const="",
+        metavar="REMOTE",
+        help="Read pre-push hook lines from stdin, check only pushed commits "
+        "and exit non-zero on problems",
+    )
+    return parser.parse_args(argv)
+
+
+def update_issue_index(repo_path: str, index_path: Optional[str], cache: Optional[VerdictCache]):
+    """--index: record the checked commits' issues, reusing the verdicts just cached"""
+    from commit_issue_index import IssueIndex, default_index_path
+
+    index = IssueIndex(index_path or default_index_path(repo_path))
+    try:
+        result = index.update(repo_path, cache)
+    finally:
+        index.close()
+    print(f"🗂️  Issue index: {result.new_commits} new commits ({index.path})")
+    print()
 
-        with open(output_file, "w", encoding="utf-8") as f:
-            json.dump(fixes, f, indent=2, ensure_ascii=False)
 
-        print(f"✅ Fix plan saved to: {output_file}")
-        return fixes
+def verify_rewrite_main(
+    checker: CommitChecker, args, cache: Optional[VerdictCache], output_file: str
+) -> int:
+    """--verify-map: check a rewrite's new commits, exit code carries the verdict"""
+    commit_map = load_commit_map(args.verify_map)
+    report = open_report_writer(output_file, args.report_format)
+    try:
+        result = checker.verify_rewrite(commit_map, cache, report, full=args.full_verify)
+    finally:
+        report.close()
+        if cache is not None:
+            cache.close()
+
+    if result.missing:
+        print(f"❌ {len(result.missing)} rewritten commits are missing from the repository")
+    if checker.skipped_oversized:
+        print(f"⚠️  {checker.skipped_oversized} commits too large to check, skipped")
+    if result.problems:
+        print(f"⚠️  {len(result.problems)} of {result.checked} checked commits still have issues:")
+        for problem in result.problems[:10]:
+            print(f"  {problem.commit.hash} - {', '.join(problem.issues)}")
+        print(f"✅ Remaining fix plan saved to: {output_file}")
+    elif not result.missing:
+        scope = "all" if result.full_scan else "rewritten"
+        print(f"✅ Verification passed: {result.checked} {scope} commits comply with standards")
+    print()
+    return result.exit_code
 
 
-def main():
+def main(argv=None):
     """Main function"""
-    import os
+    args = parse_args(argv)
 
     # Auto-detect repository path
-    script_dir = os.path.dirname(os.path.abspath(__file__))
-    repo_path = os.path.abspath(os.path.join(script_dir, "../.."))
-    output_file = "/tmp/unified_commit_fixes.json"
+    repo_path = os.path.abspath(os.path.join(SCRIPT_DIR, "../.."))
+    output_file = args.output or (
+        LEGACY_REPORT_FILE if args.report_format == FORMAT_JSON else DEFAULT_REPORT_FILE
+    )
 
     print("=" * 60)
     print("Git Commit Message Unified Checker")
     print("=" * 60)
     print()
 
-    # Create checker
-    checker = CommitChecker(repo_path)
+    # Select commits: explicit range, REF..HEAD, pushed commits, or everything
+    revisions = list(args.revisions)
+    if args.since:
+        revisions.append(f"{args.since}..HEAD")
+    if args.pre_push is not None:
+        revisions.extend(pre_push_revisions(sys.stdin, args.pre_push or None))
+        if not revisions:
+            print("✅ Nothing new to push")
+            return 0
 
-    # Check all commits
-    problems = checker.check_all()
+    # Create checker
+    jobs = args.jobs if args.jobs > 0 else (os.cpu_count() or 1)
+    profiler = RuleProfiler(args.profile) if args.profile is not None else None
+    try:
+        checker = CommitChecker(
+            repo_path,
+            jobs=jobs,
+            revisions=revisions,
+            profiler=profiler,
+            backend=args.backend,
+            shards=args.shards,
+            shard_by=args.shard_by,
+        )
+    except ValueError as e:
+        print(f"❌ {e}")
+        return 1
+
+    # Verdict cache lives in the git dir, keyed by rule-set version
+    cache = None
+    cache_path = None if args.no_cache else default_cache_path(repo_path)
+    if cache_path:
+        cache = VerdictCache(cache_path, compute_rules_version(RULE_SOURCE_FILES))
+        if args.clear_cache:
+            cache.clear()
+
+    if args.verify_map:
+        return verify_rewrite_main(checker, args, cache, output_file)
+
+    # Check all commits, writing the fix plan as problems are found
+    report = open_report_writer(output_file, args.report_format)
+    try:
+        problems = checker.check_all(cache, report)
+        if args.index is not None:
+            update_issue_index(repo_path, args.index or None, cache)
+    finally:
+        report.close()
+        if cache is not None:
+            cache.close()
+    checker.save_profile(output_file)
 
     if not problems:
         print("🎉 Excellent\! All commits comply with standards\!")
         print()
+        if profiler is not None:
+            print_rule_profile(profiler)
+            print()
         return 0
 
     # Display issue statistics
@@ -231,15 +785,10 @@ def main():
     # Count issue types
     issue_types = {}
     for problem in problems:
-        for issue in problem["issues"]:
+        for issue in problem.issues:
             # Categorize subject-too-long
-            issue_key = issue
-            if issue.startswith("subject-too-long-"):
-                issue_key = "subject-too-long"
-
-            if issue_key not in issue_types:
-                issue_types[issue_key] = 0
-            issue_types[issue_key] += 1
+            key = issue_key(issue)
+            issue_types[key] = issue_types.get(key, 0) + 1
 
     print("Issue type statistics:")
     for issue_type, count in sorted(
@@ -251,15 +800,14 @@ def main():
     # Display first 10 problematic commits
     print("First 10  problematic commits:")
     for i, problem in enumerate(problems[:10], 1):
-        print(f"{i}. {problem['hash']} - {problem['original_subject'][:60]}...")
-        print(f"   Issues: {', '.join(problem['issues'])}")
+        print(f"{i}. {problem.commit.hash} - {problem.commit.subject[:60]}...")
+        print(f"   Issues: {', '.join(problem.issues)}")
 
     if len(problems) > 10:
         print(f"... ... and {len(problems) - 10} ")
     print()
 
-    # Generate and save fix plan
-    fixes = checker.save_report(output_file)
+    print(f"✅ Fix plan saved to: {output_file}")
 
     print()
     print("=" * 60)
@@ -267,10 +815,15 @@ def main():
     print("=" * 60)
     print()
     print("📊 Statistics:")
-    print(f"  - Total commits: {len(checker.get_all_commits())}")
+    print(f"  - Total commits: {checker.total_commits}")
     print(f"  - Problematic commits: {len(problems)}")
-    print(f"  - Fix plans: {len(fixes)}")
+    if checker.skipped_oversized:
+        print(f"  - Too large to check: {checker.skipped_oversized}")
+    print(f"  - Fix plans: {report.count}")
     print()
+    if profiler is not None:
+        print_rule_profile(profiler)
+        print()
     print("⚠️  Note:")
     print("  - fixed_subject and fixed_body fields are empty")
     print("  - Need AI to populate fix content based on context")
@@ -281,7 +834,8 @@ def main():
     print("  3. Execute fixes: /tmp/unified_commit_fixer.sh")
     print()
 
-    return 0
+    # As a pre-push gate, any problem blocks the push
+    return 1 if args.pre_push is not None else 0
 
 
 if __name__ == "__main__":
@@ -2,8 +2,16 @@
 
 set -e
 
-REPO_DIR="$(cd "$(dirname "$0")/../.." && pwd)"
-FIXES_FILE="/tmp/unified_commit_fixes.json"
+SCRIPT_DIR="$(cd "$(dirname "$0")" && pwd)"
+REPO_DIR="$(cd "$SCRIPT_DIR/../.." && pwd)"
+FIXES_FILE="${1:-/tmp/unified_commit_fixes.jsonl}"
+# Fall back to a legacy JSON array report
+if [ -z "$1" ] && [ ! -f "$FIXES_FILE" ] && [ -f /tmp/unified_commit_fixes.json ]; then
+    FIXES_FILE="/tmp/unified_commit_fixes.json"
+fi
+report_tool() {
+    python3 "$SCRIPT_DIR/fix_report.py" "$@"
+}
 
 echo "=========================================="
 echo "Git Commit Message Unified Fixer"
@@ -23,7 +31,7 @@ fi
 cd "$REPO_DIR"
 
 # Read fix count
-FIXES_COUNT=$(jq length "$FIXES_FILE")
+FIXES_COUNT=$(report_tool count "$FIXES_FILE")
 
 if [ "$FIXES_COUNT" -eq 0 ]; then
     echo "🎉 No commits need fixing\!"
@@ -38,24 +46,12 @@ echo ""
 
 # Display issue statistics
 echo "Issue type statistics:"
-jq -r '
-  [.[] | .issues[]] 
-  | group_by(.) 
-  | map({issue: .[0], count: length}) 
-  | sort_by(.count) 
-  | reverse 
-  | .[] 
-  | "  \(.issue): \(.count) commits"
-' "$FIXES_FILE"
+report_tool stats "$FIXES_FILE"
 echo ""
 
 # Display first 5 commits to be fixed
 echo "First 5 commits to be fixed:"
-jq -r '
-  .[:5] 
-  | .[] 
-  | "\(.hash) - \(.original_subject[:60])...\n  Issues: \(.issues | join(", "))\n  Fixed: \(.fixed_subject[:60])..."
-' "$FIXES_FILE"
+report_tool head 5 "$FIXES_FILE"
 
 if [ "$FIXES_COUNT" -gt 5 ]; then
     echo "... and $((FIXES_COUNT - 5)) "
@@ -69,42 +65,16 @@ git branch "$BACKUP_BRANCH"
 echo "✅ Backup branch: $BACKUP_BRANCH"
 echo ""
 
-# 2. Create git-filter-repo callback script
-echo "📝 Step 2: Preparing git-filter-repo callback..."
-cat > /tmp/unified_fix_callback.py << 'PYTHON_EOF'
-import json
-
-# Load fix plan
-with open('/tmp/unified_commit_fixes.json', 'r', encoding='utf-8') as f:
-    fixes_list = json.load(f)
-    FIXES = {item['full_hash']: item for item in fixes_list}
-
-# Get original commit ID
-original_id = commit.original_id
-
-if original_id:
-    original_id_str = original_id.decode('utf-8') if isinstance(original_id, bytes) else str(original_id)
-    
-    if original_id_str in FIXES:
-        fix = FIXES[original_id_str]
-        new_subject = fix['fixed_subject']
-        new_body = fix['fixed_body']
-        
-        # Combine into complete message
-        if new_body:
-            new_message = f"{new_subject}\n\n{new_body}"
-        else:
-            new_message = new_subject
-        
-        commit.message = new_message.encode('utf-8')
-PYTHON_EOF
-
-echo "✅ Callback script created"
+# 2. Plan the rewrite (only refs containing a fixed commit are touched)
+echo "📝 Step 2: Planning history rewrite..."
+COMMIT_MAP_FILE="/tmp/unified_commit_rewrite_map.txt"
+python3 "$SCRIPT_DIR/commit_history_rewriter.py" "$FIXES_FILE" \
+  --exclude-ref "refs/heads/$BACKUP_BRANCH" --dry-run
 echo ""
 
 # 3. Confirm
 echo "⚠️  Warning: This will rewrite Git history\!"
-echo "⚠️  All commit hashes will change"
+echo "⚠️  Hashes of fixed commits and their descendants will change"
 echo "⚠️  If issues occur, can rollback to: $BACKUP_BRANCH"
 echo ""
 echo "Fix details:"
@@ -126,13 +96,14 @@ fi
 
 # 4. Execute fixes
 echo ""
-echo "🚀 Step 3: Executing git-filter-repo..."
+echo "🚀 Step 3: Rewriting history with git fast-export | fast-import..."
 echo ""
 
 START_TIME=$(date +%s)
 
-git filter-repo --force \
-  --commit-callback "$(cat /tmp/unified_fix_callback.py)"
+python3 "$SCRIPT_DIR/commit_history_rewriter.py" "$FIXES_FILE" \
+  --exclude-ref "refs/heads/$BACKUP_BRANCH" \
+  --commit-map "$COMMIT_MAP_FILE"
 
 END_TIME=$(date +%s)
 DURATION=$((END_TIME - START_TIME))
@@ -150,16 +121,15 @@ echo "Recent 10 commits:"
 git log --oneline -10
 echo ""
 
-# Run checker verification
-echo "Run checker verification..."
-python3 /tmp/unified_commit_checker.py > /tmp/verify_result.txt 2>&1
-
-if grep -q "All commits comply with standards" /tmp/verify_result.txt; then
-    echo "✅ Verification passed: All commits now comply with standards！"
+# Re-check only the commits the rewrite produced (exit code is the verdict)
+echo "Run checker verification on rewritten commits..."
+if python3 "$SCRIPT_DIR/unified_commit_checker.py" \
+  --verify-map "$COMMIT_MAP_FILE" \
+  --output /tmp/unified_commit_verify.jsonl > /tmp/verify_result.txt 2>&1; then
+    echo "✅ Verification passed: All rewritten commits now comply with standards！"
 else
     echo "⚠️  Verification found issues, please check: /tmp/verify_result.txt"
-    REMAINING=$(grep "Found.*issues" /tmp/verify_result.txt || echo "unknown")
-    echo "   $REMAINING"
+    echo "   Remaining fix plan: /tmp/unified_commit_verify.jsonl"
 fi
 
 echo ""
@@ -201,7 +171,7 @@ Duration: ${DURATION} seconds
 Backup branch: $BACKUP_BRANCH
 
 Fixed commits:
-$(jq -r '.[] | "\(.hash) - \(.original_subject[:60])..."' "$FIXES_FILE")
+$(report_tool list "$FIXES_FILE")
 
 Verify results:
 $(cat /tmp/verify_result.txt)